@@ -0,0 +1,71 @@
+"""
+Benchmark of the SQLite engine profiles.
+
+Runs concurrent add_user() and get_user_access_level() calls (with the user cache disabled) against a
+temporary SQLite file, once with the default engine (rollback journal, full fsync, a new connection per
+session) and once with build_engine() (configured PRAGMAs and a connection pool).
+
+Usage: python -m benchmarks.database_profiles [--workers 20] [--operations 200]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+# The bot configuration is required to import the bot package
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("OWNER_ID", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from bot.db import database, add_user, get_user_access_level, user_cache
+
+
+async def worker(worker_id: int, operations: int, write_ratio: float) -> None:
+    writes = int(operations * write_ratio)
+    for operation in range(operations):
+        user_id = worker_id * operations + operation
+        if operation < writes:
+            await add_user(user_id, 1)
+        else:
+            await get_user_access_level(user_id - writes)
+
+
+async def measure(name: str, engine, workers: int, operations: int, write_ratio: float) -> None:
+    # Point the DAO at the engine of the profile
+    database.engine = engine
+    database.async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await database.create_db_and_tables()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(worker_id, operations, write_ratio) for worker_id in range(workers)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    total = workers * operations
+    print(f"{name:<8} {total:>6} operations in {elapsed:6.2f}s  ({total / elapsed:8,.0f} operations per second)")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=20, help="Number of concurrent workers")
+    parser.add_argument("--operations", type=int, default=200, help="Number of operations per worker")
+    parser.add_argument("--write-ratio", type=float, default=0.5, help="Share of add_user calls, the rest are reads")
+    args = parser.parse_args()
+
+    user_cache.maxsize = 0
+    print(f"{args.workers} workers, {args.operations} operations each, {args.write_ratio:.0%} writes")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        default_url = f"sqlite+aiosqlite:///{temp_dir}/default.db"
+        await measure("default", create_async_engine(default_url), args.workers, args.operations, args.write_ratio)
+
+        tuned_url = f"sqlite+aiosqlite:///{temp_dir}/tuned.db"
+        await measure("tuned", database.build_engine(tuned_url), args.workers, args.operations, args.write_ratio)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,117 @@
+"""
+Benchmark of a broadcast against a simulated Telegram API enforcing the flood limits.
+
+The simulated API accepts 30 messages per second in total and answers further messages with a
+429 error (retry_after). While a plugin broadcasts a message to every user, users keep chatting
+with the bot and expect quick replies:
+
+* direct      - the plugin sends the messages one after the other, as in the daily_task example
+* rate limiter - the messages go through bot.middlewares.RateLimiter, the broadcast in the bulk lane
+
+For each strategy it reports the broadcast time, the flood errors, the lost messages and the
+latency of the replies sent during the broadcast.
+
+Usage: python -m benchmarks.outbound_rate_limit [--users 300] [--replies 20]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+from collections import deque
+
+# The bot configuration is required to import the bot package
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("OWNER_ID", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage
+from bot.middlewares import RateLimiter, bulk_sending
+
+# Round trip of a request to the Bot API
+REQUEST_LATENCY = 0.01
+GLOBAL_LIMIT = 30
+
+
+class SimulatedTelegram:
+    """Accepts GLOBAL_LIMIT messages per second, like the Bot API."""
+    def __init__(self):
+        self.sent = deque()
+        self.flood_errors = 0
+
+    async def make_request(self, bot, method):
+        await asyncio.sleep(REQUEST_LATENCY)
+        now = time.monotonic()
+        while self.sent and self.sent[0] <= now - 1:
+            self.sent.popleft()
+        if len(self.sent) >= GLOBAL_LIMIT:
+            self.flood_errors += 1
+            raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=1)
+        self.sent.append(now)
+        return True
+
+
+async def measure(name: str, use_limiter: bool, args: argparse.Namespace) -> None:
+    telegram = SimulatedTelegram()
+    limiter = RateLimiter()
+    bot = Bot(token=os.environ["BOT_TOKEN"])
+    lost = 0
+
+    async def send(chat_id: int, text: str) -> bool:
+        nonlocal lost
+        method = SendMessage(chat_id=chat_id, text=text)
+        try:
+            if use_limiter:
+                await limiter(telegram.make_request, bot, method)
+            else:
+                await telegram.make_request(bot, method)
+            return True
+        except TelegramRetryAfter:
+            lost += 1
+            return False
+
+    async def broadcast() -> float:
+        started = time.perf_counter()
+        with bulk_sending():
+            if use_limiter:
+                # The rate limiter paces the messages, they can be sent concurrently
+                await asyncio.gather(*(send(user_id, "news") for user_id in range(1, args.users + 1)))
+            else:
+                for user_id in range(1, args.users + 1):
+                    await send(user_id, "news")
+        return time.perf_counter() - started
+
+    async def replies() -> list:
+        latencies = []
+        for reply in range(args.replies):
+            await asyncio.sleep(0.25)
+            started = time.perf_counter()
+            if await send(100000 + reply, "reply"):
+                latencies.append(time.perf_counter() - started)
+        return latencies
+
+    duration, latencies = await asyncio.gather(broadcast(), replies())
+    latencies.sort()
+    p50 = f"{latencies[len(latencies) // 2] * 1000:7.1f} ms" if latencies else "      -   "
+    print(
+        f"{name:<13} broadcast: {duration:6.2f} s  flood errors: {telegram.flood_errors:4}  lost messages: {lost:4}  "
+        f"replies delivered: {len(latencies)}/{args.replies}, p50 latency: {p50}"
+    )
+    await bot.session.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=300, help="Number of users receiving the broadcast")
+    parser.add_argument("--replies", type=int, default=20, help="Replies sent during the broadcast, one every 250 ms")
+    args = parser.parse_args()
+
+    print(f"Broadcasting to {args.users} users with {args.replies} replies to other users in the meantime")
+    await measure("direct", False, args)
+    await measure("rate limiter", True, args)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
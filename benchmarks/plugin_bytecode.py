@@ -0,0 +1,97 @@
+"""
+Benchmark for the plugin bytecode cache.
+
+Loads synthetic plugins from a read-only style setup (no __pycache__ is written) three ways:
+the legacy importlib loader, load_plugin_module() with an empty cache (compile and store),
+and load_plugin_module() with a warm cache (no compilation at all).
+
+Usage: python -m benchmarks.plugin_bytecode [--plugins 100] [--handlers 50]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import importlib.util
+from pathlib import Path
+
+# The bot configuration is required to import the bot package
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("OWNER_ID", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from bot.config import config
+from bot.plugins import load_plugin_module
+
+HEADER_TEMPLATE = '''PLUGIN_METADATA = {{
+    "name": "{name}",
+    "title": "{name}",
+    "version": "1.0.0",
+    "description": "Synthetic benchmark plugin.",
+    "dependencies": []
+}}
+
+from aiogram import Router, F
+
+router = Router()
+'''
+
+HANDLER_TEMPLATE = '''
+@router.message(F.text == "{name}_{index}")
+async def {name}_button_{index}(message):
+    """Answers the button {index} with a formatted text."""
+    values = [value * {index} for value in range(10) if value % 2]
+    text = ", ".join(str(value) for value in values)
+    await message.answer(f"{name} {index}: {{text}}")
+
+{name}_button_{index}.meta = {{"name": "{name}_{index}", "type": "button", "description": "Benchmark button."}}
+'''
+
+
+def legacy_load(plugin_name: str, plugin_path: str) -> None:
+    spec = importlib.util.spec_from_file_location(plugin_name, plugin_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+
+def measure(name: str, load, plugins: list) -> float:
+    started = time.perf_counter()
+    for plugin_name, plugin_path in plugins:
+        load(plugin_name, plugin_path)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<28} {elapsed:.3f}s  ({elapsed / len(plugins) * 1000:.2f} ms per plugin)")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plugins", type=int, default=100, help="Number of synthetic plugins")
+    parser.add_argument("--handlers", type=int, default=50, help="Number of handlers per plugin")
+    args = parser.parse_args()
+
+    # Like a read-only plugins directory: no __pycache__ is written or used
+    sys.dont_write_bytecode = True
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        plugins_dir = Path(temp_dir) / "plugins"
+        plugins_dir.mkdir()
+        config.PLUGIN_CACHE_DIR = Path(temp_dir) / "cache"
+
+        plugins = []
+        for index in range(args.plugins):
+            name = f"bench_plugin_{index}"
+            source = HEADER_TEMPLATE.format(name=name)
+            source += "".join(HANDLER_TEMPLATE.format(name=name, index=handler) for handler in range(args.handlers))
+            plugin_path = plugins_dir / f"{name}.py"
+            plugin_path.write_text(source, encoding="utf-8")
+            plugins.append((name, str(plugin_path)))
+
+        print(f"Loading {args.plugins} plugins with {args.handlers} handlers each")
+        legacy = measure("legacy (compile every boot)", legacy_load, plugins)
+        measure("cold cache (compile, store)", load_plugin_module, plugins)
+        warm = measure("warm cache", load_plugin_module, plugins)
+        print(f"Warm cache saves {legacy - warm:.3f}s per boot ({(1 - warm / legacy) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""
+Benchmark for the in-memory validation of uploaded plugins.
+
+Parses synthetic plugin sources with parse_plugin_source() and reports how many plugins are validated per second.
+
+Usage: python -m benchmarks.plugin_parsing [--plugins 500] [--handlers 20]
+"""
+import os
+import sys
+import time
+import argparse
+
+# The bot configuration is required to import the bot package
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("OWNER_ID", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from bot.plugins import parse_plugin_source
+
+HEADER_TEMPLATE = '''PLUGIN_METADATA = {{
+    "name": "{name}",
+    "title": "{name}",
+    "version": "1.0.0",
+    "description": "Synthetic benchmark plugin.",
+    "dependencies": ["requests>=2.0"],
+    "settings": {{"limits": {{"daily": 10, "hourly": 2}}}}
+}}
+
+from aiogram import Router, F
+
+router = Router()
+'''
+
+HANDLER_TEMPLATE = '''
+@router.message(F.text == "{name}_{index}")
+async def {name}_button_{index}(message):
+    await message.answer("{name} {index}")
+
+{name}_button_{index}.meta = {{"name": "{name}_{index}", "type": "button", "description": "Benchmark button."}}
+'''
+
+
+def create_source(name: str, handlers: int) -> bytes:
+    source = HEADER_TEMPLATE.format(name=name)
+    source += "".join(HANDLER_TEMPLATE.format(name=name, index=index) for index in range(handlers))
+    return source.encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plugins", type=int, default=500, help="Number of synthetic plugins")
+    parser.add_argument("--handlers", type=int, default=20, help="Number of handlers per plugin")
+    args = parser.parse_args()
+
+    sources = [create_source(f"bench_plugin_{index}", args.handlers) for index in range(args.plugins)]
+    source_size = sum(len(source) for source in sources)
+
+    started = time.perf_counter()
+    for source in sources:
+        parse_plugin_source(source)
+    elapsed = time.perf_counter() - started
+
+    print(f"Parsed {args.plugins} plugins ({source_size / 1024:.0f} KiB, {args.handlers} handlers each) in {elapsed:.3f}s")
+    print(f"{args.plugins / elapsed:.0f} plugins per second, {elapsed / args.plugins * 1000:.2f} ms per plugin")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
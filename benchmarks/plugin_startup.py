@@ -0,0 +1,112 @@
+"""
+Startup benchmark for the plugin loading pipeline.
+
+Generates synthetic plugins with a simulated heavy import and compares the number of times each
+plugin file is executed, and the wall time, between the legacy pipeline (metadata scan, synchronization
+and router registration each importing the module) and the current PluginManager.load_plugins().
+
+Usage: python -m benchmarks.plugin_startup [--plugins 50] [--import-delay 0.01]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+# The bot configuration is required to import the bot package
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("OWNER_ID", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from aiogram import Dispatcher
+from bot.config import config
+from bot.plugins import PluginManager, get_plugin_metadata, load_plugin_module
+
+PLUGIN_TEMPLATE = '''PLUGIN_METADATA = {{
+    "name": "{name}",
+    "title": "{name}",
+    "version": "1.0.0",
+    "description": "Synthetic benchmark plugin.",
+    "dependencies": []
+}}
+
+import os
+import time
+from aiogram import Router, F
+
+# Record every execution of the module body and simulate a heavy import
+with open(os.environ["PLUGIN_BENCH_IMPORT_LOG"], "a") as import_log:
+    import_log.write("{name}\\n")
+time.sleep({delay})
+
+router = Router()
+
+@router.message(F.text == "{name}")
+async def {name}_button(message):
+    await message.answer("{name}")
+
+{name}_button.meta = {{"name": "{name}", "type": "button", "description": "Benchmark button."}}
+'''
+
+
+def create_plugins(plugins_dir: Path, count: int, delay: float) -> None:
+    for index in range(count):
+        name = f"bench_plugin_{index}"
+        (plugins_dir / f"{name}.py").write_text(PLUGIN_TEMPLATE.format(name=name, delay=delay), encoding="utf-8")
+
+
+def read_import_count(import_log: Path) -> int:
+    if not import_log.exists():
+        return 0
+    return len(import_log.read_text().splitlines())
+
+
+async def legacy_load(plugin_names: list) -> None:
+    # Scan, synchronization and registration each imported the plugin module
+    for plugin_name in plugin_names:
+        get_plugin_metadata(plugin_name)
+    for plugin_name in plugin_names:
+        get_plugin_metadata(plugin_name)
+    for plugin_name in plugin_names:
+        load_plugin_module(plugin_name, os.path.join(config.PLUGINS_DIR, f"{plugin_name}.py"))
+
+
+async def current_load() -> None:
+    await PluginManager(Dispatcher(), None).load_plugins()
+
+
+async def measure(name: str, load, import_log: Path, plugin_count: int) -> None:
+    import_log.unlink(missing_ok=True)
+    started = time.perf_counter()
+    await load()
+    elapsed = time.perf_counter() - started
+    imports = read_import_count(import_log)
+    print(f"{name:<8} imports: {imports:>5} ({imports / plugin_count:.1f} per plugin)  wall time: {elapsed:.3f}s")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plugins", type=int, default=50, help="Number of synthetic plugins")
+    parser.add_argument("--import-delay", type=float, default=0.01, help="Simulated import time of a plugin, in seconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        plugins_dir = Path(temp_dir) / "plugins"
+        plugins_dir.mkdir()
+        create_plugins(plugins_dir, args.plugins, args.import_delay)
+
+        import_log = Path(temp_dir) / "imports.log"
+        os.environ["PLUGIN_BENCH_IMPORT_LOG"] = str(import_log)
+        config.PLUGINS_DIR = plugins_dir
+        config.PLUGIN_CACHE_DIR = Path(temp_dir) / "cache"
+
+        plugin_names = [f"bench_plugin_{index}" for index in range(args.plugins)]
+        print(f"Loading {args.plugins} plugins with a simulated import time of {args.import_delay}s each")
+        await measure("before", lambda: legacy_load(plugin_names), import_log, args.plugins)
+        await measure("after", current_load, import_log, args.plugins)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,78 @@
+"""
+Benchmark of the plugin key-value storage with counters updated on every message.
+
+Compares a naive plugin that reads and commits its counter in its own session for every message with
+PluginStorage, which serves reads from its cache and stores the coalesced writes in batches.
+
+Usage: python -m benchmarks.plugin_storage [--messages 5000] [--counters 100]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+# The bot configuration is required to import the bot package, the database is a temporary file
+temp_dir = tempfile.TemporaryDirectory()
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("OWNER_ID", "1")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{temp_dir.name}/benchmark.db")
+
+from sqlalchemy import event
+from bot.models import PluginData
+from bot.db import PluginStorage, plugin_data_buffer
+from bot.db.database import engine, get_session, create_db_and_tables
+
+
+async def naive_increment(key: str) -> None:
+    async for session in get_session():
+        row = await session.get(PluginData, ("naive_plugin", key))
+        if row is None:
+            session.add(PluginData(namespace="naive_plugin", key=key, value=1))
+        else:
+            row.value += 1
+        await session.commit()
+
+
+async def measure(name: str, increment, messages: int, counters: int) -> None:
+    statements = 0
+
+    def count_statement(*args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_statement)
+    started = time.perf_counter()
+    for message in range(messages):
+        await increment(f"counter:{message % counters}")
+    await plugin_data_buffer.flush()
+    elapsed = time.perf_counter() - started
+    event.remove(engine.sync_engine, "before_cursor_execute", count_statement)
+
+    print(f"{name:<14} {messages / elapsed:10,.0f} messages per second  SQL statements: {statements}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000, help="Number of counter updates")
+    parser.add_argument("--counters", type=int, default=100, help="Number of distinct counters")
+    args = parser.parse_args()
+
+    await create_db_and_tables()
+    storage = PluginStorage("storage_plugin")
+
+    async def storage_increment(key: str) -> None:
+        await storage.set(key, await storage.get(key, 0) + 1)
+
+    print(f"{args.messages} counter updates over {args.counters} counters")
+    await measure("naive session", naive_increment, args.messages, args.counters)
+    await measure("PluginStorage", storage_increment, args.messages, args.counters)
+    await plugin_data_buffer.close()
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(asyncio.run(main()))
+    finally:
+        temp_dir.cleanup()
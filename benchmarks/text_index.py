@@ -0,0 +1,117 @@
+"""
+Benchmark of the routing of reply keyboard buttons with and without the exact text index.
+
+Registers core-like menus (commands, a state handler and text buttons) and plugin routers with
+`F.text == "..."` buttons (500 by default), then feeds button presses through the dispatcher:
+
+* filter chain - aiogram checks the filters of every handler of every router in order
+* text index   - bot.plugins.ExactTextIndex only checks the handlers indexed for the text and the unindexed ones
+
+Usage: python -m benchmarks.text_index [--buttons 500] [--buttons-per-plugin 10] [--updates 500]
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+
+# The bot configuration is required to import the bot package
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("OWNER_ID", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from aiogram import Bot, Dispatcher, Router, F, BaseMiddleware
+from aiogram.filters import Command, CommandStart
+from aiogram.fsm.state import State, StatesGroup
+from aiogram.types import Update, Message, Chat, User
+from bot.plugins import ExactTextIndex
+
+CORE_BUTTONS = ["🧭 Commands", "🔌 Plugin List", "📤 Upload Plugin", "⚙️ Settings", "ℹ️ Information", "🔄 Reboot", "📝 Logs", "🔙 Back to Main Menu"]
+
+
+class UploadState(StatesGroup):
+    waiting_for_file = State()
+
+
+class Passthrough(BaseMiddleware):
+    """Stands for the AccessLevel middleware of the core routers."""
+    async def __call__(self, handler, event, data):
+        return await handler(event, data)
+
+
+async def button(message: Message) -> None:
+    pass
+
+
+def build_dispatcher(indexed: bool, buttons: int, buttons_per_plugin: int) -> Dispatcher:
+    core = Router()
+    core.message.middleware(Passthrough())
+    core.message.register(button, CommandStart())
+    core.message.register(button, Command("info"))
+    core.message.register(button, UploadState.waiting_for_file)
+    for text in CORE_BUTTONS:
+        core.message.register(button, F.text == text)
+
+    dispatcher = Dispatcher()
+    if indexed:
+        dispatcher.message.outer_middleware(ExactTextIndex(dispatcher))
+    dispatcher.include_router(core)
+
+    for first in range(0, buttons, buttons_per_plugin):
+        plugin = Router()
+        for number in range(first, min(first + buttons_per_plugin, buttons)):
+            plugin.message.register(button, F.text == f"Button {number}")
+        dispatcher.include_router(plugin)
+    return dispatcher
+
+
+def build_update(update_id: int, text: str) -> Update:
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id,
+        date=datetime.now(),
+        chat=Chat(id=1, type="private"),
+        from_user=User(id=1, is_bot=False, first_name="Benchmark"),
+        text=text
+    ))
+
+
+async def measure(dispatcher: Dispatcher, bot: Bot, text: str, updates: int) -> float:
+    batch = [build_update(update_id, text) for update_id in range(updates)]
+    started = time.perf_counter()
+    for update in batch:
+        await dispatcher.feed_update(bot, update)
+    return (time.perf_counter() - started) / updates * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buttons", type=int, default=500, help="Number of plugin buttons")
+    parser.add_argument("--buttons-per-plugin", type=int, default=10, help="Buttons registered by each plugin router")
+    parser.add_argument("--updates", type=int, default=500, help="Updates fed per case")
+    args = parser.parse_args()
+
+    # Every handled update is logged at the INFO level
+    logging.getLogger("aiogram").setLevel(logging.WARNING)
+
+    bot = Bot(token=os.environ["BOT_TOKEN"])
+    dispatchers = {indexed: build_dispatcher(indexed, args.buttons, args.buttons_per_plugin) for indexed in (False, True)}
+    cases = {
+        "core button": "⚙️ Settings",
+        "first plugin button": "Button 0",
+        "last plugin button": f"Button {args.buttons - 1}",
+        "unknown text": "hello",
+    }
+
+    print(f"{args.buttons} plugin buttons in {-(-args.buttons // args.buttons_per_plugin)} routers, microseconds per update")
+    print(f"{'case':<22}{'filter chain':>14}{'text index':>12}")
+    for name, text in cases.items():
+        chain = await measure(dispatchers[False], bot, text, args.updates)
+        index = await measure(dispatchers[True], bot, text, args.updates)
+        print(f"{name:<22}{chain:>14.1f}{index:>12.1f}")
+    await bot.session.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
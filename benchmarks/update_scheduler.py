@@ -0,0 +1,114 @@
+"""
+Benchmark of the update processing strategies in polling mode.
+
+Feeds messages from many chats, where the handler takes a random time and one chat is slow,
+and compares:
+
+* sequential - every update is awaited before the next one (handle_as_tasks=False)
+* tasks      - every update runs in its own task (aiogram default), unbounded and without ordering
+* scheduler  - bot.scheduler.UpdateScheduler, chats in parallel and the updates of each chat in order
+
+For each strategy it reports the total time, the p99 latency of the updates of the other chats
+and the number of messages handled out of order within their chat.
+
+Usage: python -m benchmarks.update_scheduler [--chats 50] [--messages 20] [--concurrency 100]
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+
+# The bot configuration is required to import the bot package
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("OWNER_ID", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from aiogram import Bot, Dispatcher, F
+from aiogram.types import Update, Message, Chat, User
+from bot.scheduler import UpdateScheduler
+
+SLOW_CHAT_ID = 0
+
+
+def build_update(update_id: int, chat_id: int) -> Update:
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id,
+        date=datetime.now(),
+        chat=Chat(id=chat_id, type="private"),
+        from_user=User(id=chat_id, is_bot=False, first_name="Benchmark"),
+        text="ping"
+    ))
+
+
+def build_dispatcher(submitted: dict, latencies: list, handled: dict) -> Dispatcher:
+    dispatcher = Dispatcher()
+
+    @dispatcher.message(F.text == "ping")
+    async def ping(message: Message):
+        # Stands for database queries and API calls, the slow chat runs a heavy plugin
+        await asyncio.sleep(0.5 if message.chat.id == SLOW_CHAT_ID else random.uniform(0.001, 0.02))
+        handled.setdefault(message.chat.id, []).append(message.message_id)
+        if message.chat.id != SLOW_CHAT_ID:
+            latencies.append(time.perf_counter() - submitted[message.message_id])
+
+    return dispatcher
+
+
+async def measure(name: str, updates: list, concurrency: int) -> None:
+    submitted, latencies, handled = {}, [], {}
+    dispatcher = build_dispatcher(submitted, latencies, handled)
+    bot = Bot(token=os.environ["BOT_TOKEN"])
+    random.seed(0)
+
+    # All updates arrive at once, like a getUpdates batch during a burst
+    started = time.perf_counter()
+    submitted.update((update.update_id, started) for update in updates)
+    if name == "sequential":
+        for update in updates:
+            await dispatcher.feed_update(bot, update)
+    elif name == "tasks":
+        await asyncio.gather(*(dispatcher.feed_update(bot, update) for update in updates))
+    else:
+        scheduler = UpdateScheduler(dispatcher, bot, concurrency, len(updates))
+        for update in updates:
+            scheduler.submit(update)
+        await scheduler.join()
+    elapsed = time.perf_counter() - started
+
+    out_of_order = sum(
+        sum(1 for previous, current in zip(message_ids, message_ids[1:]) if current < previous)
+        for message_ids in handled.values()
+    )
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:<11} total: {elapsed:6.2f} s  p99 latency of the other chats: {p99 * 1000:8.1f} ms  out of order: {out_of_order}")
+    await bot.session.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chats", type=int, default=50, help="Number of chats, including the slow one")
+    parser.add_argument("--messages", type=int, default=20, help="Messages per chat")
+    parser.add_argument("--concurrency", type=int, default=100, help="Updates processed at the same time by the scheduler")
+    args = parser.parse_args()
+
+    # Every handled update is logged at the INFO level
+    logging.getLogger("aiogram").setLevel(logging.WARNING)
+
+    # Messages of all chats are interleaved, as they arrive from getUpdates
+    updates = [
+        build_update(message * args.chats + chat_id, chat_id)
+        for message in range(args.messages) for chat_id in range(args.chats)
+    ]
+
+    print(f"Feeding {len(updates)} updates from {args.chats} chats, chat {SLOW_CHAT_ID} takes 500 ms per message")
+    for name in ("sequential", "tasks", "scheduler"):
+        await measure(name, updates, args.concurrency)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,78 @@
+"""
+Benchmark of access level filtered user queries before and after the schema migrations.
+
+Creates a users table in the original schema (primary key only) with a realistic distribution of access
+levels, runs the typical filtered queries, applies the migrations and runs them again. The SQLite query
+plans are printed to verify that the access_level index is used.
+
+Usage: python -m benchmarks.user_indexes [--users 1000000]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+# The bot configuration is required to import the bot package
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("OWNER_ID", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from sqlalchemy import create_engine, text
+from bot.db.migrations import apply_migrations
+
+QUERIES = {
+    "admins": "SELECT id FROM users WHERE access_level >= 2",
+    "users": "SELECT id FROM users WHERE access_level >= 1",
+    "users by id": "SELECT id FROM users WHERE access_level >= 1 ORDER BY id",
+    "count users": "SELECT COUNT(*) FROM users WHERE access_level >= 1",
+}
+
+
+def run_queries(connection, name: str, repeat: int) -> None:
+    print(name)
+    for query_name, query in QUERIES.items():
+        started = time.perf_counter()
+        for _ in range(repeat):
+            rows = connection.execute(text(query)).all()
+        elapsed = (time.perf_counter() - started) / repeat
+        plan = " / ".join(row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {query}")))
+        print(f"  {query_name:<12} {elapsed * 1000:9.2f} ms  rows: {len(rows):>7,}  plan: {plan}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000000, help="Number of users")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs of every query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = create_engine(f"sqlite:///{temp_dir}/benchmark.db")
+
+        # Mostly unknown users, a few percent of regular users and a handful of admins
+        random.seed(0)
+        levels = random.choices([0, 1, 2], weights=[95, 4.99, 0.01], k=args.users)
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, access_level INTEGER)"))
+            connection.execute(
+                text("INSERT INTO users (id, access_level) VALUES (:id, :access_level)"),
+                [{"id": user_id, "access_level": level} for user_id, level in enumerate(levels)]
+            )
+
+        with engine.connect() as connection:
+            run_queries(connection, f"Before the migrations ({args.users:,} users)", args.repeat)
+
+        started = time.perf_counter()
+        with engine.begin() as connection:
+            schema_version = apply_migrations(connection)
+        print(f"Migrated to schema version {schema_version} in {time.perf_counter() - started:.2f}s")
+
+        with engine.connect() as connection:
+            connection.execute(text("ANALYZE"))
+            run_queries(connection, "After the migrations", args.repeat)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Benchmark of the database queries issued per update for user access checks.
+
+Feeds updates through a dispatcher with an admin router (AccessLevel(2)) and a plugin router
+(AccessLevel(1)) whose handler needs the user record, and counts the SQL statements executed:
+
+* before - every AccessLevel check and the plugin handler query the database themselves
+* after  - the UserContext outer middleware loads the user once per update, without and with the user cache
+
+Usage: python -m benchmarks.user_queries [--updates 1000]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+from datetime import datetime
+
+# The bot configuration is required to import the bot package
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("OWNER_ID", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from sqlalchemy import event
+from aiogram import Bot, Dispatcher, Router, F
+from aiogram.types import Update, Message, Chat, User
+from bot.db import add_user, get_user, user_cache
+from bot.db.database import engine, create_db_and_tables
+from bot.middlewares import AccessLevel, UserContext
+
+USER_IDS = list(range(100, 120))
+
+
+def build_dispatcher(preload_user: bool) -> Dispatcher:
+    admin_router = Router()
+    admin_router.message.middleware(AccessLevel(2))
+
+    @admin_router.message(F.text == "settings")
+    async def settings(message):
+        pass
+
+    plugin_router = Router()
+    plugin_router.message.middleware(AccessLevel(1))
+
+    if preload_user:
+        @plugin_router.message(F.text == "profile")
+        async def profile(message, user):
+            return user.access_level
+    else:
+        @plugin_router.message(F.text == "profile")
+        async def profile(message):
+            # Plugins had to query the user themselves
+            return (await get_user(message.from_user.id)).access_level
+
+    dispatcher = Dispatcher()
+    if preload_user:
+        dispatcher.update.outer_middleware(UserContext())
+    dispatcher.include_routers(admin_router, plugin_router)
+    return dispatcher
+
+
+def build_update(update_id: int) -> Update:
+    user_id = USER_IDS[update_id % len(USER_IDS)]
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id,
+        date=datetime.now(),
+        chat=Chat(id=user_id, type="private"),
+        from_user=User(id=user_id, is_bot=False, first_name="Benchmark"),
+        text="settings" if update_id % 2 else "profile"
+    ))
+
+
+async def measure(name: str, dispatcher: Dispatcher, bot: Bot, updates: list, cache_size: int) -> None:
+    user_cache.maxsize = cache_size
+    user_cache.invalidate()
+
+    queries = 0
+
+    def count_query(*args):
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count_query)
+    started = time.perf_counter()
+    for update in updates:
+        await dispatcher.feed_update(bot, update)
+    elapsed = time.perf_counter() - started
+    event.remove(engine.sync_engine, "before_cursor_execute", count_query)
+
+    print(f"{name:<22} queries per update: {queries / len(updates):.2f}  updates per second: {len(updates) / elapsed:,.0f}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=1000, help="Number of updates to feed")
+    args = parser.parse_args()
+
+    await create_db_and_tables()
+    for user_id in USER_IDS:
+        await add_user(user_id, 2)
+
+    bot = Bot(token=os.environ["BOT_TOKEN"])
+    updates = [build_update(update_id) for update_id in range(args.updates)]
+    cache_size = user_cache.maxsize
+
+    print(f"Feeding {args.updates} updates from {len(USER_IDS)} users")
+    await measure("before", build_dispatcher(preload_user=False), bot, updates, 0)
+    await measure("after (no cache)", build_dispatcher(preload_user=True), bot, updates, 0)
+    await measure("after (user cache)", build_dispatcher(preload_user=True), bot, updates, cache_size)
+    await bot.session.close()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
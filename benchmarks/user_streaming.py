@@ -0,0 +1,63 @@
+"""
+Benchmark of the bulk user insert and of the memory used to go through all users.
+
+Inserts the users with add_users(), then compares the peak memory and wall time of get_all_users()
+with iter_user_chunks(), which streams the table in fixed-size chunks.
+
+Usage: python -m benchmarks.user_streaming [--users 100000] [--chunk-size 1000]
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+
+# The bot configuration is required to import the bot package, the database is a temporary file
+temp_dir = tempfile.TemporaryDirectory()
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("OWNER_ID", "1")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{temp_dir.name}/benchmark.db")
+
+from bot.db import add_users, get_all_users, iter_user_chunks
+from bot.db.database import create_db_and_tables
+
+
+async def measure(name: str, read_users) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    user_count = await read_users()
+    elapsed = time.perf_counter() - started
+    _, memory_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<18} users: {user_count:>9,}  peak memory: {memory_peak / 1024 / 1024:8.1f} MiB  wall time: {elapsed:.2f}s")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100000, help="Number of users to insert")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Number of users per streamed chunk")
+    args = parser.parse_args()
+
+    await create_db_and_tables()
+
+    started = time.perf_counter()
+    await add_users((user_id, 1) for user_id in range(args.users))
+    print(f"add_users          inserted {args.users:,} users in {time.perf_counter() - started:.2f}s")
+
+    async def read_all() -> int:
+        return len(await get_all_users())
+
+    async def read_chunks() -> int:
+        return sum([len(chunk) async for chunk in iter_user_chunks(args.chunk_size)])
+
+    await measure("get_all_users", read_all)
+    await measure("iter_user_chunks", read_chunks)
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(asyncio.run(main()))
+    finally:
+        temp_dir.cleanup()
@@ -0,0 +1,132 @@
+"""
+Local load test of the webhook server.
+
+Starts the webhook application on localhost with a dispatcher whose handler simulates some work,
+POSTs synthetic message updates from concurrent connections (like Telegram does, up to
+WEBHOOK_MAX_CONNECTIONS) and reports the acknowledged updates per second and the latency of the
+acknowledgements:
+
+* wait     - the request is answered once the update has been processed (aiogram SimpleRequestHandler)
+* fast ack - the request is answered immediately, the update is processed in the background by the update scheduler (bot.webhook)
+
+Usage: python -m benchmarks.webhook_load [--updates 2000] [--connections 40] [--handler-delay 100]
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+
+# The bot configuration is required to import the bot package
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("OWNER_ID", "1")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from aiohttp import ClientSession, TCPConnector, web
+from aiogram import Bot, Dispatcher, F
+from aiogram.types import Update, Message, Chat, User
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+from bot.config import config
+from bot.scheduler import UpdateScheduler
+from bot.webhook import build_webhook_app
+
+SECRET = "benchmark-secret"
+
+
+def build_update(update_id: int) -> dict:
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id,
+        date=datetime.now(),
+        chat=Chat(id=update_id % 1000, type="private"),
+        from_user=User(id=update_id % 1000, is_bot=False, first_name="Benchmark"),
+        text="ping"
+    )).model_dump(mode="json", exclude_none=True)
+
+
+def build_dispatcher(handler_delay: float, processed: list) -> Dispatcher:
+    dispatcher = Dispatcher()
+
+    @dispatcher.message(F.text == "ping")
+    async def ping(message: Message):
+        # Stands for database queries and API calls
+        await asyncio.sleep(handler_delay)
+        processed.append(message.message_id)
+
+    return dispatcher
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def measure(name: str, fast_ack: bool, args: argparse.Namespace) -> None:
+    processed = []
+    dispatcher = build_dispatcher(args.handler_delay / 1000, processed)
+    bot = Bot(token=os.environ["BOT_TOKEN"])
+
+    if fast_ack:
+        app = build_webhook_app(dispatcher, bot, SECRET, UpdateScheduler(dispatcher, bot, config.UPDATE_CONCURRENCY, config.UPDATE_MAX_PENDING))
+    else:
+        app = web.Application()
+        SimpleRequestHandler(dispatcher, bot, handle_in_background=False, secret_token=SECRET).register(app, path=config.WEBHOOK_PATH)
+
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    url = f"http://127.0.0.1:{port}{config.WEBHOOK_PATH}"
+
+    updates = asyncio.Queue()
+    for update_id in range(args.updates):
+        updates.put_nowait(build_update(update_id))
+    latencies = []
+
+    async def connection(session: ClientSession) -> None:
+        while not updates.empty():
+            update = updates.get_nowait()
+            sent = time.perf_counter()
+            async with session.post(url, json=update, headers={"X-Telegram-Bot-Api-Secret-Token": SECRET}) as response:
+                await response.read()
+                assert response.status == 200, response.status
+            latencies.append(time.perf_counter() - sent)
+
+    started = time.perf_counter()
+    async with ClientSession(connector=TCPConnector(limit=args.connections)) as session:
+        await asyncio.gather(*(connection(session) for _ in range(args.connections)))
+    acknowledged = time.perf_counter() - started
+    while len(processed) < args.updates:
+        await asyncio.sleep(0.001)
+    done = time.perf_counter() - started
+
+    await runner.cleanup()
+    print(
+        f"{name:<10} updates per second: {args.updates / acknowledged:>8,.0f}  "
+        f"ack p50: {percentile(latencies, 0.5) * 1000:6.2f} ms  p99: {percentile(latencies, 0.99) * 1000:6.2f} ms  "
+        f"all processed after: {done:.2f} s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=2000, help="Number of updates to send")
+    parser.add_argument("--connections", type=int, default=config.WEBHOOK_MAX_CONNECTIONS, help="Concurrent connections")
+    parser.add_argument("--handler-delay", type=float, default=100.0, help="Milliseconds spent in the handler")
+    args = parser.parse_args()
+
+    # Every handled update is logged at the INFO level
+    logging.getLogger("aiogram").setLevel(logging.WARNING)
+
+    print(
+        f"Sending {args.updates} updates over {args.connections} connections, {args.handler_delay:g} ms per update, "
+        f"at most {config.WEBHOOK_MAX_CONCURRENCY} updates processed at once"
+    )
+    await measure("wait", False, args)
+    await measure("fast ack", True, args)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
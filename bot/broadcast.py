@@ -0,0 +1,232 @@
+import time
+import asyncio
+from typing import Any, Dict, Optional
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError
+from bot.models import Broadcast
+from bot.config import logger
+from bot.middlewares import bulk_sending
+from bot.db import create_broadcast, get_broadcast, get_running_broadcasts, get_broadcast_recipients, save_broadcast_progress
+
+# Attempts of a broadcast interrupted by an error, e.g. an unavailable database, before it is marked as failed
+BROADCAST_MAX_ATTEMPTS = 5
+
+# Seconds before the second attempt, doubled after every failed attempt
+BROADCAST_RETRY_DELAY = 1.0
+
+
+class BroadcastRun:
+    """
+    A broadcast being sent by this process, with the numbers needed for its throughput.
+    """
+    def __init__(self, broadcast: Broadcast):
+        """
+        Initializes the run.
+
+        :param broadcast: The broadcast, its counters are updated as the messages are sent.
+        """
+        self.broadcast = broadcast
+        self.started_at = time.monotonic()
+        self.handled_at_start = broadcast.sent + broadcast.failed
+        self.task: Optional[asyncio.Task] = None
+
+    def progress(self) -> Dict[str, Any]:
+        """
+        Returns the progress of the broadcast.
+
+        :return: A dictionary with the ID, status, sent, failed and total messages, the throughput in
+            messages per second since the run started and the estimated seconds left (None if unknown).
+        """
+        broadcast = self.broadcast
+        handled = broadcast.sent + broadcast.failed
+        elapsed = time.monotonic() - self.started_at
+        throughput = (handled - self.handled_at_start) / elapsed if elapsed > 0 else 0.0
+        remaining = max(broadcast.total - handled, 0)
+        return {
+            "id": broadcast.id,
+            "status": broadcast.status,
+            "sent": broadcast.sent,
+            "failed": broadcast.failed,
+            "total": broadcast.total,
+            "throughput": throughput,
+            "eta": remaining / throughput if throughput > 0 else None
+        }
+
+
+class Broadcaster:
+    """
+    Sends a message to every user, resuming after a restart instead of starting over.
+
+    Recipients are read from the database in ID order, one chunk at a time, and sent with bounded concurrency
+    in the bulk lane of the rate limiter. The last handled user ID is stored after every chunk, so after a
+    crash or a reboot at most one chunk is sent again.
+    """
+    def __init__(self, bot: Bot, concurrency: int, chunk_size: int):
+        """
+        Initializes the broadcaster.
+
+        :param bot: The bot sending the messages.
+        :param concurrency: Maximum number of messages of a broadcast being sent at the same time.
+        :param chunk_size: Number of recipients read and checkpointed together.
+        """
+        self.bot = bot
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.runs: Dict[int, BroadcastRun] = {}
+
+    async def start(self, text: str, parse_mode: Optional[str] = None, min_access_level: int = 1, created_by: Optional[int] = None) -> Broadcast:
+        """
+        Starts sending a message to every user with at least the given access level.
+
+        :param text: The text of the message.
+        :param parse_mode: The parse mode of the text, e.g. HTML.
+        :param min_access_level: Only users with at least this access level receive the message, unauthorized
+            users (level 0) are skipped by default.
+        :param created_by: The ID of the user who started the broadcast.
+        :return: The Broadcast object.
+        """
+        broadcast = await create_broadcast(text, parse_mode, min_access_level, created_by)
+        logger.info(f"Broadcast {broadcast.id} started for {broadcast.total} users.")
+        self._run(broadcast)
+        return broadcast
+
+    async def resume(self) -> None:
+        """
+        Resumes the broadcasts interrupted by a restart, from their last checkpoint.
+
+        :return: None
+        """
+        for broadcast in await get_running_broadcasts():
+            if broadcast.id not in self.runs:
+                logger.info(f"Resuming broadcast {broadcast.id} after user {broadcast.last_user_id}.")
+                self._run(broadcast)
+
+    def _run(self, broadcast: Broadcast) -> None:
+        """
+        Sends a broadcast in the background.
+
+        :param broadcast: The broadcast.
+        :return: None
+        """
+        run = BroadcastRun(broadcast)
+        with bulk_sending():
+            run.task = asyncio.create_task(self._send_all(run))
+        run.task.add_done_callback(lambda task: self.runs.pop(broadcast.id, None))
+        self.runs[broadcast.id] = run
+
+    async def _send_all(self, run: BroadcastRun) -> None:
+        """
+        Sends the broadcast, retrying from the last handled chunk after an error with an increasing delay.
+        The broadcast is marked as failed once all attempts failed.
+
+        :param run: The run of the broadcast.
+        :return: None
+        """
+        broadcast = run.broadcast
+        for attempt in range(1, BROADCAST_MAX_ATTEMPTS + 1):
+            try:
+                await self._send_chunks(broadcast)
+                logger.info(f"Broadcast {broadcast.id} completed: {broadcast.sent} sent, {broadcast.failed} failed.")
+                return
+            except Exception as error:
+                if attempt == BROADCAST_MAX_ATTEMPTS:
+                    logger.error(f"Broadcast {broadcast.id} failed after user {broadcast.last_user_id}: {error}")
+                    break
+
+                delay = BROADCAST_RETRY_DELAY * 2 ** (attempt - 1)
+                logger.warning(f"Broadcast {broadcast.id} stopped after user {broadcast.last_user_id}: {error}. Retrying in {delay:.0f} s.")
+                await asyncio.sleep(delay)
+
+        # Without the failed status, the broadcast would look idle in the menu until the next restart resumes it
+        try:
+            await save_broadcast_progress(broadcast, "failed")
+        except Exception as error:
+            logger.error(f"Broadcast {broadcast.id} could not be marked as failed: {error}")
+
+    async def _send_chunks(self, broadcast: Broadcast) -> None:
+        """
+        Sends the broadcast chunk by chunk from its last checkpoint, storing a checkpoint after every chunk.
+
+        :param broadcast: The broadcast.
+        :return: None
+        """
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            user_ids = await get_broadcast_recipients(broadcast, self.chunk_size)
+            if not user_ids:
+                break
+
+            counters = (broadcast.sent, broadcast.failed)
+            results = await asyncio.gather(*(self._send(broadcast, user_id, slots) for user_id in user_ids), return_exceptions=True)
+            errors = [result for result in results if isinstance(result, Exception)]
+            if errors:
+                # The whole chunk is sent again by the next attempt, so it must not be counted twice
+                broadcast.sent, broadcast.failed = counters
+                raise errors[0]
+
+            broadcast.last_user_id = user_ids[-1]
+            await save_broadcast_progress(broadcast)
+
+        await save_broadcast_progress(broadcast, "completed")
+
+    async def _send(self, broadcast: Broadcast, user_id: int, slots: asyncio.Semaphore) -> None:
+        """
+        Sends the message of a broadcast to a user, counting users who blocked the bot as failed.
+
+        :param broadcast: The broadcast.
+        :param user_id: The ID of the user.
+        :param slots: The semaphore bounding the messages sent at the same time.
+        :return: None
+        """
+        async with slots:
+            try:
+                await self.bot.send_message(chat_id=user_id, text=broadcast.text, parse_mode=broadcast.parse_mode)
+                broadcast.sent += 1
+            except TelegramAPIError as error:
+                broadcast.failed += 1
+                logger.debug(f"Broadcast {broadcast.id} could not be sent to user {user_id}: {error}")
+
+    async def progress(self, broadcast_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Returns the progress of a broadcast, see BroadcastRun.progress().
+
+        :param broadcast_id: The ID of the broadcast.
+        :return: The progress, or None if the broadcast does not exist.
+        """
+        run = self.runs.get(broadcast_id)
+        if run is None:
+            broadcast = await get_broadcast(broadcast_id)
+            if broadcast is None:
+                return None
+            run = BroadcastRun(broadcast)
+        return run.progress()
+
+    async def cancel(self, broadcast_id: int) -> bool:
+        """
+        Stops a broadcast for good.
+
+        :param broadcast_id: The ID of the broadcast.
+        :return: True if the broadcast was running, False otherwise.
+        """
+        run = self.runs.get(broadcast_id)
+        broadcast = run.broadcast if run else await get_broadcast(broadcast_id)
+        if broadcast is None or broadcast.status != "running":
+            return False
+
+        if run is not None:
+            run.task.cancel()
+            await asyncio.gather(run.task, return_exceptions=True)
+        await save_broadcast_progress(broadcast, "cancelled")
+        logger.info(f"Broadcast {broadcast.id} cancelled: {broadcast.sent} sent, {broadcast.failed} failed.")
+        return True
+
+    async def stop(self) -> None:
+        """
+        Stops the broadcasts on shutdown. They stay running and resume from their last checkpoint on the next start.
+
+        :return: None
+        """
+        tasks = [run.task for run in self.runs.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
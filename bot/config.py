@@ -1,7 +1,7 @@
 import io
 import sys
 import logging
-from typing import Any
+from typing import Any, Optional
 from pathlib import Path
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings
@@ -11,10 +11,60 @@ class Config(BaseSettings):
     BOT_TOKEN: str
     OWNER_ID: int
     DATABASE_URL: str
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_PRE_PING: bool = False
+    SQLITE_JOURNAL_MODE: str = "WAL"  # Empty to keep the SQLite defaults
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # Bytes
+    SQLITE_CACHE_SIZE: int = -64000  # Negative values are KiB, positive values are pages
+    SQLITE_BUSY_TIMEOUT: int = 5000  # Milliseconds
 
     LOG_LEVEL: str = "INFO" 
     PLUGIN_NAME_REGEX: str = r"^[a-zA-Z0-9_]+$"
     PLUGINS_DIR: Any = Path(__file__).resolve().parent / 'custom_plugins'
+    PLUGIN_CACHE_DIR: Any = Path(__file__).resolve().parent.parent / 'db' / 'plugin_cache'
+    PLUGIN_BYTECODE_DIR: Any = None  # Defaults to PLUGIN_CACHE_DIR / 'bytecode'
+    PLUGIN_LAZY_LOADING: bool = False
+    PLUGIN_WATCHER: bool = False
+    PLUGIN_WATCHER_MODE: str = "auto"  # auto, inotify or polling
+    PLUGIN_WATCHER_DEBOUNCE: float = 1.0
+    PLUGIN_WATCHER_POLL_INTERVAL: float = 2.0
+    USER_CACHE_SIZE: int = 10000  # 0 disables the cache
+    USER_CACHE_TTL: float = 300.0
+    USER_REGISTRATION_BATCH_SIZE: int = 500
+    USER_REGISTRATION_FLUSH_INTERVAL: float = 5.0
+    PLUGIN_STORAGE_CACHE_SIZE: int = 10000  # 0 disables the cache
+    PLUGIN_STORAGE_CACHE_TTL: float = 300.0
+    PLUGIN_STORAGE_BATCH_SIZE: int = 500
+    PLUGIN_STORAGE_FLUSH_INTERVAL: float = 1.0
+    ACTIVITY_TRACKING: bool = True
+    ACTIVITY_BATCH_SIZE: int = 5000
+    ACTIVITY_FLUSH_INTERVAL: float = 60.0
+    ACTIVITY_MAX_PENDING: int = 100000
+    FSM_STORAGE: str = "database"  # database or memory
+    FSM_CACHE_SIZE: int = 10000  # 0 disables the cache
+    FSM_CACHE_TTL: float = 600.0
+    FSM_FLUSH_INTERVAL: float = 1.0
+
+    UPDATE_CONCURRENCY: int = 100  # Updates processed at the same time in polling mode, 1 processes them one by one
+    UPDATE_MAX_PENDING: int = 1000  # Waiting updates above which polling pauses
+    RATE_LIMIT: bool = True  # Keep the outbound messages within the Telegram limits
+    RATE_LIMIT_GLOBAL: float = 30.0  # Messages per second
+    RATE_LIMIT_PRIVATE: float = 1.0  # Messages per second to a private chat
+    RATE_LIMIT_GROUP: float = 20.0  # Messages per minute to a group or channel
+    RATE_LIMIT_CHAT_BURST: float = 3.0
+    RATE_LIMIT_MAX_RETRIES: int = 3
+    BROADCAST_CONCURRENCY: int = 10  # Messages of a broadcast sent at the same time
+    BROADCAST_CHUNK_SIZE: int = 100  # Recipients per checkpoint, at most this many are sent twice after a crash
+    BROADCAST_PROGRESS_INTERVAL: float = 5.0  # Seconds between two updates of the progress message
+    WEBHOOK_URL: Optional[str] = None  # Public base URL, e.g. https://bot.example.com
+    WEBHOOK_PATH: str = "/webhook"
+    WEBHOOK_HOST: str = "0.0.0.0"
+    WEBHOOK_PORT: int = 8080
+    WEBHOOK_SECRET: Optional[str] = None  # Generated on every start if empty
+    WEBHOOK_MAX_CONCURRENCY: int = 100  # Updates processed at the same time
+    WEBHOOK_MAX_CONNECTIONS: int = 40  # Connections opened by Telegram, 1-100
 
     VERSION: str = "1.1.0"
 
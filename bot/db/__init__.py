@@ -1 +1,5 @@
-from .user import add_user, get_user_access_level, get_all_users
+from .user import add_user, add_users, iter_user_chunks, get_user, set_user_access_level, get_user_access_level, get_all_users, user_cache, registration_queue
+from .plugin_storage import PluginStorage, plugin_data_buffer, plugin_data_cache
+from .fsm_storage import DatabaseStorage
+from .activity import activity_tracker, get_user_activity
+from .broadcast import create_broadcast, get_broadcast, get_running_broadcasts, get_broadcast_recipients, save_broadcast_progress
@@ -0,0 +1,64 @@
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+from bot.models import UserActivity
+from bot.config import config, logger
+from .buffer import WriteBehindBuffer
+from .database import get_session, insert_or_update_rows
+
+
+class ActivityTracker(WriteBehindBuffer):
+    """
+    Aggregates the activity of the users in memory and stores it with one upsert per flush.
+
+    Memory is bounded by the batch size, as a full buffer is flushed immediately, and by ACTIVITY_MAX_PENDING
+    while the database is unavailable.
+    """
+    def track(self, user_id: int, messages: int = 1) -> None:
+        """
+        Records an update received from a user.
+
+        :param user_id: The ID of the user.
+        :param messages: Number of messages in the update.
+        :return: None
+        """
+        self.add(user_id, (time.time(), messages))
+
+    def _merge(self, pending_value: Tuple[float, int], value: Tuple[float, int]) -> Tuple[float, int]:
+        """
+        Keeps the latest time and adds up the messages.
+        """
+        return max(pending_value[0], value[0]), pending_value[1] + value[1]
+
+    async def _write(self, batch: Dict[Hashable, Any]) -> None:
+        """
+        Upserts the last seen time and adds the new messages to the stored count of every user.
+
+        :param batch: The (last_seen, messages) pairs by user ID.
+        :return: None
+        """
+        async for session in get_session():
+            await insert_or_update_rows(
+                session, UserActivity, ["user_id"], ["last_seen"],
+                [{"user_id": user_id, "last_seen": last_seen, "message_count": messages} for user_id, (last_seen, messages) in batch.items()],
+                ["message_count"]
+            )
+            await session.commit()
+        logger.debug(f"Stored the activity of {len(batch)} users.")
+
+
+# Activity of the users since the last flush, flushed on shutdown
+activity_tracker = ActivityTracker(config.ACTIVITY_BATCH_SIZE, config.ACTIVITY_FLUSH_INTERVAL, config.ACTIVITY_MAX_PENDING)
+
+
+# Getting the activity of a user
+async def get_user_activity(user_id: int) -> Optional[UserActivity]:
+    """
+    Retrieves the stored activity of a user. Activity that has not been flushed yet is not included.
+
+    :param user_id: The ID of the user.
+    :return: The UserActivity object, or None if no activity has been stored.
+    """
+    activity = None
+    async for session in get_session():
+        activity = await session.get(UserActivity, user_id)
+    return activity
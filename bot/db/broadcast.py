@@ -0,0 +1,109 @@
+import time
+from typing import List, Optional
+from sqlalchemy import func, update
+from sqlalchemy.future import select
+from bot.models import Broadcast, User
+from .database import get_session
+
+
+# Creating a broadcast
+async def create_broadcast(text: str, parse_mode: Optional[str] = None, min_access_level: int = 1, created_by: Optional[int] = None) -> Broadcast:
+    """
+    Records a new broadcast with the number of its recipients.
+
+    :param text: The text of the message.
+    :param parse_mode: The parse mode of the text, e.g. HTML.
+    :param min_access_level: Only users with at least this access level receive the message.
+    :param created_by: The ID of the user who started the broadcast.
+    :return: The Broadcast object.
+    """
+    broadcast = None
+    async for session in get_session():
+        total = await session.scalar(select(func.count()).select_from(User).where(User.access_level >= min_access_level))
+        broadcast = Broadcast(
+            text=text,
+            parse_mode=parse_mode,
+            min_access_level=min_access_level,
+            status="running",
+            last_user_id=0,
+            sent=0,
+            failed=0,
+            total=total,
+            created_by=created_by,
+            created_at=time.time()
+        )
+        session.add(broadcast)
+        await session.commit()
+        await session.refresh(broadcast)
+    return broadcast
+
+
+# Getting a broadcast
+async def get_broadcast(broadcast_id: int) -> Optional[Broadcast]:
+    """
+    Retrieves a broadcast.
+
+    :param broadcast_id: The ID of the broadcast.
+    :return: The Broadcast object, or None if it does not exist.
+    """
+    broadcast = None
+    async for session in get_session():
+        broadcast = await session.get(Broadcast, broadcast_id)
+    return broadcast
+
+
+# Getting the broadcasts interrupted by a restart
+async def get_running_broadcasts() -> List[Broadcast]:
+    """
+    Retrieves the broadcasts that have not been completed or cancelled.
+
+    :return: A list of Broadcast objects, oldest first.
+    """
+    broadcasts = []
+    async for session in get_session():
+        result = await session.execute(select(Broadcast).where(Broadcast.status == "running").order_by(Broadcast.id))
+        broadcasts = list(result.scalars().all())
+    return broadcasts
+
+
+# Getting the next recipients of a broadcast
+async def get_broadcast_recipients(broadcast: Broadcast, limit: int) -> List[int]:
+    """
+    Returns the IDs of the next recipients after the checkpoint of the broadcast, in ID order.
+
+    Each call is a short keyset query, so no transaction stays open while the messages are sent.
+
+    :param broadcast: The broadcast.
+    :param limit: Maximum number of IDs returned.
+    :return: The user IDs.
+    """
+    user_ids = []
+    async for session in get_session():
+        result = await session.execute(
+            select(User.id)
+            .where(User.id > broadcast.last_user_id, User.access_level >= broadcast.min_access_level)
+            .order_by(User.id)
+            .limit(limit)
+        )
+        user_ids = list(result.scalars().all())
+    return user_ids
+
+
+# Saving the progress of a broadcast
+async def save_broadcast_progress(broadcast: Broadcast, status: Optional[str] = None) -> None:
+    """
+    Stores the checkpoint and the counters of a broadcast, and its status if given.
+
+    :param broadcast: The broadcast with its current progress.
+    :param status: The new status, e.g. completed or cancelled.
+    :return: None
+    """
+    values = {"last_user_id": broadcast.last_user_id, "sent": broadcast.sent, "failed": broadcast.failed}
+    if status is not None:
+        broadcast.status = status
+        broadcast.finished_at = time.time()
+        values.update(status=status, finished_at=broadcast.finished_at)
+
+    async for session in get_session():
+        await session.execute(update(Broadcast).where(Broadcast.id == broadcast.id).values(**values))
+        await session.commit()
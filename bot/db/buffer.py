@@ -0,0 +1,199 @@
+import asyncio
+import itertools
+from typing import Any, Dict, Hashable, Optional
+from sqlalchemy.exc import DBAPIError
+from bot.config import logger
+
+# Longest delay between two flushes while the database keeps failing
+MAX_RETRY_DELAY = 300.0
+
+
+def is_database_unavailable(error: Exception) -> bool:
+    """
+    Tells whether a failed write is worth retrying as is, because the database failed rather than the written values.
+
+    :param error: The exception raised by the write.
+    :return: True for errors of the database or the connection, False for invalid values.
+    """
+    return isinstance(error, (DBAPIError, OSError))
+
+
+class WriteBehindBuffer:
+    """
+    Collects writes in memory and stores them in bulk, once the buffer is full or after a delay.
+
+    Writes for the same key are merged, only the last value is stored. Subclasses implement _write().
+    While the database fails, flushes are retried with an increasing delay, and the oldest writes are dropped
+    once more than max_pending keys are waiting.
+    """
+    def __init__(self, max_size: int, flush_interval: float, max_pending: Optional[int] = None):
+        """
+        Initializes an empty buffer.
+
+        :param max_size: Number of pending keys that triggers a flush.
+        :param flush_interval: Maximum number of seconds a write stays in memory.
+        :param max_pending: Number of pending keys kept while the database fails, None to keep them all.
+        """
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.flush_count = 0
+        self.failure_count = 0
+        self.dropped_count = 0
+        self._pending: Dict[Hashable, Any] = {}
+        self._flushing: Dict[Hashable, Any] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def add(self, key: Hashable, value: Any = None) -> None:
+        """
+        Adds a write to the buffer without waiting for it to be stored.
+
+        :param key: The key of the write, writes with the same key are merged.
+        :param value: The value to store.
+        :return: None
+        """
+        self._pending[key] = self._merge(self._pending.get(key), value) if key in self._pending else value
+
+        # After a failure, only the retry timer flushes, so that a full buffer does not start a failing write per add
+        if self.failure_count:
+            self._drop_oldest()
+        elif len(self._pending) >= self.max_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._start_flush)
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the value of a write that has not been stored yet.
+
+        :param key: The key of the write.
+        :param default: The value returned if there is no unsaved write for the key.
+        :return: The unsaved value, or the default.
+        """
+        if key in self._pending:
+            return self._pending[key]
+        return self._flushing.get(key, default)
+
+    def _merge(self, pending_value: Any, value: Any) -> Any:
+        """
+        Combines a new value with the pending value of the same key. The new value wins by default.
+
+        :param pending_value: The value waiting to be stored.
+        :param value: The new value.
+        :return: The value to store.
+        """
+        return value
+
+    def _start_flush(self) -> None:
+        """
+        Starts a flush in the background, unless one is already running.
+
+        :return: None
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self) -> None:
+        """
+        Stores all pending writes. Writes that failed because of the database are kept and retried by the next
+        flush, writes that fail on their own are dropped.
+
+        :return: None
+        """
+        async with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            # Writes added while this batch is stored are kept for the next flush
+            while self._pending:
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+                try:
+                    failed = await self._write_batch(batch)
+                finally:
+                    self._flushing = {}
+
+                if failed:
+                    # The failed writes are older than the ones added meanwhile, and are dropped first
+                    pending, self._pending = self._pending, failed
+                    for key, value in pending.items():
+                        self._pending[key] = self._merge(self._pending[key], value) if key in self._pending else value
+                    self._drop_oldest()
+
+                    self.failure_count += 1
+                    retry_delay = min(self.flush_interval * 2 ** self.failure_count, MAX_RETRY_DELAY)
+                    logger.warning(f"{type(self).__name__} will retry {len(self._pending)} writes in {retry_delay:g} seconds.")
+                    self._timer = asyncio.get_running_loop().call_later(retry_delay, self._start_flush)
+                    return
+                self.failure_count = 0
+
+    def _drop_oldest(self) -> None:
+        """
+        Drops the oldest pending writes above max_pending.
+
+        :return: None
+        """
+        if self.max_pending is None or len(self._pending) <= self.max_pending:
+            return
+
+        dropped = len(self._pending) - self.max_pending
+        for key in list(itertools.islice(self._pending, dropped)):
+            del self._pending[key]
+        self.dropped_count += dropped
+
+    async def _write_batch(self, batch: Dict[Hashable, Any]) -> Dict[Hashable, Any]:
+        """
+        Stores a batch of writes. If the batch is rejected for another reason than the database, its writes are
+        stored one by one, so that an invalid value does not block the others.
+
+        :param batch: The pending writes by key.
+        :return: The writes to retry, empty if the batch was stored.
+        """
+        try:
+            await self._write(batch)
+            self.flush_count += 1
+            return {}
+        except Exception as error:
+            logger.error(f"{type(self).__name__} failed to store {len(batch)} writes: {error}")
+            if is_database_unavailable(error):
+                return batch
+
+        keys = list(batch)
+        for index, key in enumerate(keys):
+            try:
+                await self._write({key: batch[key]})
+            except Exception as error:
+                if is_database_unavailable(error):
+                    return {key: batch[key] for key in keys[index:]}
+                logger.error(f"{type(self).__name__} dropped the write of {key!r}: {error}")
+        self.flush_count += 1
+        return {}
+
+    async def _write(self, batch: Dict[Hashable, Any]) -> None:
+        """
+        Stores a batch of writes.
+
+        :param batch: The pending writes by key.
+        :return: None
+        """
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """
+        Stores the pending writes, e.g. on shutdown.
+
+        :return: None
+        """
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self.flush()
+
+    def __len__(self) -> int:
+        return len(self._pending)
@@ -0,0 +1,94 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded in-memory cache evicting the least recently used entries and expiring entries after a time to live.
+
+    A cache with a maximum size of 0 is disabled: it stores nothing and every lookup is a miss.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Initializes an empty cache.
+
+        :param maxsize: Maximum number of entries, 0 disables the cache.
+        :param ttl: Seconds after which an entry expires, 0 or less keeps entries until they are evicted.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value of a key and marks it as recently used.
+
+        :param key: The key of the entry.
+        :param default: The value returned if the key is missing or expired.
+        :return: The cached value, or the default.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at is None or expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Stores a value, evicting the least recently used entry if the cache is full.
+
+        :param key: The key of the entry.
+        :param value: The value to cache.
+        :param generation: The generation read before loading the value. The value is not stored if the
+            cache was invalidated in the meantime, so that a slow read never overwrites a newer write.
+        :return: None
+        """
+        if self.maxsize <= 0 or (generation is not None and generation != self.generation):
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """
+        Removes an entry, or every entry if no key is given.
+
+        :param key: The key of the entry to remove.
+        :return: None
+        """
+        self.generation += 1
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the cache counters.
+
+        :return: A dictionary with the hits, misses, hit ratio and current size.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,9 +1,74 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Table, and_, bindparam, insert, event, or_, select, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.sql.dml import Insert
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker
 from bot.config import logger, config
 from bot.models import Base
+from .migrations import apply_migrations
 
-engine = create_async_engine(config.DATABASE_URL)
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """
+    Returns the SQLite PRAGMAs configured for every new connection. Settings left empty are skipped.
+
+    :return: A dictionary mapping the PRAGMA names to their values.
+    """
+    pragmas = {
+        "journal_mode": config.SQLITE_JOURNAL_MODE,
+        "synchronous": config.SQLITE_SYNCHRONOUS,
+        "mmap_size": config.SQLITE_MMAP_SIZE,
+        "cache_size": config.SQLITE_CACHE_SIZE,
+        "busy_timeout": config.SQLITE_BUSY_TIMEOUT
+    }
+    return {name: value for name, value in pragmas.items() if value not in (None, "")}
+
+
+def build_engine(database_url: str, pragmas: Optional[Dict[str, Any]] = None) -> AsyncEngine:
+    """
+    Creates the async engine, tuned with the pool and SQLite settings of the configuration.
+
+    :param database_url: The database URL.
+    :param pragmas: SQLite PRAGMAs applied on connect, defaults to sqlite_pragmas().
+    :return: The async engine.
+    """
+    url = make_url(database_url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    in_memory = is_sqlite and (url.database in (None, "", ":memory:") or url.query.get("mode") == "memory")
+
+    # In-memory SQLite databases use a single static connection, which has no pool to size
+    engine_options = {"pool_pre_ping": config.DATABASE_POOL_PRE_PING}
+    if not in_memory:
+        engine_options.update(pool_size=config.DATABASE_POOL_SIZE, max_overflow=config.DATABASE_MAX_OVERFLOW)
+
+    # aiosqlite opens a new connection and thread for every session by default, keep them in a pool instead
+    if is_sqlite and not in_memory:
+        engine_options["poolclass"] = AsyncAdaptedQueuePool
+
+    new_engine = create_async_engine(url, **engine_options)
+    if not is_sqlite:
+        return new_engine
+
+    pragmas = sqlite_pragmas() if pragmas is None else pragmas
+
+    # WAL and memory mapping do not apply to in-memory databases
+    if in_memory:
+        pragmas = {name: value for name, value in pragmas.items() if name not in ("journal_mode", "mmap_size")}
+
+    @event.listens_for(new_engine.sync_engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return new_engine
+
+
+engine = build_engine(config.DATABASE_URL)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -12,8 +77,168 @@ async def get_session():
         yield session
 
 
+def insert_ignore(model) -> Optional[Insert]:
+    """
+    Builds an INSERT statement that skips rows whose primary key already exists, in a single round trip.
+
+    :param model: The model or table to insert into.
+    :return: The insert statement for the dialect of the engine, or None if the dialect has no such statement.
+    """
+    dialect_name = engine.dialect.name
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(model).on_conflict_do_nothing()
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+        return postgresql_insert(model).on_conflict_do_nothing()
+    if dialect_name in ("mysql", "mariadb"):
+        return insert(model).prefix_with("IGNORE")
+    return None
+
+
+def match_keys(table: Table, key_columns: List[str], rows: List[Dict[str, Any]]) -> ColumnElement:
+    """
+    Builds a condition matching the rows with the keys of the given rows, without row values, which not every backend supports.
+
+    :param table: The table.
+    :param key_columns: The columns of the primary key or unique constraint.
+    :param rows: The rows whose keys are matched.
+    :return: The WHERE condition.
+    """
+    if len(key_columns) == 1:
+        return table.c[key_columns[0]].in_([row[key_columns[0]] for row in rows])
+    return or_(*(and_(*(table.c[column] == row[column] for column in key_columns)) for row in rows))
+
+
+async def insert_ignore_rows(session: AsyncSession, model, rows: List[Dict[str, Any]]) -> int:
+    """
+    Inserts rows, skipping those whose primary key already exists.
+
+    Uses insert_ignore() where the dialect supports it. Other backends first read which keys already exist,
+    which works everywhere but takes two round trips.
+
+    :param session: The session, committed by the caller.
+    :param model: The model or table to insert into.
+    :param rows: The rows to insert.
+    :return: The number of inserted rows.
+    """
+    if not rows:
+        return 0
+
+    # Statements on the table report the row count, ORM bulk inserts do not
+    table = getattr(model, "__table__", model)
+    statement = insert_ignore(table)
+    if statement is not None:
+        # A single row is executed on its own, executemany does not report the row count on every driver
+        result = await session.execute(statement.values(rows[0])) if len(rows) == 1 else await session.execute(statement, rows)
+        return result.rowcount
+
+    _, new_rows = await split_existing_rows(session, table, [column.name for column in table.primary_key.columns], rows)
+    if new_rows:
+        await session.execute(insert(table), new_rows)
+    return len(new_rows)
+
+
+async def split_existing_rows(session: AsyncSession, table: Table, key_columns: List[str], rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Separates the rows whose key is already stored from the new ones, for backends without upserts.
+
+    :param session: The session.
+    :param table: The table.
+    :param key_columns: The columns of the primary key or unique constraint.
+    :param rows: The rows.
+    :return: The rows whose key exists, and the new rows. Rows repeating a key of the same batch are dropped.
+    """
+    result = await session.execute(select(*(table.c[column] for column in key_columns)).where(match_keys(table, key_columns, rows)))
+    stored_keys = {tuple(row) for row in result}
+
+    existing_rows, new_rows, seen_keys = [], [], set()
+    for row in rows:
+        key = tuple(row[column] for column in key_columns)
+        if key in seen_keys:
+            continue
+        seen_keys.add(key)
+        (existing_rows if key in stored_keys else new_rows).append(row)
+    return existing_rows, new_rows
+
+
+def insert_or_update(model, index_elements: List[str], update_columns: List[str], increment_columns: List[str] = ()) -> Optional[Insert]:
+    """
+    Builds an INSERT statement that updates the given columns of rows whose key already exists.
+
+    :param model: The model or table to insert into.
+    :param index_elements: The columns of the primary key or unique constraint.
+    :param update_columns: The columns overwritten when the row exists.
+    :param increment_columns: The columns to which the inserted value is added when the row exists.
+    :return: The insert statement for the dialect of the engine, or None if the dialect has no such statement.
+    """
+    table = getattr(model, "__table__", model)
+    dialect_name = engine.dialect.name
+    if dialect_name in ("sqlite", "postgresql"):
+        if dialect_name == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        statement = dialect_insert(model)
+        new_values = statement.excluded
+    elif dialect_name in ("mysql", "mariadb"):
+        from sqlalchemy.dialects.mysql import insert as dialect_insert
+        statement = dialect_insert(model)
+        new_values = statement.inserted
+    else:
+        return None
+
+    updates = {column: new_values[column] for column in update_columns}
+    updates.update({column: table.c[column] + new_values[column] for column in increment_columns})
+
+    if dialect_name in ("mysql", "mariadb"):
+        return statement.on_duplicate_key_update(updates)
+    return statement.on_conflict_do_update(index_elements=index_elements, set_=updates)
+
+
+async def insert_or_update_rows(session: AsyncSession, model, index_elements: List[str], update_columns: List[str],
+                                rows: List[Dict[str, Any]], increment_columns: List[str] = ()) -> None:
+    """
+    Inserts rows, updating the given columns of the rows whose key already exists.
+
+    Uses insert_or_update() where the dialect supports it. Other backends first read which keys already exist,
+    then update those rows and insert the others, which works everywhere but takes three round trips.
+
+    :param session: The session, committed by the caller.
+    :param model: The model or table to insert into.
+    :param index_elements: The columns of the primary key or unique constraint.
+    :param update_columns: The columns overwritten when the row exists.
+    :param rows: The rows to insert or update.
+    :param increment_columns: The columns to which the new value is added when the row exists.
+    :return: None
+    """
+    if not rows:
+        return
+
+    statement = insert_or_update(model, index_elements, update_columns, increment_columns)
+    if statement is not None:
+        await session.execute(statement, rows)
+        return
+
+    table = getattr(model, "__table__", model)
+    existing_rows, new_rows = await split_existing_rows(session, table, index_elements, rows)
+    if existing_rows:
+        # Bound parameters cannot share the names of the columns they set
+        values = {column: bindparam(f"new_{column}") for column in update_columns}
+        values.update({column: table.c[column] + bindparam(f"new_{column}") for column in increment_columns})
+        statement = update(table).where(*(table.c[column] == bindparam(f"key_{column}") for column in index_elements)).values(values)
+        await session.execute(statement, [
+            {**{f"key_{column}": row[column] for column in index_elements},
+             **{f"new_{column}": row[column] for column in (*update_columns, *increment_columns)}}
+            for row in existing_rows
+        ])
+    if new_rows:
+        await session.execute(insert(table), new_rows)
+
+
 async def create_db_and_tables():
     logger.info("Creating database tables...")
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-    logger.info("Database tables created.")
+        schema_version = await conn.run_sync(apply_migrations)
+    logger.info(f"Database tables created (schema version {schema_version}).")
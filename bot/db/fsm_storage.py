@@ -0,0 +1,144 @@
+import json
+from typing import Any, Dict, Hashable, Optional, Tuple
+from sqlalchemy import delete
+from sqlalchemy.future import select
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StorageKey, StateType
+from bot.models import FSMStateRecord
+from bot.config import config
+from .cache import TTLCache
+from .buffer import WriteBehindBuffer
+from .database import get_session, insert_or_update_rows
+
+# A record is the state name and the data serialized as JSON
+Record = Tuple[Optional[str], str]
+
+EMPTY_RECORD: Record = (None, "{}")
+
+# Marks a cache miss, as None is a valid state
+_MISSING = object()
+
+# Number of changed records that triggers a flush
+FSM_BATCH_SIZE = 500
+
+
+def build_storage_key(key: StorageKey) -> str:
+    """
+    Builds the database key of an FSM storage key.
+
+    :param key: The aiogram storage key.
+    :return: The key as a string.
+    """
+    return f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:{key.business_connection_id or ''}:{key.destiny}"
+
+
+class FSMStateBuffer(WriteBehindBuffer):
+    """
+    Stores the FSM records changed since the last flush, deleting the records that became empty.
+    """
+    async def _write(self, batch: Dict[Hashable, Any]) -> None:
+        """
+        Upserts the changed records and deletes the empty ones.
+
+        :param batch: The records by storage key.
+        :return: None
+        """
+        upserts = [{"key": key, "state": state, "data": data} for key, (state, data) in batch.items() if (state, data) != EMPTY_RECORD]
+        empty_keys = [key for key, record in batch.items() if record == EMPTY_RECORD]
+
+        async for session in get_session():
+            await insert_or_update_rows(session, FSMStateRecord, ["key"], ["state", "data"], upserts)
+            if empty_keys:
+                await session.execute(delete(FSMStateRecord).where(FSMStateRecord.key.in_(empty_keys)))
+            await session.commit()
+
+
+class DatabaseStorage(BaseStorage):
+    """
+    FSM storage persisted in the bot database, so that the states survive restarts.
+
+    Recently used records are kept in memory and changes are written in batches in the background.
+    Only the state name and the data serialized as JSON are kept, so FSM data must be JSON serializable.
+    """
+    def __init__(self, cache_size: Optional[int] = None, cache_ttl: Optional[float] = None, flush_interval: Optional[float] = None):
+        """
+        Initializes the storage.
+
+        :param cache_size: Number of records kept in memory. Defaults to FSM_CACHE_SIZE.
+        :param cache_ttl: Seconds a record stays in memory. Defaults to FSM_CACHE_TTL.
+        :param flush_interval: Maximum seconds before a change is written. Defaults to FSM_FLUSH_INTERVAL.
+        """
+        self.cache = TTLCache(
+            config.FSM_CACHE_SIZE if cache_size is None else cache_size,
+            config.FSM_CACHE_TTL if cache_ttl is None else cache_ttl
+        )
+        self.buffer = FSMStateBuffer(
+            FSM_BATCH_SIZE,
+            config.FSM_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        )
+
+    async def _get_record(self, storage_key: str) -> Record:
+        """
+        Returns the record of a key from the unsaved changes, the cache or the database.
+
+        :param storage_key: The database key.
+        :return: The state and the serialized data.
+        """
+        record = self.buffer.peek(storage_key, _MISSING)
+        if record is _MISSING:
+            record = self.cache.get(storage_key, _MISSING)
+        if record is not _MISSING:
+            return record
+
+        # Remember the generation, so that a concurrent write is not overwritten by this read
+        generation = self.cache.generation
+        record = EMPTY_RECORD
+        async for session in get_session():
+            result = await session.execute(
+                select(FSMStateRecord.state, FSMStateRecord.data).where(FSMStateRecord.key == storage_key)
+            )
+            row = result.first()
+            if row:
+                record = (row.state, row.data or "{}")
+
+        self.cache.set(storage_key, record, generation)
+        return record
+
+    def _set_record(self, storage_key: str, record: Record) -> None:
+        """
+        Replaces the record of a key in memory and schedules it for writing.
+
+        :param storage_key: The database key.
+        :param record: The state and the serialized data.
+        :return: None
+        """
+        self.buffer.add(storage_key, record)
+        self.cache.invalidate(storage_key)
+        self.cache.set(storage_key, record)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        storage_key = build_storage_key(key)
+        current_state, data = await self._get_record(storage_key)
+        state = state.state if isinstance(state, State) else state
+        if state != current_state:
+            self._set_record(storage_key, (state, data))
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        state, _ = await self._get_record(build_storage_key(key))
+        return state
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        storage_key = build_storage_key(key)
+        state, current_data = await self._get_record(storage_key)
+
+        # Serializing here reports non JSON data to the caller instead of failing the background write
+        data = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        if data != current_data:
+            self._set_record(storage_key, (state, data))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        _, data = await self._get_record(build_storage_key(key))
+        return json.loads(data)
+
+    async def close(self) -> None:
+        await self.buffer.close()
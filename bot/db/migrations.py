@@ -0,0 +1,72 @@
+import time
+from typing import Callable, List
+from sqlalchemy import Index, Table, MetaData, insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.future import select
+from bot.models import SchemaVersion
+from bot.config import logger
+
+
+class Migration:
+    """
+    A numbered change of the database schema, applied once.
+    """
+    def __init__(self, version: int, description: str, upgrade: Callable[[Connection], None]):
+        """
+        Initializes the migration.
+
+        :param version: The schema version reached by the migration, migrations run in ascending order.
+        :param description: What the migration changes.
+        :param upgrade: Function applying the change on a synchronous connection. It must work on
+            databases created from the current models, where the change may already exist.
+        """
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+
+
+def create_index(connection: Connection, index_name: str, table_name: str, column_names: List[str]) -> None:
+    """
+    Creates an index on existing columns. Does nothing if the index exists.
+
+    :param connection: The synchronous connection.
+    :param index_name: The name of the index.
+    :param table_name: The name of the table.
+    :param column_names: The indexed columns, in order.
+    :return: None
+    """
+    table = Table(table_name, MetaData(), autoload_with=connection)
+    Index(index_name, *(table.c[column_name] for column_name in column_names)).create(connection, checkfirst=True)
+
+
+# Every schema change since the first release, new migrations are appended with the next version
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Index users by access level", lambda connection: create_index(connection, "ix_users_access_level", "users", ["access_level"])),
+]
+
+
+def apply_migrations(connection: Connection, migrations: List[Migration] = MIGRATIONS) -> int:
+    """
+    Applies the migrations that have not been applied yet and records them in the schema_version table.
+
+    :param connection: The synchronous connection, inside a transaction.
+    :param migrations: The migrations to apply.
+    :return: The schema version of the database.
+    """
+    SchemaVersion.__table__.create(connection, checkfirst=True)
+    applied_versions = set(connection.execute(select(SchemaVersion.version)).scalars())
+
+    for migration in sorted(migrations, key=lambda migration: migration.version):
+        if migration.version in applied_versions:
+            continue
+
+        logger.info(f"Applying database migration {migration.version}: {migration.description}.")
+        migration.upgrade(connection)
+        connection.execute(insert(SchemaVersion).values(
+            version=migration.version,
+            description=migration.description,
+            applied_at=time.time()
+        ))
+        applied_versions.add(migration.version)
+
+    return max(applied_versions, default=0)
@@ -0,0 +1,166 @@
+import json
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+from sqlalchemy import delete, or_
+from sqlalchemy.future import select
+from bot.models import PluginData
+from bot.config import config
+from .cache import TTLCache
+from .buffer import WriteBehindBuffer
+from .database import get_session, insert_or_update_rows
+
+# Marks a deleted value in the write buffer and a cache miss
+_DELETED = object()
+_MISSING = object()
+
+# Values are cached as (value, expires_at), missing keys as None
+plugin_data_cache = TTLCache(config.PLUGIN_STORAGE_CACHE_SIZE, config.PLUGIN_STORAGE_CACHE_TTL)
+
+
+class PluginDataBuffer(WriteBehindBuffer):
+    """
+    Stores the plugin values written since the last flush, with one statement per batch.
+    """
+    async def _write(self, batch: Dict[Hashable, Any]) -> None:
+        """
+        Upserts the new values, deletes the removed ones and drops the expired values.
+
+        :param batch: The (value, expires_at) pairs, or deletion markers, by (namespace, key).
+        :return: None
+        """
+        upserts = []
+        deletes: Dict[str, list] = {}
+        for (namespace, key), entry in batch.items():
+            if entry is _DELETED:
+                deletes.setdefault(namespace, []).append(key)
+            else:
+                upserts.append({"namespace": namespace, "key": key, "value": entry[0], "expires_at": entry[1]})
+
+        async for session in get_session():
+            try:
+                await insert_or_update_rows(session, PluginData, ["namespace", "key"], ["value", "expires_at"], upserts)
+                for namespace, keys in deletes.items():
+                    await session.execute(delete(PluginData).where(PluginData.namespace == namespace, PluginData.key.in_(keys)))
+                await session.execute(delete(PluginData).where(PluginData.expires_at <= time.time()))
+                await session.commit()
+            except Exception:
+                # Release the connection now, the failed batch is written again value by value right after
+                await session.rollback()
+                raise
+
+
+# Plugin values waiting to be stored, flushed on shutdown
+plugin_data_buffer = PluginDataBuffer(config.PLUGIN_STORAGE_BATCH_SIZE, config.PLUGIN_STORAGE_FLUSH_INTERVAL)
+
+
+class PluginStorage:
+    """
+    Key-value storage of a plugin, persisted in the plugin_data table.
+
+    Reads go through an in-memory cache and writes are stored in batches in the background, so a value
+    written with set() is visible to get() immediately, but reaches the database up to
+    PLUGIN_STORAGE_FLUSH_INTERVAL seconds later. Values must be JSON serializable, set() raises TypeError otherwise.
+    """
+    def __init__(self, namespace: str):
+        """
+        Initializes the storage of a namespace, usually the name of the plugin.
+
+        :param namespace: The namespace isolating the keys of the plugin.
+        """
+        self.namespace = namespace
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        """
+        Returns the value of a key.
+
+        :param key: The key of the value.
+        :param default: The value returned if the key does not exist or has expired.
+        :return: The stored value, or the default.
+        """
+        cache_key = (self.namespace, key)
+        entry = plugin_data_buffer.peek(cache_key, _MISSING)
+        if entry is _MISSING:
+            entry = plugin_data_cache.get(cache_key, _MISSING)
+        if entry is _MISSING:
+            # Remember the generation, so that a concurrent write is not overwritten by this read
+            generation = plugin_data_cache.generation
+            entry = await self._load(key)
+            plugin_data_cache.set(cache_key, entry, generation)
+
+        if entry is None or entry is _DELETED:
+            return default
+
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            return default
+        return value
+
+    async def _load(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """
+        Reads a value from the database.
+
+        :param key: The key of the value.
+        :return: The (value, expires_at) pair, or None if the key does not exist.
+        """
+        entry = None
+        async for session in get_session():
+            result = await session.execute(
+                select(PluginData.value, PluginData.expires_at).where(PluginData.namespace == self.namespace, PluginData.key == key)
+            )
+            row = result.first()
+            if row:
+                entry = (row.value, row.expires_at)
+        return entry
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Stores a value.
+
+        :param key: The key of the value.
+        :param value: A JSON serializable value.
+        :param ttl: Seconds after which the value expires, None to keep it.
+        :return: None
+        """
+        # Serializing here reports non JSON values to the caller instead of failing the background write
+        json.dumps(value)
+
+        cache_key = (self.namespace, key)
+        entry = (value, time.time() + ttl if ttl is not None else None)
+        plugin_data_buffer.add(cache_key, entry)
+        plugin_data_cache.invalidate(cache_key)
+        plugin_data_cache.set(cache_key, entry)
+
+    async def delete(self, key: str) -> None:
+        """
+        Deletes a value.
+
+        :param key: The key of the value.
+        :return: None
+        """
+        cache_key = (self.namespace, key)
+        plugin_data_buffer.add(cache_key, _DELETED)
+        plugin_data_cache.invalidate(cache_key)
+        plugin_data_cache.set(cache_key, None)
+
+    async def scan(self, prefix: str = "") -> Dict[str, Any]:
+        """
+        Returns the values whose keys start with a prefix. Pending writes are stored first.
+
+        :param prefix: The prefix of the keys, empty for all keys of the namespace.
+        :return: A dictionary mapping the keys to their values.
+        """
+        await plugin_data_buffer.flush()
+
+        values = {}
+        async for session in get_session():
+            result = await session.execute(
+                select(PluginData.key, PluginData.value)
+                .where(
+                    PluginData.namespace == self.namespace,
+                    PluginData.key.startswith(prefix, autoescape=True),
+                    or_(PluginData.expires_at.is_(None), PluginData.expires_at > time.time())
+                )
+                .order_by(PluginData.key)
+            )
+            values = {row.key: row.value for row in result}
+        return values
@@ -1,7 +1,19 @@
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
 from sqlalchemy.future import select
 from bot.models import User
-from bot.config import logger
-from .database import get_session
+from bot.config import logger, config
+from .cache import TTLCache
+from .buffer import WriteBehindBuffer
+from .database import get_session, async_session, insert_ignore_rows
+
+# Recently seen user records, invalidated on every write. Unknown users are cached as None.
+user_cache = TTLCache(config.USER_CACHE_SIZE, config.USER_CACHE_TTL)
+
+# Marks a cache miss, as None is a valid cached value
+_MISSING = object()
+
+# Number of rows written or read per statement by the bulk helpers
+USER_BATCH_SIZE = 1000
 
 
 # Adding a new user
@@ -12,18 +24,108 @@ async def add_user(user_id: int, access_level: int) -> None:
     :param user_id: The ID of the user.
     :param access_level: The access level of the user.
     """
-    
+
+    created = False
+    async for session in get_session():
+        created = await insert_ignore_rows(session, User, [{"id": user_id, "access_level": access_level}]) > 0
+        await session.commit()
+
+    if not created:
+        return  # User already exists, do not add
+
+    user_cache.invalidate(user_id)
+    logger.info(f"User with id {user_id} and access level {access_level} was created.")
+
+
+# Adding many users at once
+async def add_users(users: Iterable[Tuple[int, int]]) -> None:
+    """
+    Adds the users that don't already exist, with one statement per batch.
+
+    :param users: Pairs of user ID and access level.
+    """
+    user_ids = []
+    batch = []
+    async for session in get_session():
+        for user_id, access_level in users:
+            user_ids.append(user_id)
+            batch.append({"id": user_id, "access_level": access_level})
+            if len(batch) >= USER_BATCH_SIZE:
+                await insert_ignore_rows(session, User, batch)
+                batch = []
+        await insert_ignore_rows(session, User, batch)
+        await session.commit()
+
+    # Unknown users are cached as None, large imports simply reset the cache
+    if len(user_ids) > USER_BATCH_SIZE:
+        user_cache.invalidate()
+    else:
+        for user_id in user_ids:
+            user_cache.invalidate(user_id)
+
+
+class UserRegistrationQueue(WriteBehindBuffer):
+    """
+    Registers unknown users in the background, with one bulk insert per batch of user IDs.
+    """
+    async def _write(self, batch: Dict[int, int]) -> None:
+        """
+        Adds the queued users that don't already exist.
+
+        :param batch: The access levels of the queued users by user ID.
+        :return: None
+        """
+        await add_users(batch.items())
+        logger.info(f"{len(batch)} new users were registered.")
+
+
+# Unknown users that wrote to the bot, flushed on shutdown
+registration_queue = UserRegistrationQueue(config.USER_REGISTRATION_BATCH_SIZE, config.USER_REGISTRATION_FLUSH_INTERVAL)
+
+
+# Getting a user by their user ID
+async def get_user(user_id: int) -> Optional[User]:
+    """
+    Retrieves a user by their ID, from the cache when possible.
+
+    The returned object is detached from the session and shared between callers, it must not be modified.
+
+    :param user_id: The ID of the user.
+    :return: The User object, or None if the user is not found.
+    """
+    user = user_cache.get(user_id, _MISSING)
+    if user is not _MISSING:
+        return user
+
+    # Remember the generation, so that a concurrent write is not overwritten by this read
+    generation = user_cache.generation
+    user = None
     async for session in get_session():
         result = await session.execute(select(User).filter(User.id == user_id))
         user = result.scalars().first()
-        if user:
-            return  # User already exists, do not add
 
-        new_user = User(id=user_id, access_level=access_level)
-        session.add(new_user)
+    user_cache.set(user_id, user, generation)
+    return user
+
+
+# Changing a user's access level
+async def set_user_access_level(user_id: int, access_level: int) -> None:
+    """
+    Sets the access level of a user, creating the user if they don't exist.
+
+    :param user_id: The ID of the user.
+    :param access_level: The new access level of the user.
+    """
+    async for session in get_session():
+        user = await session.get(User, user_id)
+        if user:
+            user.access_level = access_level
+        else:
+            session.add(User(id=user_id, access_level=access_level))
         await session.commit()
-    
-    logger.info(f"User with id {user_id} and access level {access_level} was created.")
+
+    user_cache.invalidate(user_id)
+    logger.info(f"Access level of user with id {user_id} was set to {access_level}.")
 
 
 # Getting a user's access level by their user ID
@@ -34,19 +136,16 @@ async def get_user_access_level(user_id: int) -> int:
     :param user_id: The ID of the user.
     :return: The access level of the user, or 0 if the user is not found.
     """
-    
-    async for session in get_session():
-        result = await session.execute(select(User).filter(User.id == user_id))
-        user = result.scalars().first()
-        if user:
-            return user.access_level
-        return 0
+    user = await get_user(user_id)
+    if user and user.access_level is not None:
+        return user.access_level
+    return 0
 
 
 # Getting all users
 async def get_all_users() -> list[User]:
     """
-    Retrieves all users from the database.
+    Retrieves all users from the database. Use iter_user_chunks() to go through a large table.
 
     :return: A list of User objects.
     """
@@ -55,3 +154,22 @@ async def get_all_users() -> list[User]:
         result = await session.execute(select(User))
         users = result.scalars().all()
     return users
+
+
+# Streaming all users
+async def iter_user_chunks(chunk_size: int = USER_BATCH_SIZE, min_access_level: Optional[int] = None) -> AsyncIterator[List[User]]:
+    """
+    Streams the users ordered by ID in chunks, so that memory usage does not depend on the number of users.
+
+    :param chunk_size: Number of users per chunk.
+    :param min_access_level: Only stream the users with at least this access level.
+    :return: An async iterator of lists of User objects.
+    """
+    query = select(User).order_by(User.id)
+    if min_access_level is not None:
+        query = query.where(User.access_level >= min_access_level)
+
+    async with async_session() as session:
+        result = await session.stream(query.execution_options(yield_per=chunk_size))
+        async for chunk in result.scalars().partitions():
+            yield chunk
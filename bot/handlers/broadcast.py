@@ -0,0 +1,140 @@
+import asyncio
+from typing import Any, Dict, Set
+from aiogram.enums import ParseMode
+from aiogram.exceptions import TelegramBadRequest
+from aiogram import Router, types, F
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.state import State, StatesGroup
+from bot.config import config
+from bot.loader import broadcaster
+from bot.middlewares import AccessLevel
+from bot.keyboards import broadcast_cancel_buttons, broadcast_confirmation_buttons, broadcast_progress_buttons
+
+router = Router()
+
+# Middleware registration to ensure users have the correct access level
+router.message.middleware(AccessLevel(2))
+
+# Tasks keeping the progress messages up to date
+progress_tasks: Set[asyncio.Task] = set()
+
+# Define state class for writing a broadcast
+class BroadcastFormState(StatesGroup):
+    waiting_for_text = State()  # State when the bot is waiting for the broadcast message
+
+# Build the text of a progress message
+def format_broadcast_progress(progress: Dict[str, Any]) -> str:
+    handled = progress["sent"] + progress["failed"]
+    percent = handled * 100 // progress["total"] if progress["total"] else 100
+    titles = {"running": "📣 Broadcast in progress", "completed": "✅ Broadcast completed", "cancelled": "⏹ Broadcast stopped", "failed": "❌ Broadcast failed"}
+
+    text = (
+        f"<b>{titles.get(progress['status'], progress['status'])}</b>\n"
+        f"<b>Sent:</b> {progress['sent']} / {progress['total']} ({percent}%)\n"
+        f"<b>Failed:</b> {progress['failed']}"
+    )
+    if progress["status"] == "running":
+        eta = f"{int(progress['eta']) // 60} min {int(progress['eta']) % 60} s" if progress["eta"] is not None else "calculating..."
+        text += f"\n<b>Speed:</b> {progress['throughput']:.1f} messages/s\n<b>Time left:</b> {eta}"
+    return text
+
+# Keep a progress message up to date until the broadcast is over
+async def show_broadcast_progress(message: types.Message, broadcast_id: int) -> None:
+    while True:
+        progress = await broadcaster.progress(broadcast_id)
+        if progress is None:
+            return
+
+        is_running = progress["status"] == "running"
+        try:
+            await message.edit_text(
+                text=format_broadcast_progress(progress),
+                parse_mode=ParseMode.HTML,
+                reply_markup=broadcast_progress_buttons(broadcast_id) if is_running else None
+            )
+        except TelegramBadRequest:
+            pass  # The progress has not changed
+
+        if not is_running:
+            return
+        await asyncio.sleep(config.BROADCAST_PROGRESS_INTERVAL)
+
+# Start updating a progress message in the background
+def watch_broadcast(message: types.Message, broadcast_id: int) -> None:
+    task = asyncio.create_task(show_broadcast_progress(message, broadcast_id))
+    progress_tasks.add(task)
+    task.add_done_callback(progress_tasks.discard)
+
+# Command to start a broadcast, or to show the running one
+@router.message(F.text == "📣 Broadcast")
+async def cmd_broadcast(message: types.Message, state: FSMContext):
+    if broadcaster.runs:
+        broadcast_id = next(iter(broadcaster.runs))
+        progress_message = await message.answer(text="<b>📣 A broadcast is in progress.</b>", parse_mode=ParseMode.HTML)
+        watch_broadcast(progress_message, broadcast_id)
+        return
+
+    await state.set_state(BroadcastFormState.waiting_for_text)
+    await message.answer(
+        text="<b>📣 Send the message to deliver to every user.</b>\n"
+             "Formatting is kept.",
+        parse_mode=ParseMode.HTML,
+        reply_markup=broadcast_cancel_buttons()
+    )
+
+# Handle the broadcast message and ask for confirmation
+@router.message(BroadcastFormState.waiting_for_text)
+async def handle_broadcast_text(message: types.Message, state: FSMContext):
+    if not message.text:
+        await message.answer(
+            text="<b>⚠️ Only text messages can be broadcast.</b>\n"
+                 "Please send the message as text.",
+            parse_mode=ParseMode.HTML
+        )
+        return
+
+    await state.update_data(broadcast_text=message.html_text)
+    await message.answer(
+        text="<b>❓ Who should receive this message?</b>\n"
+             "Unauthorized users never receive broadcasts.",
+        parse_mode=ParseMode.HTML,
+        reply_markup=broadcast_confirmation_buttons()
+    )
+
+# Command to cancel the broadcast being written
+@router.callback_query(F.data == "broadcast_cancel")
+async def cancel_broadcast(callback_query: types.CallbackQuery, state: FSMContext):
+    await state.clear()
+    await callback_query.message.edit_text(
+        text="<b>😐 The broadcast was canceled.</b>",
+        parse_mode=ParseMode.HTML
+    )
+
+# Command to confirm and start the broadcast for the chosen recipients
+@router.callback_query(F.data.startswith("broadcast_confirm:"))
+async def confirm_broadcast(callback_query: types.CallbackQuery, state: FSMContext, access_level: int = 0):
+    text = (await state.get_data()).get("broadcast_text")
+    await state.clear()
+    if access_level < 2 or not text:
+        await callback_query.answer()
+        return
+
+    # Users with access level 0 are not authorized to use the bot and never receive broadcasts
+    min_access_level = max(int(callback_query.data.split(":", 1)[1]), 1)
+    broadcast = await broadcaster.start(text, ParseMode.HTML, min_access_level, callback_query.from_user.id)
+    watch_broadcast(callback_query.message, broadcast.id)
+    await callback_query.answer()
+
+# Command to stop a running broadcast
+@router.callback_query(F.data.startswith("broadcast_stop:"))
+async def stop_broadcast(callback_query: types.CallbackQuery, access_level: int = 0):
+    if access_level < 2:
+        await callback_query.answer()
+        return
+
+    broadcast_id = int(callback_query.data.split(":", 1)[1])
+    await broadcaster.cancel(broadcast_id)
+    progress = await broadcaster.progress(broadcast_id)
+    if progress is not None:
+        await callback_query.message.edit_text(text=format_broadcast_progress(progress), parse_mode=ParseMode.HTML)
+    await callback_query.answer()
@@ -1,7 +1,9 @@
+from typing import Optional
 from aiogram.enums import ParseMode
 from aiogram import Router, types, F
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
+from bot.models import Plugin
 from bot.loader import plugin_manager
 from bot.middlewares import AccessLevel
 from bot.keyboards import plugins_menu, plugin_action_buttons, plugin_removal_confirmation_buttons, main_menu
@@ -16,6 +18,21 @@ class PluginState(StatesGroup):
     waiting_for_plugin = State()  # Waiting for user to select a plugin
 
 
+# Getting the plugin selected by the user, the state only keeps its name
+async def get_selected_plugin(state: FSMContext) -> Optional[Plugin]:
+    data = await state.get_data()
+    plugin_name = data.get('waiting_for_plugin')
+    return plugin_manager.loaded_plugins.get(plugin_name)
+
+
+# Telling the user that the selected plugin no longer exists
+async def report_missing_plugin(callback_query: types.CallbackQuery) -> None:
+    await callback_query.message.edit_text(
+        text="<b>❌ Sorry, we couldn't find the selected plugin.</b> It may have been removed, please choose it from the list again.",
+        parse_mode=ParseMode.HTML
+    )
+
+
 # Command to show the list of plugins when the "Plugins List" button is clicked
 @router.message(F.text == "🔌 Plugin List")
 async def show_plugin_list(message: types.Message, state: FSMContext):
@@ -31,7 +48,7 @@ async def show_plugin_list(message: types.Message, state: FSMContext):
 @router.message(PluginState.waiting_for_plugin, F.text)
 async def show_plugin_details(message: types.Message, state: FSMContext):
     # Find the plugin based on the user's message (either title or name)
-    selected_plugin = next((plugin for plugin in plugin_manager.loaded_plugins if (plugin.title or plugin.name) == message.text), None)
+    selected_plugin = plugin_manager.loaded_plugins.get_by_title(message.text)
 
     if selected_plugin is None:
         await message.answer(
@@ -40,8 +57,8 @@ async def show_plugin_details(message: types.Message, state: FSMContext):
         )
         return
     
-    # Save selected plugin in the state
-    await state.update_data(waiting_for_plugin=selected_plugin)
+    # Save the name of the selected plugin in the state
+    await state.update_data(waiting_for_plugin=selected_plugin.name)
 
     # Display the plugin's information and its functions
     functions_list = ''.join([f"<b>* {'/' if function.function_type == 'command' else ''}{function.name}</b> - {function.description}\n" for function in selected_plugin.functions])
@@ -70,8 +87,11 @@ async def cancel_plugin_editing(callback_query: types.CallbackQuery, state: FSMC
 # Command to initiate plugin deletion process
 @router.callback_query(F.data == "plugin_action_delete")
 async def initiate_plugin_deletion(callback_query: types.CallbackQuery, state: FSMContext):
-    data = await state.get_data()  # Retrieve current state data
-    plugin_to_delete = data['waiting_for_plugin']  # Get the selected plugin
+    plugin_to_delete = await get_selected_plugin(state)  # Get the selected plugin
+    if plugin_to_delete is None:
+        await report_missing_plugin(callback_query)
+        return
+
     # Ask for confirmation to delete the plugin
     await callback_query.message.edit_text(
         text=f"<b>⚠️ Are you sure you want to remove the plugin: '{plugin_to_delete.title or plugin_to_delete.name}'?</b>",
@@ -83,8 +103,11 @@ async def initiate_plugin_deletion(callback_query: types.CallbackQuery, state: F
 # Command to cancel plugin deletion and return to plugin settings
 @router.callback_query(F.data == "plugin_removal_cancel")
 async def cancel_plugin_deletion(callback_query: types.CallbackQuery, state: FSMContext):
-    data = await state.get_data()  # Retrieve current state data
-    plugin_to_restore = data['waiting_for_plugin']  # Get the selected plugin
+    plugin_to_restore = await get_selected_plugin(state)  # Get the selected plugin
+    if plugin_to_restore is None:
+        await report_missing_plugin(callback_query)
+        return
+
     # Display the plugin's information again
     functions_list = ''.join([f"<b>* {'/' if function.function_type == 'command' else ''}{function.name}</b> - {function.description}\n" for function in plugin_to_restore.functions])
 
@@ -102,8 +125,11 @@ async def cancel_plugin_deletion(callback_query: types.CallbackQuery, state: FSM
 # Command to confirm plugin deletion and remove it
 @router.callback_query(F.data == "plugin_removal_confirm")
 async def confirm_plugin_deletion(callback_query: types.CallbackQuery, state: FSMContext):
-    data = await state.get_data()  # Retrieve current state data
-    plugin_to_delete = data['waiting_for_plugin']  # Get the selected plugin
+    plugin_to_delete = await get_selected_plugin(state)  # Get the selected plugin
+    if plugin_to_delete is None:
+        await report_missing_plugin(callback_query)
+        return
+
     plugin_manager.delete_plugin(plugin_to_delete.name)  # Delete the plugin using the plugin manager
     await state.set_state(PluginState.waiting_for_plugin)  # Reset to plugin selection state
     await callback_query.message.edit_text(
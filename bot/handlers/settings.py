@@ -77,9 +77,9 @@ async def cancel_all_plugin_deletion(callback_query: types.CallbackQuery):
 # Command to confirm and delete all plugins
 @router.callback_query(F.data == "confirm_all_plugins_removal")
 async def delete_all_plugins(callback_query: types.CallbackQuery):
-    # Loop through all loaded plugins and delete them
-    for plugin in plugin_manager.loaded_plugins:
-        plugin_manager.delete_plugin(plugin.name)
+    # Loop through the names of all loaded plugins and delete them, deleting removes them from the registry
+    for plugin_name in plugin_manager.loaded_plugins.names():
+        plugin_manager.delete_plugin(plugin_name)
 
     await callback_query.message.edit_text(
         text="<b>✅ All plugins have been successfully removed.</b>", 
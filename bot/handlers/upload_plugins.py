@@ -2,14 +2,16 @@ import os
 import sys
 import aiohttp
 from io import BytesIO
+from typing import Awaitable, Callable
 from aiogram.enums import ParseMode
-from aiogram import Router, types, F
+from aiogram.exceptions import TelegramBadRequest
+from aiogram import Router, types, F, html
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from bot.middlewares import AccessLevel
 from bot.loader import plugin_manager
 from bot.plugins import extract_plugin_metadata_from_io
-from bot.keyboards import upload_plugin_buttons, reboot_after_plugin_installation_buttons
+from bot.keyboards import upload_plugin_buttons
 
 router = Router()
 
@@ -20,6 +22,24 @@ router.message.middleware(AccessLevel(2))
 class UploadFormState(StatesGroup):
     waiting_for_plugin = State()  # State when the bot is waiting for a plugin file
 
+# Create a callback that reports the dependency installation progress to the admin who triggered it
+def installation_progress(message: types.Message) -> Callable[[str], Awaitable[None]]:
+    status_message = None
+
+    async def report(text: str) -> None:
+        nonlocal status_message
+        status_text = f"<b>⏳ Installing plugin dependencies...</b>\n<code>{html.quote(text)}</code>"
+        try:
+            # Send the status message once, then keep editing it
+            if status_message is None:
+                status_message = await message.answer(text=status_text, parse_mode=ParseMode.HTML)
+            else:
+                await status_message.edit_text(text=status_text, parse_mode=ParseMode.HTML)
+        except TelegramBadRequest:
+            pass  # The status message has not changed
+
+    return report
+
 # Command to handle the "Upload Plugin" request
 @router.message(lambda message: message.text == "📤 Upload Plugin")
 async def cmd_upload_plugin(message: types.Message, state: FSMContext):
@@ -80,11 +100,11 @@ async def handle_plugin_upload(message: types.Message, state: FSMContext):
     plugin_metadata = extract_plugin_metadata_from_io(file_content)
 
     # Check if the plugin is already loaded or if it is an update
-    is_plugin_update = plugin_metadata["name"] in [plugin.name for plugin in plugin_manager.loaded_plugins]
+    is_plugin_update = plugin_metadata["name"] in plugin_manager.loaded_plugins
 
     # Try installing the plugin from the uploaded file
     file_content.seek(0)
-    installation_status = await plugin_manager.install_plugin_from_io(file_content, plugin_metadata)
+    installation_status = await plugin_manager.install_plugin_from_io(file_content, plugin_metadata, installation_progress(message))
     
     # If installation failed, notify the user
     if not installation_status:
@@ -94,13 +114,12 @@ async def handle_plugin_upload(message: types.Message, state: FSMContext):
         )
         return
 
-    # If the plugin is updated, prompt the user to restart the bot
+    # If the plugin is updated, the new version has been reloaded in place
     if is_plugin_update:
         await message.answer(
             text="<b>📥 The plugin file has been uploaded successfully!</b>\n"
-                 "Please restart the bot for the new plugin version to work correctly.",
-            parse_mode=ParseMode.HTML,
-            reply_markup=reboot_after_plugin_installation_buttons()
+                 "The new plugin version has been reloaded and is already working.",
+            parse_mode=ParseMode.HTML
         )
         return
     
@@ -152,11 +171,11 @@ async def cmd_install_plugin_from_url(message: types.Message):
         plugin_metadata = extract_plugin_metadata_from_io(file_io)
 
         # Check if the plugin is already loaded or if it is an update
-        is_plugin_update = plugin_metadata["name"] in [plugin.name for plugin in plugin_manager.loaded_plugins]
+        is_plugin_update = plugin_metadata["name"] in plugin_manager.loaded_plugins
 
         # Try installing the plugin from the downloaded content
         file_io.seek(0)
-        installation_status = await plugin_manager.install_plugin_from_io(file_io, plugin_metadata)
+        installation_status = await plugin_manager.install_plugin_from_io(file_io, plugin_metadata, installation_progress(message))
 
         # If installation failed, notify the user
         if not installation_status:
@@ -166,13 +185,12 @@ async def cmd_install_plugin_from_url(message: types.Message):
             )
             return
 
-        # If the plugin is updated, prompt the user to restart the bot
+        # If the plugin is updated, the new version has been reloaded in place
         if is_plugin_update:
             await message.answer(
                 text="<b>📥 The plugin has been installed successfully!</b>\n"
-                     "Please restart the bot for the new plugin version to work correctly.",
-                parse_mode=ParseMode.HTML,
-                reply_markup=reboot_after_plugin_installation_buttons()
+                     "The new plugin version has been reloaded and is already working.",
+                parse_mode=ParseMode.HTML
             )
             return
 
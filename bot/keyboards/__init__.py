@@ -3,3 +3,4 @@ from .comands import commands_menu
 from .upload_plugin import upload_plugin_buttons, reboot_after_plugin_installation_buttons
 from .plugins import plugins_menu, plugin_action_buttons, plugin_removal_confirmation_buttons
 from .settings import settings_menu, all_plugins_removal_confirmation_buttons, creator_info_buttons
+from .broadcast import broadcast_cancel_buttons, broadcast_confirmation_buttons, broadcast_progress_buttons
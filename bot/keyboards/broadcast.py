@@ -0,0 +1,29 @@
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+
+
+# Inline button for canceling the broadcast being written
+def broadcast_cancel_buttons():
+    builder = InlineKeyboardBuilder()
+    builder.button(text="❌ Cancel", callback_data="broadcast_cancel")
+    return builder.as_markup()
+
+
+# Inline buttons for confirming a broadcast and choosing its recipients (Users/Admins/Cancel)
+def broadcast_confirmation_buttons():
+    builder = InlineKeyboardBuilder()
+
+    # Buttons to start sending the broadcast, with the minimum access level of the recipients
+    builder.button(text="✅ Send to Users", callback_data="broadcast_confirm:1")
+    builder.button(text="🛡 Send to Admins", callback_data="broadcast_confirm:2")
+    # Button to discard the broadcast
+    builder.button(text="❌ Cancel", callback_data="broadcast_cancel")
+
+    builder.adjust(2, 1)  # Two send buttons in the first row, the cancel button below
+    return builder.as_markup()
+
+
+# Inline button for stopping a running broadcast
+def broadcast_progress_buttons(broadcast_id: int):
+    builder = InlineKeyboardBuilder()
+    builder.button(text="⏹ Stop Broadcast", callback_data=f"broadcast_stop:{broadcast_id}")
+    return builder.as_markup()
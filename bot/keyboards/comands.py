@@ -1,8 +1,18 @@
 from aiogram.utils.keyboard import ReplyKeyboardBuilder
 from bot.loader import plugin_manager
 
+# The commands menu and the plugin registry version it was built for
+_commands_menu_cache = (None, None)
+
 # Function to create a menu with the list of available commands
 def commands_menu():
+    global _commands_menu_cache
+
+    # The menu is only rebuilt after the loaded plugins change
+    version, markup = _commands_menu_cache
+    if version == plugin_manager.loaded_plugins.version:
+        return markup
+
     builder = ReplyKeyboardBuilder()
 
     # Iterate over each loaded plugin and its functions
@@ -19,4 +29,6 @@ def commands_menu():
     builder.button(text="🔙 Back to Main Menu")
     
     builder.adjust(1, repeat=True) # Arrange buttons in one column, with one button per row
-    return builder.as_markup(resize_keyboard=True)
+    markup = builder.as_markup(resize_keyboard=True)
+    _commands_menu_cache = (plugin_manager.loaded_plugins.version, markup)
+    return markup
@@ -1,18 +1,31 @@
 from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
 from bot.loader import plugin_manager
+from bot.plugins.registry import get_plugin_title
+
+# The plugin menu and the plugin registry version it was built for
+_plugins_menu_cache = (None, None)
 
 # Menu with the list of available plugins
 def plugins_menu():
+    global _plugins_menu_cache
+
+    # The menu is only rebuilt after the loaded plugins change
+    version, markup = _plugins_menu_cache
+    if version == plugin_manager.loaded_plugins.version:
+        return markup
+
     builder = ReplyKeyboardBuilder()
 
     # Add a button for each loaded plugin with its title or name
     for plugin in plugin_manager.loaded_plugins:
-        builder.button(text=(plugin.title or plugin.name))
+        builder.button(text=get_plugin_title(plugin))
 
     # Add the 'Back' button to navigate to the main menu
     builder.button(text="🔙 Back to Main Menu")
     builder.adjust(1, repeat=True)  # Arrange the buttons to have 1 per row
-    return builder.as_markup(resize_keyboard=True)
+    markup = builder.as_markup(resize_keyboard=True)
+    _plugins_menu_cache = (plugin_manager.loaded_plugins.version, markup)
+    return markup
 
 
 # Inline buttons for plugin settings (options to delete or cancel plugin operations)
@@ -16,6 +16,8 @@ def settings_menu():
     builder.button(text="🔄 Reboot")
     # Button to send bot logs
     builder.button(text="📝 Logs")
+    # Button to send a message to every user
+    builder.button(text="📣 Broadcast")
     # Button to return to the main menu
     builder.button(text="🔙 Back to Main Menu")
     
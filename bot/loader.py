@@ -1,8 +1,27 @@
 from aiogram import Bot, Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
 from bot.config import config
-from bot.plugins import PluginManager
+from bot.db import DatabaseStorage
+from bot.plugins import PluginManager, ExactTextIndex
+from bot.middlewares import UserContext, RateLimiter
+from bot.scheduler import UpdateScheduler
+from bot.broadcast import Broadcaster
 
 bot = Bot(token=config.BOT_TOKEN)
-dp = Dispatcher()
+if config.RATE_LIMIT:
+    bot.session.middleware(RateLimiter(
+        config.RATE_LIMIT_GLOBAL,
+        config.RATE_LIMIT_PRIVATE,
+        config.RATE_LIMIT_GROUP / 60,
+        config.RATE_LIMIT_CHAT_BURST,
+        config.RATE_LIMIT_MAX_RETRIES
+    ))
+
+dp = Dispatcher(storage=DatabaseStorage() if config.FSM_STORAGE == "database" else MemoryStorage())
+dp.update.outer_middleware(UserContext())
+# Must stay the last outer message middleware
+dp.message.outer_middleware(ExactTextIndex(dp))
 
 plugin_manager = PluginManager(dp, bot)
+update_scheduler = UpdateScheduler(dp, bot, config.UPDATE_CONCURRENCY, config.UPDATE_MAX_PENDING)
+broadcaster = Broadcaster(bot, config.BROADCAST_CONCURRENCY, config.BROADCAST_CHUNK_SIZE)
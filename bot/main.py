@@ -1,41 +1,78 @@
 import asyncio
 import argparse
 from aiogram.enums import ParseMode
-from bot.db import add_user
+from bot.db import add_user, registration_queue, plugin_data_buffer, activity_tracker
 from bot.config import config, logger
-from bot.plugins import plugin_manager
+from bot.profiler import startup_profiler
+from bot.webhook import run_webhook
+from bot.plugins import PluginWatcher
 from bot.handlers import register_handlers
 from bot.db.database import create_db_and_tables
-from bot.loader import plugin_manager, bot, dp
+from bot.loader import plugin_manager, update_scheduler, broadcaster, bot, dp
 
 
 # Function to parse command-line arguments
 def parse_arguments() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Bot reboot")
     parser.add_argument('--user_id', type=int, help='User ID', default=None)
+    parser.add_argument(
+        '--profile-startup', nargs='?', const='startup_profile.json', default=None, metavar='REPORT_PATH',
+        help='Profile the startup phases and plugins, and write a JSON report (default: startup_profile.json)'
+    )
+    parser.add_argument(
+        '--webhook', action='store_true',
+        help='Receive updates through a webhook served on WEBHOOK_HOST:WEBHOOK_PORT instead of long polling'
+    )
     return parser.parse_args()
 
 
 # Main bot initialization and startup logic
 async def main() -> None:
+    # Parse command-line arguments
+    args = parse_arguments()
+
+    if args.profile_startup:
+        startup_profiler.start()
+
     logger.info("Starting bot...")
 
     # Initialize the database
     logger.info("Initializing database...")
-    await create_db_and_tables()
+    with startup_profiler.phase("create_db_and_tables"):
+        await create_db_and_tables()
 
     # Create the owner account
-    await add_user(config.OWNER_ID, 3)
+    with startup_profiler.phase("add_owner"):
+        await add_user(config.OWNER_ID, 3)
     logger.info("The owner account has been created.")
 
     # Register handlers
-    register_handlers(dp)
+    with startup_profiler.phase("register_handlers"):
+        register_handlers(dp)
 
     # Load plugins
-    await plugin_manager.load_plugins()
+    with startup_profiler.phase("load_plugins"):
+        await plugin_manager.load_plugins()
 
-    # Parse command-line arguments
-    args = parse_arguments()
+    # Stop the broadcasts at their last checkpoint, then store the users waiting for registration,
+    # the plugin data, the user activity and the FSM states before the bot stops
+    dp.shutdown.register(broadcaster.stop)
+    dp.shutdown.register(registration_queue.close)
+    dp.shutdown.register(plugin_data_buffer.close)
+    dp.shutdown.register(activity_tracker.close)
+    dp.shutdown.register(dp.storage.close)
+
+    # Watch the plugins directory for changes
+    if config.PLUGIN_WATCHER:
+        plugin_watcher = PluginWatcher(plugin_manager)
+        await plugin_watcher.start()
+        dp.shutdown.register(plugin_watcher.stop)
+
+    # Continue the broadcasts interrupted by a crash or a reboot
+    await broadcaster.resume()
+
+    # The startup is over once the updates are received
+    startup_profiler.stop(args.profile_startup)
 
     # Send reboot notification if user_id is provided
     if args.user_id:
@@ -45,9 +82,15 @@ async def main() -> None:
             parse_mode=ParseMode.HTML
         )
 
-    # Start polling the bot for new updates
     logger.info("Bot is up and running.")
-    await dp.start_polling(bot)
+    if args.webhook:
+        # Let Telegram push the updates to the webhook server, chats are processed like in polling mode
+        await run_webhook(dp, bot, update_scheduler)
+    else:
+        # Polling fails while a webhook is set, e.g. after running in webhook mode
+        await bot.delete_webhook()
+        # Chats are processed in parallel, the updates of each chat in order
+        await update_scheduler.start_polling()
 
 
 if __name__ == "__main__":
@@ -1 +1,3 @@
 from .access_level import AccessLevel
+from .user_context import UserContext
+from .rate_limit import RateLimiter, bulk_sending, send_priority, INTERACTIVE_PRIORITY, BULK_PRIORITY
@@ -2,7 +2,7 @@ from aiogram.types import Message
 from aiogram import BaseMiddleware
 from aiogram.enums import ParseMode
 from typing import Callable, Dict, Any, Awaitable
-from bot.db import get_user_access_level, add_user
+from bot.db import get_user_access_level, registration_queue
 
 
 class AccessLevel(BaseMiddleware):
@@ -15,8 +15,15 @@ class AccessLevel(BaseMiddleware):
         event: Message,
         data: Dict[str, Any]
     ) -> Any:
-        if await get_user_access_level(event.from_user.id) < self.access_level:
-            add_user(event.from_user.id, 0)
+        # The access level is preloaded by the UserContext middleware
+        access_level = data.get("access_level")
+        if access_level is None:
+            access_level = await get_user_access_level(event.from_user.id)
+
+        if access_level < self.access_level:
+            # Unknown users are registered in bulk in the background
+            if data.get("user") is None:
+                registration_queue.add(event.from_user.id, 0)
             await event.answer("<b>🚫 Access to this section is restricted.</b>\nPlease contact the bot administrator to request permission.", parse_mode=ParseMode.HTML)
             return
         
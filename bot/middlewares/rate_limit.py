@@ -0,0 +1,228 @@
+import time
+import asyncio
+import heapq
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+from bot.config import logger
+
+# Priority lanes of the outbound messages, lower values are sent first
+INTERACTIVE_PRIORITY = 0
+BULK_PRIORITY = 1
+
+# Priority of the messages sent from the current task
+send_priority: ContextVar[int] = ContextVar("send_priority", default=INTERACTIVE_PRIORITY)
+
+# Methods sending a message to a chat, which Telegram rate limits
+RATE_LIMITED_PREFIXES = ("send", "copyMessage", "forwardMessage")
+NOT_RATE_LIMITED_METHODS = {"sendChatAction"}
+
+# Number of chat buckets above which the buckets of idle chats are dropped
+CHAT_BUCKETS_CLEANUP_SIZE = 10000
+
+
+@contextmanager
+def bulk_sending() -> Iterator[None]:
+    """
+    Sends the messages of the block, and of the tasks started in it, in the bulk lane,
+    after the replies to the users.
+    """
+    token = send_priority.set(BULK_PRIORITY)
+    try:
+        yield
+    finally:
+        send_priority.reset(token)
+
+
+class TokenBucket:
+    """
+    Token bucket handing out tokens in advance: every caller gets the time to wait for its token, in call order.
+    """
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initializes a full bucket.
+
+        :param rate: Tokens added per second.
+        :param capacity: Maximum number of tokens, the allowed burst.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        """
+        Adds the tokens earned since the last update.
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self) -> float:
+        """
+        Takes a token.
+
+        :return: Seconds to wait before the token may be used.
+        """
+        self._refill()
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hands out no token for the given time, e.g. after a flood error.
+
+        :param seconds: The time to wait.
+        :return: None
+        """
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+    def is_full(self) -> bool:
+        """
+        Tells whether the bucket is full, i.e. nothing was sent recently.
+        """
+        self._refill()
+        return self.tokens >= self.capacity
+
+
+class PriorityTokenBucket(TokenBucket):
+    """
+    Token bucket whose waiting callers are served by priority, then in call order.
+    """
+    def __init__(self, rate: float, capacity: float):
+        super().__init__(rate, capacity)
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._grant_task: Optional[asyncio.Task] = None
+
+    async def acquire(self, priority: int) -> None:
+        """
+        Waits for a token.
+
+        :param priority: The priority of the caller, lower values are served first.
+        :return: None
+        """
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        if self._grant_task is None or self._grant_task.done():
+            self._grant_task = asyncio.create_task(self._grant())
+        await future
+
+    async def _grant(self) -> None:
+        """
+        Hands out the tokens to the waiting callers as they become available.
+
+        :return: None
+        """
+        while self._waiters:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                continue
+
+            _, _, future = heapq.heappop(self._waiters)
+            # Callers that were cancelled while waiting do not use a token
+            if not future.done():
+                self.tokens -= 1
+                future.set_result(None)
+
+
+class RateLimiter(BaseRequestMiddleware):
+    """
+    Request middleware keeping the outbound messages within the Telegram rate limits.
+
+    Messages wait for a token of their chat, then for a token of the global bucket, where the replies to the
+    users go before the messages sent in bulk (see bulk_sending()). Flood errors are retried after the delay
+    requested by Telegram.
+    """
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        private_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        chat_burst: float = 3.0,
+        max_retries: int = 3
+    ):
+        """
+        Initializes the rate limiter.
+
+        :param global_rate: Messages per second to all chats.
+        :param private_rate: Messages per second to a private chat.
+        :param group_rate: Messages per second to a group or channel.
+        :param chat_burst: Messages that may be sent at once to a chat that has been quiet.
+        :param max_retries: Number of times a message is retried after a flood error.
+        """
+        self.private_rate = private_rate
+        self.group_rate = group_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.global_bucket = PriorityTokenBucket(global_rate, 1)
+        self.chat_buckets: Dict[Union[int, str], TokenBucket] = {}
+
+    def _get_chat_bucket(self, chat_id: Union[int, str]) -> TokenBucket:
+        """
+        Returns the bucket of a chat, creating it if needed.
+
+        :param chat_id: The chat ID, or the @username of a channel.
+        :return: The bucket of the chat.
+        """
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) >= CHAT_BUCKETS_CLEANUP_SIZE:
+                # A full bucket holds no state worth keeping
+                self.chat_buckets = {key: value for key, value in self.chat_buckets.items() if not value.is_full()}
+
+            # Groups and channels have negative IDs or usernames
+            is_private = isinstance(chat_id, int) and chat_id > 0
+            bucket = TokenBucket(self.private_rate if is_private else self.group_rate, self.chat_burst)
+            self.chat_buckets[chat_id] = bucket
+        return bucket
+
+    async def _acquire(self, chat_id: Optional[Union[int, str]]) -> None:
+        """
+        Waits until a message may be sent to a chat.
+
+        :param chat_id: The chat ID, None for methods without a chat.
+        :return: None
+        """
+        if chat_id is not None:
+            delay = self._get_chat_bucket(chat_id).reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await self.global_bucket.acquire(send_priority.get())
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType]
+    ) -> Response[TelegramType]:
+        api_method = method.__api_method__
+        if not api_method.startswith(RATE_LIMITED_PREFIXES) or api_method in NOT_RATE_LIMITED_METHODS:
+            return await make_request(bot, method)
+
+        chat_id = getattr(method, "chat_id", None)
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(chat_id)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as error:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"Flood control on {api_method} to chat {chat_id}, retrying in {error.retry_after} seconds.")
+                if chat_id is not None:
+                    self._get_chat_bucket(chat_id).pause(error.retry_after)
+                else:
+                    await asyncio.sleep(error.retry_after)
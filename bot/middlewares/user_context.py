@@ -0,0 +1,30 @@
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+from typing import Callable, Dict, Any, Awaitable
+from bot.config import config
+from bot.db import get_user, activity_tracker
+
+
+class UserContext(BaseMiddleware):
+    """
+    Outer update middleware loading the user record once per update.
+
+    Handlers and middlewares receive it as `user` (None for unknown users) and the access level as `access_level`.
+    The activity of the user is recorded in memory and stored in batches.
+    """
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        event_user = data.get("event_from_user")
+        if event_user is not None:
+            user = await get_user(event_user.id)
+            data["user"] = user
+            data["access_level"] = user.access_level if user and user.access_level is not None else 0
+
+            if config.ACTIVITY_TRACKING:
+                activity_tracker.track(event_user.id, 1 if isinstance(event, Update) and event.message is not None else 0)
+
+        return await handler(event, data)
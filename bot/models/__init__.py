@@ -2,3 +2,8 @@ from .base import Base
 from .user import User
 from .plugin import Plugin
 from .function import Function
+from .plugin_data import PluginData
+from .fsm_state import FSMStateRecord
+from .schema_version import SchemaVersion
+from .user_activity import UserActivity
+from .broadcast import Broadcast
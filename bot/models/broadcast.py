@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, String, Float, Text
+from .base import Base
+
+
+class Broadcast(Base):
+    __tablename__ = 'broadcasts'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    text = Column(Text, nullable=False)
+    parse_mode = Column(String, nullable=True)
+    min_access_level = Column(Integer, default=1)  # Only users with at least this access level receive the message
+    status = Column(String, default="running", index=True)  # running, completed or cancelled
+    last_user_id = Column(Integer, default=0)  # Checkpoint: every user up to this ID has been handled
+    sent = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    total = Column(Integer, default=0)  # Number of recipients when the broadcast was created
+    created_by = Column(Integer, nullable=True)  # ID of the user who started the broadcast
+    created_at = Column(Float)
+    finished_at = Column(Float, nullable=True)
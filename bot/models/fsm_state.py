@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, Text
+from .base import Base
+
+
+class FSMStateRecord(Base):
+    __tablename__ = 'fsm_states'
+
+    key = Column(String, primary_key=True)  # Bot, chat, user, thread, business connection and destiny of the state
+    state = Column(String, nullable=True)  # Name of the current state, None if no state is set
+    data = Column(Text, default="{}")  # FSM data serialized as JSON
@@ -6,3 +6,16 @@ class Function:
         self.name = name
         self.function_type = function_type
         self.description = description
+
+    def to_dict(self) -> dict:
+        """
+        Returns the function metadata as a JSON serializable dictionary.
+        """
+        return {"name": self.name, "type": self.function_type, "description": self.description}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Function":
+        """
+        Creates a function from a dictionary returned by to_dict().
+        """
+        return cls(name=data["name"], function_type=data["type"], description=data["description"])
@@ -1,12 +1,13 @@
 import copy
-from typing import List
+from typing import Dict, List, Optional
 from .function import Function
 
 class Plugin:
     """
     Represents a plugin with its metadata and functions.
     """
-    def __init__(self, name: str, title: str, version: str, description: str, functions: List[Function], dependencies: List[str], file_path: str):
+    def __init__(self, name: str, title: str, version: str, description: str, functions: List[Function], dependencies: List[str], file_path: str,
+                 triggers: Optional[Dict[str, List[str]]] = None, lazy: bool = True):
         self.name = name
         self.title = title
         self.version = version
@@ -14,9 +15,44 @@ class Plugin:
         self.dependencies = dependencies
         self.functions = functions
         self.file_path = file_path
+        self.triggers = triggers  # Commands and texts the plugin handles, None if they can't be determined statically
+        self.lazy = lazy  # Whether the plugin may be imported on its first matching update
 
     def copy(self):
         """
         Returns a copy of the plugin.
         """
         return copy.deepcopy(self)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the plugin metadata as a JSON serializable dictionary.
+        """
+        return {
+            "name": self.name,
+            "title": self.title,
+            "version": self.version,
+            "description": self.description,
+            "dependencies": list(self.dependencies),
+            "functions": [function.to_dict() for function in self.functions],
+            "file_path": self.file_path,
+            "triggers": self.triggers,
+            "lazy": self.lazy
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Plugin":
+        """
+        Creates a plugin from a dictionary returned by to_dict().
+        """
+        return cls(
+            name=data["name"],
+            title=data["title"],
+            version=data["version"],
+            description=data["description"],
+            dependencies=data["dependencies"],
+            functions=[Function.from_dict(function) for function in data["functions"]],
+            file_path=data["file_path"],
+            triggers=data.get("triggers"),
+            lazy=data.get("lazy", True)
+        )
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, Float, JSON
+from .base import Base
+
+
+class PluginData(Base):
+    __tablename__ = 'plugin_data'
+
+    namespace = Column(String, primary_key=True)  # Name of the plugin owning the value
+    key = Column(String, primary_key=True)  # Key of the value inside the namespace
+    value = Column(JSON)  # Any JSON serializable value
+    expires_at = Column(Float, nullable=True, index=True)  # Unix time after which the value is deleted, None to keep it
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String, Float
+from .base import Base
+
+
+class SchemaVersion(Base):
+    __tablename__ = 'schema_version'
+
+    version = Column(Integer, primary_key=True)  # Version of an applied migration
+    description = Column(String)  # What the migration changed
+    applied_at = Column(Float)  # Unix time at which the migration was applied
@@ -6,4 +6,4 @@ class User(Base):
     __tablename__ = 'users'
 
     id = Column(Integer, primary_key=True)  # Primary key for the user
-    access_level = Column(Integer)  # Access level as an integer (e.g., 0 = unauthorized user, 1 = regular user, 2 = admin, 3 = owner)
+    access_level = Column(Integer, index=True)  # Access level as an integer (e.g., 0 = unauthorized user, 1 = regular user, 2 = admin, 3 = owner)
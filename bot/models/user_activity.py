@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, Float
+from .base import Base
+
+
+class UserActivity(Base):
+    __tablename__ = 'user_activity'
+
+    user_id = Column(Integer, primary_key=True)  # Telegram ID of the user
+    last_seen = Column(Float)  # Unix time of the last update received from the user
+    message_count = Column(Integer, default=0)  # Number of messages received from the user
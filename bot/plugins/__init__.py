@@ -1,2 +1,6 @@
 from .plugin_manager import Plugin, PluginManager
-from .parser import check_plugin_exists, load_plugin_module, extract_plugin_metadata, extract_plugin_functions, get_plugin_metadata, extract_plugin_metadata_from_io
+from .module_registry import ModuleRegistry
+from .registry import PluginRegistry
+from .watcher import PluginWatcher
+from .text_index import ExactTextIndex
+from .parser import check_plugin_exists, compile_plugin, load_plugin_module, extract_plugin_metadata, extract_plugin_functions, get_plugin_metadata, extract_plugin_metadata_from_io, parse_plugin_source, extract_plugin_triggers
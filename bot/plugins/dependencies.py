@@ -0,0 +1,125 @@
+import sys
+import time
+import asyncio
+import importlib
+import importlib.metadata
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from packaging.requirements import Requirement, InvalidRequirement
+from packaging.utils import canonicalize_name
+from bot.config import logger
+
+# Callback receiving progress messages of a dependency installation
+ProgressCallback = Callable[[str], Awaitable[None]]
+
+# Minimum time between two progress messages, in seconds
+PROGRESS_INTERVAL = 1.0
+
+
+def is_dependency_satisfied(dependency: str) -> bool:
+    """
+    Checks whether an installed distribution already satisfies the requirement.
+
+    :param dependency: A requirement string, e.g. 'requests>=2.0'.
+    :return: True if the requirement is satisfied, False if it has to be installed.
+    """
+    try:
+        requirement = Requirement(dependency)
+    except InvalidRequirement:
+        # URLs and other pip specific formats are left to pip
+        return False
+
+    # Requirements for other platforms or Python versions never have to be installed
+    if requirement.marker is not None and not requirement.marker.evaluate():
+        return True
+
+    try:
+        installed_version = importlib.metadata.version(requirement.name)
+    except importlib.metadata.PackageNotFoundError:
+        return False
+
+    return requirement.specifier.contains(installed_version, prereleases=True)
+
+
+def canonical_dependency(dependency: str) -> str:
+    """
+    Returns a requirement in a canonical form, so that the same requirement written differently compares equal.
+
+    :param dependency: A requirement string, e.g. ' Requests >= 2.0'.
+    :return: The requirement with a canonical project name, e.g. 'requests>=2.0', or the stripped string if it can't be parsed.
+    """
+    dependency = dependency.strip()
+    try:
+        requirement = Requirement(dependency)
+    except InvalidRequirement:
+        return dependency
+
+    requirement.name = canonicalize_name(requirement.name)
+    return str(requirement)
+
+
+def get_missing_dependencies(dependencies: Iterable[str]) -> List[str]:
+    """
+    Deduplicates the requirements and returns the ones that are not satisfied yet.
+
+    :param dependencies: Requirement strings, possibly collected from several plugins.
+    :return: The requirements that have to be installed, stripped and in their original order.
+    """
+    unique_dependencies: Dict[str, str] = {}
+    for dependency in dependencies:
+        if dependency and dependency.strip():
+            unique_dependencies.setdefault(canonical_dependency(dependency), dependency.strip())
+    return [dependency for dependency in unique_dependencies.values() if not is_dependency_satisfied(dependency)]
+
+
+async def install_dependencies(dependencies: Iterable[str], progress: Optional[ProgressCallback] = None) -> bool:
+    """
+    Installs the missing requirements with a single pip run, without blocking the event loop.
+
+    :param dependencies: Requirement strings, possibly collected from several plugins.
+    :param progress: Coroutine receiving progress messages, e.g. to inform the admin who triggered the installation.
+    :return: True if all requirements are satisfied afterwards, False otherwise.
+    """
+    missing_dependencies = await asyncio.to_thread(get_missing_dependencies, dependencies)
+    if not missing_dependencies:
+        return True
+
+    last_report = 0.0
+
+    async def report(text: str, force: bool = False) -> None:
+        nonlocal last_report
+        logger.info(text)
+        if progress is None or (not force and time.monotonic() - last_report < PROGRESS_INTERVAL):
+            return
+        last_report = time.monotonic()
+        try:
+            await progress(text)
+        except Exception as error:
+            logger.warning(f"Failed to report the dependency installation progress: {error}")
+
+    await report(f"Installing dependencies: {', '.join(missing_dependencies)}", force=True)
+
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "pip", "install", *missing_dependencies,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT
+    )
+
+    # Forward the interesting pip output while it is running
+    async for raw_line in process.stdout:
+        line = raw_line.decode('utf-8', errors='replace').strip()
+        if line.startswith(("Collecting", "Downloading", "Installing", "Successfully", "ERROR")):
+            await report(line)
+        else:
+            logger.debug(line)
+
+    return_code = await process.wait()
+
+    # Make the new distributions visible to importlib
+    importlib.invalidate_caches()
+
+    if return_code != 0:
+        await report(f"Failed to install dependencies (pip exited with code {return_code}).", force=True)
+        return False
+
+    await report(f"Installed dependencies: {', '.join(missing_dependencies)}", force=True)
+    return True
@@ -0,0 +1,36 @@
+from typing import Any, Awaitable, Callable, Optional
+from aiogram import Router, F
+from aiogram.types import Message
+from aiogram.filters import Command
+from aiogram.dispatcher.event.bases import UNHANDLED
+from bot.models import Plugin
+
+
+def build_lazy_router(plugin: Plugin, activate: Callable[[Plugin], Awaitable[Optional[Router]]]) -> Router:
+    """
+    Builds a lightweight router that stands in for a plugin until the first update that could route to it.
+
+    The router only matches the commands and texts declared in the plugin triggers. On the first match the plugin
+    is activated and the update is passed on to the real plugin router.
+
+    :param plugin: The plugin to build the router for.
+    :param activate: Coroutine that imports the plugin and returns its router.
+    :return: The lazy router.
+    """
+    router = Router(name=f"lazy_{plugin.name}")
+
+    async def activate_plugin(message: Message, **data: Any) -> Any:
+        plugin_router = await activate(plugin)
+        if plugin_router is None:
+            return UNHANDLED
+
+        # Let the real plugin handlers (and their middlewares) process the update
+        return await plugin_router.propagate_event(update_type="message", event=message, **data)
+
+    # The filters are a superset of the plugin ones, a miss in the real router is passed on to the next routers
+    if plugin.triggers["commands"]:
+        router.message.register(activate_plugin, Command(*plugin.triggers["commands"], ignore_case=True))
+    for text in plugin.triggers["texts"]:
+        router.message.register(activate_plugin, F.text == text)
+
+    return router
@@ -0,0 +1,155 @@
+import os
+import json
+import hashlib
+from typing import Dict, Optional
+from bot.models import Plugin
+from bot.config import logger
+
+# Bump when the stored plugin metadata format changes, so that old manifests are rebuilt
+MANIFEST_FORMAT = 2
+
+
+def file_sha256(file_path: str) -> str:
+    """
+    Calculates the sha256 hash of a file.
+
+    :param file_path: Path to the file.
+    :return: The hex digest of the file content.
+    """
+    with open(file_path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+class PluginManifest:
+    """
+    On-disk cache of plugin metadata, keyed by the plugin file path and validated by its mtime, size and sha256.
+    """
+    def __init__(self, manifest_path: str):
+        """
+        Initializes the manifest. The file is read on the first lookup.
+
+        :param manifest_path: Path to the manifest JSON file.
+        """
+        self.manifest_path = str(manifest_path)
+        self._entries: Optional[Dict[str, dict]] = None
+        self._dirty = False
+
+    @property
+    def entries(self) -> Dict[str, dict]:
+        """
+        Returns the manifest entries, reading them from disk if necessary.
+        """
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _read(self) -> Dict[str, dict]:
+        """
+        Reads the manifest file. A missing, corrupted or outdated manifest is treated as empty.
+
+        :return: The manifest entries.
+        """
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+        except FileNotFoundError:
+            return {}
+        except Exception as error:
+            logger.warning(f"Ignoring unreadable plugin manifest '{self.manifest_path}': {error}")
+            return {}
+
+        if manifest.get("format") != MANIFEST_FORMAT:
+            logger.info("The plugin manifest format has changed, rebuilding it.")
+            return {}
+        return manifest.get("plugins", {})
+
+    def lookup(self, plugin_path: str) -> Optional[Plugin]:
+        """
+        Returns the cached metadata of a plugin file if the file has not changed since it was stored.
+
+        :param plugin_path: Path to the plugin file.
+        :return: The cached Plugin, or None if the file is new or has changed.
+        """
+        plugin_path = str(plugin_path)
+        entry = self.entries.get(plugin_path)
+        if entry is None:
+            return None
+
+        try:
+            stat = os.stat(plugin_path)
+            if (stat.st_mtime_ns, stat.st_size) != (entry["mtime"], entry["size"]):
+                # The file was touched, it is still valid if its content is the same
+                if file_sha256(plugin_path) != entry["sha256"]:
+                    return None
+                entry["mtime"], entry["size"] = stat.st_mtime_ns, stat.st_size
+                self._dirty = True
+
+            plugin = Plugin.from_dict(entry["plugin"])
+        except Exception as error:
+            logger.debug(f"Plugin manifest entry for '{plugin_path}' is not usable: {error}")
+            return None
+
+        plugin.file_path = plugin_path
+        return plugin
+
+    def store(self, plugin_path: str, plugin: Plugin) -> None:
+        """
+        Stores the metadata of a plugin file.
+
+        :param plugin_path: Path to the plugin file.
+        :param plugin: The metadata extracted from the plugin.
+        :return: None
+        """
+        plugin_path = str(plugin_path)
+        try:
+            stat = os.stat(plugin_path)
+            self.entries[plugin_path] = {
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "sha256": file_sha256(plugin_path),
+                "plugin": plugin.to_dict()
+            }
+            self._dirty = True
+        except Exception as error:
+            logger.warning(f"Failed to add plugin '{plugin.name}' to the manifest: {error}")
+
+    def discard(self, plugin_path: str) -> None:
+        """
+        Removes a plugin file from the manifest.
+
+        :param plugin_path: Path to the plugin file.
+        :return: None
+        """
+        if self.entries.pop(str(plugin_path), None) is not None:
+            self._dirty = True
+
+    def prune(self) -> None:
+        """
+        Removes the entries of plugin files that no longer exist.
+
+        :return: None
+        """
+        for plugin_path in [path for path in self.entries if not os.path.exists(path)]:
+            self.discard(plugin_path)
+
+    def save(self) -> None:
+        """
+        Writes the manifest to disk if it has changed.
+
+        :return: None
+        """
+        if not self._dirty:
+            return
+
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+
+            # Write to a temporary file first, so that a crash never leaves a truncated manifest
+            temp_path = f"{self.manifest_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as manifest_file:
+                json.dump({"format": MANIFEST_FORMAT, "plugins": self.entries}, manifest_file, ensure_ascii=False)
+            os.replace(temp_path, self.manifest_path)
+
+            self._dirty = False
+        except Exception as error:
+            logger.warning(f"Failed to save the plugin manifest '{self.manifest_path}': {error}")
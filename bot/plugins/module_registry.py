@@ -0,0 +1,91 @@
+from typing import Any, Dict, Optional
+from bot.config import logger
+from .parser import load_plugin_module
+
+
+class ModuleRegistry:
+    """
+    Keeps the plugin modules imported during a load cycle, so that every plugin file is executed only once.
+    """
+    def __init__(self):
+        """
+        Initializes an empty registry.
+        """
+        self._modules: Dict[str, Any] = {}
+        self.import_count = 0
+
+    def load(self, plugin_name: str, plugin_path: str) -> Optional[Any]:
+        """
+        Returns the already imported plugin module or imports it on the first request.
+
+        :param plugin_name: Name of the plugin module.
+        :param plugin_path: Path to the plugin file.
+        :return: The loaded plugin module, or None if it could not be imported.
+        """
+        plugin_module = self._modules.get(plugin_name)
+        if plugin_module is not None:
+            return plugin_module
+
+        self.import_count += 1
+        plugin_module = load_plugin_module(plugin_name, plugin_path)
+
+        # Failed imports are not cached, so they can be retried after installing dependencies
+        if plugin_module is not None:
+            self._modules[plugin_name] = plugin_module
+        return plugin_module
+
+    def get(self, plugin_name: str) -> Optional[Any]:
+        """
+        Returns the imported plugin module without importing it.
+
+        :param plugin_name: Name of the plugin module.
+        :return: The plugin module, or None if it has not been imported.
+        """
+        return self._modules.get(plugin_name)
+
+    def add(self, plugin_name: str, plugin_module: Any) -> None:
+        """
+        Registers an already imported plugin module.
+
+        :param plugin_name: Name of the plugin module.
+        :param plugin_module: The plugin module.
+        :return: None
+        """
+        self._modules[plugin_name] = plugin_module
+
+    def rename(self, old_name: str, new_name: str) -> None:
+        """
+        Moves an imported module under a new name after its plugin file was renamed.
+
+        :param old_name: The name the module was imported under.
+        :param new_name: The new name of the plugin.
+        :return: None
+        """
+        plugin_module = self._modules.pop(old_name, None)
+        if plugin_module is not None:
+            self._modules[new_name] = plugin_module
+            logger.debug(f"Plugin module '{old_name}' is now registered as '{new_name}'.")
+
+    def discard(self, plugin_name: str) -> None:
+        """
+        Forgets the imported module of a plugin, so that it is imported again on the next request.
+
+        :param plugin_name: Name of the plugin module.
+        :return: None
+        """
+        self._modules.pop(plugin_name, None)
+
+    def clear(self) -> None:
+        """
+        Forgets all imported modules and resets the import counter.
+
+        :return: None
+        """
+        self._modules.clear()
+        self.import_count = 0
+
+    def __contains__(self, plugin_name: str) -> bool:
+        return plugin_name in self._modules
+
+    def __len__(self) -> int:
+        return len(self._modules)
@@ -1,16 +1,18 @@
 import os
 import io
-import re
 import ast
 import sys
-import random
-import string
-import subprocess
+import marshal
+import hashlib
 import importlib.util
-from typing import Dict, List, Optional, Any
+from types import CodeType
+from typing import Dict, List, Optional, Any, Tuple, Union, TYPE_CHECKING
 from bot.config import logger, config
 from bot.models import Plugin, Function
 
+if TYPE_CHECKING:
+    from .module_registry import ModuleRegistry
+
 
 def check_plugin_exists(plugin_name: str) -> str:
     """
@@ -25,21 +27,61 @@ def check_plugin_exists(plugin_name: str) -> str:
     return plugin_path
 
 
-def install_dependencies(dependencies: List[str]) -> bool:
+def _bytecode_dir() -> str:
     """
-    Installs the given list of dependencies using pip.
-    
-    :param dependencies: List of dependencies to install.
-    :return: True if the package was installed successfully, False otherwise.
+    Returns the directory of the plugin bytecode cache.
+    """
+    return str(config.PLUGIN_BYTECODE_DIR or os.path.join(config.PLUGIN_CACHE_DIR, "bytecode"))
+
+
+def compile_plugin(plugin_name: str, plugin_path: str) -> CodeType:
     """
-    for dependency in dependencies:
-        try:
-            logger.info(f"Installing dependency: {dependency}")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", dependency])
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to install dependency '{dependency}': {e}")
-            return False  # Return False if installation fails
-    return True
+    Returns the compiled code of a plugin file, using the bytecode cache when possible.
+
+    The cache is keyed by the sha256 of the source and the interpreter version, so it does not depend on
+    the plugins directory being writable or on file modification times.
+
+    :param plugin_name: Name of the plugin module.
+    :param plugin_path: Path to the plugin file.
+    :return: The code object of the plugin module.
+    """
+    with open(plugin_path, 'rb') as plugin_file:
+        plugin_source = plugin_file.read()
+
+    source_hash = hashlib.sha256(plugin_source).hexdigest()
+    cache_tag = sys.implementation.cache_tag
+    cache_path = os.path.join(_bytecode_dir(), f"{plugin_name}.{source_hash}.{cache_tag}.pyc")
+
+    # Use the cached code object
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            if cache_file.read(len(importlib.util.MAGIC_NUMBER)) == importlib.util.MAGIC_NUMBER:
+                return marshal.load(cache_file)
+    except FileNotFoundError:
+        pass
+    except Exception as error:
+        logger.warning(f"Ignoring broken bytecode cache of plugin {plugin_name}: {error}")
+
+    plugin_code = compile(plugin_source, plugin_path, "exec", dont_inherit=True)
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+
+        # Remove the cached versions of the previous sources of this plugin
+        for cache_file_name in os.listdir(os.path.dirname(cache_path)):
+            if cache_file_name.startswith(f"{plugin_name}.") and cache_file_name.endswith(f".{cache_tag}.pyc"):
+                os.remove(os.path.join(os.path.dirname(cache_path), cache_file_name))
+
+        # Write to a temporary file first, so that a concurrent load never reads a partial file
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as cache_file:
+            cache_file.write(importlib.util.MAGIC_NUMBER)
+            marshal.dump(plugin_code, cache_file)
+        os.replace(temp_path, cache_path)
+    except Exception as error:
+        logger.warning(f"Failed to write the bytecode cache of plugin {plugin_name}: {error}")
+
+    return plugin_code
 
 
 def load_plugin_module(plugin_name: str, plugin_path: str) -> Any:
@@ -53,7 +95,7 @@ def load_plugin_module(plugin_name: str, plugin_path: str) -> Any:
     try:
         spec = importlib.util.spec_from_file_location(plugin_name, plugin_path)
         plugin_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(plugin_module)
+        exec(compile_plugin(plugin_name, plugin_path), plugin_module.__dict__)
         return plugin_module
     except Exception as e:
         logger.error(f"Error loading plugin {plugin_name}: {e}")
@@ -80,6 +122,176 @@ def extract_plugin_metadata(plugin_module: Any) -> Dict[str, Optional[str]]:
     return plugin_metadata
 
 
+def _literal_value(node: ast.AST, name: str) -> Any:
+    """
+    Evaluates a literal expression node of the plugin source.
+
+    :param node: The expression node.
+    :param name: Name of the assigned variable, used in error messages.
+    :return: The value of the literal.
+    """
+    try:
+        return ast.literal_eval(node)
+    # literal_eval also raises TypeError, SyntaxError or RecursionError on some non-literal or nested expressions
+    except (ValueError, TypeError, SyntaxError, RecursionError):
+        raise ValueError(f"{name} must be a literal value.")
+
+
+def parse_plugin_source(plugin_source: Union[str, bytes]) -> Tuple[Dict[str, Any], List[Function]]:
+    """
+    Extracts the plugin metadata and the metadata of its functions from the source code, without executing it.
+
+    :param plugin_source: The source code of the plugin.
+    :return: A tuple of the PLUGIN_METADATA dictionary and the list of Function objects declared via `.meta`.
+    """
+    module = ast.parse(plugin_source)
+
+    plugin_metadata = None
+    function_names = []
+    function_metas = {}
+
+    # Only module level statements are inspected, the same ones that define the plugin when it is imported
+    for statement in module.body:
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            function_names.append(statement.name)
+            continue
+
+        if isinstance(statement, ast.Assign):
+            targets, value = statement.targets, statement.value
+        elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+            targets, value = [statement.target], statement.value
+        else:
+            continue
+
+        for target in targets:
+            # PLUGIN_METADATA = {...}
+            if isinstance(target, ast.Name) and target.id == "PLUGIN_METADATA":
+                plugin_metadata = _literal_value(value, "PLUGIN_METADATA")
+
+            # function.meta = {...}
+            elif isinstance(target, ast.Attribute) and target.attr == "meta" and isinstance(target.value, ast.Name):
+                try:
+                    function_metas[target.value.id] = _literal_value(value, f"{target.value.id}.meta")
+                except ValueError as error:
+                    logger.warning(f"Skipping function metadata: {error}")
+
+    if not isinstance(plugin_metadata, dict):
+        raise ValueError("Failed to find PLUGIN_METADATA in the plugin source.")
+
+    plugin_functions = [
+        Function(
+            name=function_metas[function_name].get("name", function_name),
+            function_type=function_metas[function_name].get("type", "unknown"),
+            description=function_metas[function_name].get("description", "")
+        )
+        for function_name in function_names
+        if isinstance(function_metas.get(function_name), dict)
+    ]
+    return plugin_metadata, plugin_functions
+
+
+def _string_literals(node: ast.AST) -> Optional[List[str]]:
+    """
+    Returns the strings of a string literal or of a list, tuple or set of string literals.
+
+    :param node: The expression node.
+    :return: The list of strings, or None if the node is not a string literal collection.
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        values = [_string_literals(element) for element in node.elts]
+        if all(value is not None and len(value) == 1 for value in values):
+            return [value[0] for value in values]
+    return None
+
+
+def _is_magic_text(node: ast.AST) -> bool:
+    """
+    Checks whether the node is the `F.text` magic filter.
+    """
+    return isinstance(node, ast.Attribute) and node.attr == "text" and isinstance(node.value, ast.Name) and node.value.id == "F"
+
+
+def _filter_triggers(node: ast.AST) -> Optional[Tuple[List[str], List[str]]]:
+    """
+    Resolves a message filter to the commands or texts it can match.
+
+    :param node: The filter expression node.
+    :return: A tuple of commands and texts, or None if the filter does not restrict the message text.
+    """
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        # CommandStart()
+        if node.func.id == "CommandStart":
+            return ["start"], []
+
+        # Command("name", ...) or Command(commands=[...]), commands with a custom prefix are not resolved
+        if node.func.id == "Command" and not any(keyword.arg == "prefix" for keyword in node.keywords):
+            commands = []
+            for value in node.args + [keyword.value for keyword in node.keywords if keyword.arg == "commands"]:
+                strings = _string_literals(value)
+                if strings is None:
+                    return None
+                commands.extend(strings)
+            return (commands, []) if commands else None
+
+    # F.text == "text"
+    if (isinstance(node, ast.Compare) and len(node.ops) == 1 and isinstance(node.ops[0], ast.Eq)
+            and _is_magic_text(node.left) and isinstance(node.comparators[0], ast.Constant)
+            and isinstance(node.comparators[0].value, str)):
+        return [], [node.comparators[0].value]
+
+    # F.text.in_([...])
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "in_"
+            and _is_magic_text(node.func.value) and len(node.args) == 1):
+        texts = _string_literals(node.args[0])
+        if texts is not None:
+            return [], texts
+
+    return None
+
+
+def extract_plugin_triggers(plugin_source: Union[str, bytes]) -> Optional[Dict[str, List[str]]]:
+    """
+    Determines the commands and texts the handlers of a plugin respond to, without executing it.
+
+    :param plugin_source: The source code of the plugin.
+    :return: A dictionary with the 'commands' and 'texts' lists, or None if any handler can't be resolved statically.
+    """
+    module = ast.parse(plugin_source)
+    commands, texts = [], []
+
+    for statement in module.body:
+        # Handlers registered by calls (router.message.register(...), router.include_router(...)) can't be resolved
+        if (isinstance(statement, ast.Expr) and isinstance(statement.value, ast.Call)
+                and isinstance(statement.value.func, ast.Attribute)
+                and statement.value.func.attr in ("register", "include_router", "include_routers")):
+            return None
+
+        if not isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+
+        for decorator in statement.decorator_list:
+            # Only handler decorators such as @router.message(...) are of interest
+            if not isinstance(decorator, ast.Call) or not isinstance(decorator.func, ast.Attribute):
+                continue
+            if not isinstance(decorator.func.value, ast.Name):
+                continue
+
+            # Other update types (callback queries, inline queries...) are not routed by text
+            if decorator.func.attr != "message":
+                return None
+
+            # The filters of a handler are combined with AND, so a single text filter is enough to restrict it
+            resolved = next((triggers for triggers in map(_filter_triggers, decorator.args) if triggers), None)
+            if resolved is None:
+                return None
+            commands.extend(resolved[0])
+            texts.extend(resolved[1])
+
+    return {"commands": list(dict.fromkeys(commands)), "texts": list(dict.fromkeys(texts))}
+
+
 def extract_plugin_metadata_from_file(plugin_path: str) -> Dict[str, Optional[str]]:
     """
     Extracts plugin metadata from its file without executing the code.
@@ -88,19 +300,9 @@ def extract_plugin_metadata_from_file(plugin_path: str) -> Dict[str, Optional[st
     :return: A dictionary containing the plugin's metadata.
     """
     try:
-        with open(plugin_path, 'r', encoding='utf-8') as plugin_file:
-            plugin_content = plugin_file.read()
-
-        # Search for the PLUGIN_METADATA line
-        match = re.search(r"PLUGIN_METADATA\s*=\s*({.*?})", plugin_content, re.DOTALL)
-        if match:
-            metadata_str = match.group(1)
-            # Safely convert the string to a dictionary using ast.literal_eval
-            plugin_metadata = ast.literal_eval(metadata_str)
-            return plugin_metadata
-
-        else:
-            raise ValueError("Failed to find PLUGIN_METADATA in the plugin file.")
+        with open(plugin_path, 'rb') as plugin_file:
+            plugin_metadata, _ = parse_plugin_source(plugin_file.read())
+        return plugin_metadata
     except Exception as e:
         raise RuntimeError(f"Error while extracting plugin metadata: {e}")
 
@@ -126,31 +328,34 @@ def extract_plugin_functions(plugin_module: Any) -> List[Function]:
     return plugin_functions
 
 
-def get_plugin_metadata(plugin_name: str) -> Plugin:
+def get_plugin_metadata(plugin_name: str, registry: Optional["ModuleRegistry"] = None) -> Plugin:
     """
     Retrieves the metadata (name, version, description) and functions of the plugin.
 
     :param plugin_name: The name of the plugin to get metadata for.
+    :param registry: Registry to take the already imported plugin module from, if any.
     :return: A Plugin instance containing metadata and function descriptions.
     """
     plugin_path = check_plugin_exists(plugin_name)
-    plugin_module = load_plugin_module(plugin_name, plugin_path)
+    load_module = registry.load if registry is not None else load_plugin_module
+    plugin_module = load_module(plugin_name, plugin_path)
 
+    # Dependencies are installed by the plugin manager before the plugin is imported
     if plugin_module is None:
-        logger.info(f"Attempting to install missing dependencies for plugin: {plugin_name}")
-        plugin_metadata = extract_plugin_metadata_from_file(plugin_path)
-        
-        dependencies = plugin_metadata.get('dependencies', [])
-        install_dependencies(dependencies)
-
-        plugin_module = load_plugin_module(plugin_name, plugin_path)
-        if plugin_module is None:
-            logger.error(f"Failed to load plugin {plugin_name} after installing dependencies.")
-            return None
+        logger.error(f"Failed to load plugin {plugin_name}.")
+        return None
 
     plugin_metadata = extract_plugin_metadata(plugin_module)
     plugin_functions = extract_plugin_functions(plugin_module)
 
+    # Record the handled commands and texts, so that the plugin can be activated lazily later
+    try:
+        with open(plugin_path, 'rb') as plugin_file:
+            plugin_triggers = extract_plugin_triggers(plugin_file.read())
+    except Exception as error:
+        logger.warning(f"Failed to determine the triggers of plugin {plugin_name}: {error}")
+        plugin_triggers = None
+
     return Plugin(
         name=plugin_metadata["name"],
         title=plugin_metadata["title"],
@@ -158,44 +363,20 @@ def get_plugin_metadata(plugin_name: str) -> Plugin:
         description=plugin_metadata["description"],
         dependencies=plugin_metadata.get("dependencies", []),
         functions=plugin_functions,
-        file_path=plugin_path
+        file_path=plugin_path,
+        triggers=plugin_triggers,
+        lazy=plugin_metadata.get("lazy", True)
     )
 
-def _generate_random_filename(length: int = 5) -> str:
-    """
-    Generates a random filename for the plugin file.
-
-    :param length: Length of the random filename.
-    :return: Randomly generated filename.
+def extract_plugin_metadata_from_io(io_stream: io.BytesIO) -> Dict[str, Optional[str]]:
     """
-    characters = string.ascii_letters + string.digits
-    return ''.join(random.choice(characters) for _ in range(length))
-
-
-def extract_plugin_metadata_from_io(io_stream: io.BytesIO)-> Dict[str, Optional[str]]:
-    """
-    Process the plugin from the I/O stream, extract its metadata, and remove the file after processing.
+    Extracts the plugin metadata from the I/O stream without writing it to disk or executing the code.
 
     :param io_stream: The I/O stream containing the plugin Python file content.
     :return: A dictionary containing the plugin's metadata.
     """
-    # Read the I/O stream and save the content as a Python file
-    plugin_content = io_stream.read().decode('utf-8')
-
-    # Create the random plugin filename
-    random_plugin_name = _generate_random_filename()
-    plugin_file_path = os.path.join(config.PLUGINS_DIR, f"{random_plugin_name}.py")
-
-    # Save the plugin content as a Python file in the plugins directory
-    with open(plugin_file_path, 'w', encoding='utf-8') as plugin_file:
-        plugin_file.write(plugin_content)
-
     try:
-        plugin_metadata = extract_plugin_metadata_from_file(plugin_file_path)
+        plugin_metadata, _ = parse_plugin_source(io_stream.read())
         return plugin_metadata
-    
-    finally:
-        # Remove the plugin file after processing
-        if os.path.exists(plugin_file_path):
-            os.remove(plugin_file_path)
-            logger.info(f"Plugin file {random_plugin_name} has been removed.")
+    except Exception as e:
+        raise RuntimeError(f"Error while extracting plugin metadata: {e}")
@@ -1,15 +1,21 @@
 import os
 import re
 import io
-import sys
 import pkgutil
 import asyncio
-import subprocess
-from aiogram import Bot, Dispatcher
-from typing import List, Optional, Dict
+from aiogram import Bot, Dispatcher, Router
+from typing import Any, Iterable, List, Optional, Dict, Tuple
 from bot.models import Plugin
 from bot.config import logger, config
-from .parser import load_plugin_module, get_plugin_metadata
+from bot.profiler import startup_profiler
+from bot.middlewares import bulk_sending
+from .parser import check_plugin_exists, get_plugin_metadata, extract_plugin_metadata_from_file
+from .dependencies import ProgressCallback, canonical_dependency, install_dependencies, get_missing_dependencies
+from .lazy import build_lazy_router
+from .routing import attach_router, replace_router, detach_router
+from .manifest import PluginManifest
+from .module_registry import ModuleRegistry
+from .registry import PluginRegistry
 
 
 class PluginManager:
@@ -25,39 +31,54 @@ class PluginManager:
         self.plugins_dir = config.PLUGINS_DIR
         self.dispatcher = db
         self.bot = bot
-        self.loaded_plugins: List[Plugin] = []
-
-    def _install_dependencies(self, dependencies: List[str]) -> bool:
+        self._loaded_plugins = PluginRegistry()
+        self.modules = ModuleRegistry()
+        self.manifest = PluginManifest(os.path.join(config.PLUGIN_CACHE_DIR, "manifest.json"))
+        self.routers: Dict[str, Router] = {}
+        self.lazy_routers: Dict[str, Router] = {}
+        self.tasks: Dict[str, List[asyncio.Task]] = {}
+        self._activation_lock = asyncio.Lock()
+        # Serializes the changes of the loaded plugins, e.g. an upload and the watcher syncing the uploaded file
+        self._plugin_lock = asyncio.Lock()
+
+    @property
+    def loaded_plugins(self) -> PluginRegistry:
         """
-        Installs the given list of dependencies using pip.
-        
-        :param dependencies: List of dependencies to install.
-        :return: True if the package was installed successfully, False otherwise.
+        The loaded plugins, indexed by name and title.
         """
-        for dependency in dependencies:
-            try:
-                logger.info(f"Installing dependency: {dependency}")
-                subprocess.check_call([sys.executable, "-m", "pip", "install", dependency])
-            except subprocess.CalledProcessError as e:
-                logger.error(f"Failed to install dependency '{dependency}': {e}")
-                return False  # Return False if installation fails
-        return True
+        return self._loaded_plugins
 
-    def _load_plugin(self, plugin: Plugin) -> Optional[any]:
+    @loaded_plugins.setter
+    def loaded_plugins(self, plugins: Iterable[Plugin]) -> None:
+        # Assigning a list installs a new registry, so that the previous one can be assigned back unchanged
+        self._loaded_plugins = plugins if isinstance(plugins, PluginRegistry) else PluginRegistry(plugins)
+
+    def _import_plugin(self, plugin: Plugin) -> Any:
         """
-        Loads the plugin dynamically and executes its tasks.
+        Imports the plugin module, or returns it if it has already been imported.
 
-        :param plugin: The plugin object containing its name, path, and functions.
-        :return: The router object if found, None otherwise.
+        :param plugin: The plugin object containing its name and path.
+        :return: The plugin module.
         """
 
         # Ensure the plugin file exists
         if not os.path.exists(plugin.file_path):
             raise FileNotFoundError(f"Plugin file {plugin.name}.py not found")
 
-        plugin_module = load_plugin_module(plugin.name, plugin.file_path)
+        with startup_profiler.plugin(plugin.name, "import"):
+            plugin_module = self.modules.load(plugin.name, plugin.file_path)
+        if plugin_module is None:
+            raise ImportError(f"Plugin module {plugin.name} could not be imported")
+        return plugin_module
+
+    def _start_plugin_tasks(self, plugin: Plugin, plugin_module: Any) -> None:
+        """
+        Starts the functions of the plugin marked as "task".
 
-        # Find and execute functions marked as "task"
+        :param plugin: The plugin object containing its functions.
+        :param plugin_module: The imported plugin module.
+        :return: None
+        """
         for function in plugin.functions:
             if function.function_type != "task":
                 continue
@@ -67,22 +88,163 @@ class PluginManager:
                 logger.warning(f"Task function {function.name} not found in plugin {plugin.name}")
                 continue
 
-            asyncio.create_task(task_function(self.bot))  
+            # Messages sent by background tasks wait behind the replies to the users
+            with bulk_sending():
+                task = asyncio.create_task(task_function(self.bot))
+            self.tasks.setdefault(plugin.name, []).append(task)
+
+    def _stop_plugin_tasks(self, plugin_name: str) -> List[asyncio.Task]:
+        """
+        Cancels the background tasks of a plugin.
+
+        :param plugin_name: The name of the plugin.
+        :return: The cancelled tasks, which can be awaited to wait for their completion.
+        """
+        tasks = self.tasks.pop(plugin_name, [])
+        for task in tasks:
+            task.cancel()
+        return tasks
+
+    def _load_plugin(self, plugin: Plugin) -> Optional[Router]:
+        """
+        Loads the plugin dynamically and executes its tasks.
 
+        :param plugin: The plugin object containing its name, path, and functions.
+        :return: The router object if found, None otherwise.
+        """
+        plugin_module = self._import_plugin(plugin)
+        with startup_profiler.plugin(plugin.name, "tasks"):
+            self._start_plugin_tasks(plugin, plugin_module)
         return getattr(plugin_module, 'router', None)
 
-    def _scan_plugins(self) -> List[str]:
+    def _attach_plugin_router(self, plugin_name: str, router: Optional[Router]) -> None:
+        """
+        Attaches the router of a plugin to the dispatcher, in place of the router attached for it before.
+
+        :param plugin_name: The name of the plugin.
+        :param router: The new router of the plugin, or None if the plugin has no router.
+        :return: None
+        """
+        old_router = self.routers.pop(plugin_name, None) or self.lazy_routers.pop(plugin_name, None)
+
+        if old_router is not None and router is not None:
+            replace_router(old_router, router)
+        elif old_router is not None:
+            detach_router(old_router)
+        elif router is not None:
+            attach_router(self.dispatcher, router)
+
+        if router is not None:
+            self.routers[plugin_name] = router
+
+    def _is_lazy(self, plugin: Plugin) -> bool:
+        """
+        Checks whether the plugin can be imported on its first matching update instead of at startup.
+
+        :param plugin: The plugin to check.
+        :return: True if the plugin should be activated lazily, False otherwise.
+        """
+        if not config.PLUGIN_LAZY_LOADING or not plugin.lazy or not plugin.triggers:
+            return False
+
+        # Tasks have to run from the start, and a module that is already imported costs nothing to register
+        if any(function.function_type == "task" for function in plugin.functions) or plugin.name in self.modules:
+            return False
+
+        return bool(plugin.triggers["commands"] or plugin.triggers["texts"])
+
+    async def _activate_plugin(self, plugin: Plugin) -> Optional[Router]:
+        """
+        Imports a lazily registered plugin and puts its router in place of the lazy one.
+
+        :param plugin: The plugin to activate.
+        :return: The router of the plugin, or None if it could not be activated.
+        """
+        async with self._activation_lock:
+            lazy_router = self.lazy_routers.get(plugin.name)
+
+            # Another update has already activated the plugin
+            if lazy_router is None:
+                plugin_module = self.modules.get(plugin.name)
+                return getattr(plugin_module, 'router', None)
+
+            logger.info(f"Activating plugin '{plugin.name}' on its first update...")
+            try:
+                router = self._load_plugin(plugin)
+            except Exception as error:
+                logger.error(f"Failed to activate plugin '{plugin.name}': {error}")
+                router = None
+
+            del self.lazy_routers[plugin.name]
+            if router:
+                replace_router(lazy_router, router)
+                self.routers[plugin.name] = router
+                logger.info(f"Registered router for plugin '{plugin.name}'.")
+            else:
+                detach_router(lazy_router)
+            return router
+
+    async def _scan_plugins(self, progress: Optional[ProgressCallback] = None) -> List[Plugin]:
         """
         Scans the plugins directory for valid plugin files and processes them.
 
-        :return: A list of valid plugin names found in the directory.
+        The dependencies of all plugins are installed with a single pip run before any new plugin is imported.
+        If it fails, they are installed plugin by plugin, so that a broken requirement only skips its own plugin.
+
+        :param progress: Coroutine receiving progress messages of the dependency installation.
+        :return: A list of valid plugins found in the directory.
         """
         logger.info("Scanning plugin files in the directory...")
-        valid_plugins = []
+        cached_plugins = []
+        new_plugin_files = []
+        plugin_dependencies = []
 
         for _, plugin_file_name, _ in pkgutil.iter_modules([self.plugins_dir]):
+            # Unchanged plugins are taken from the manifest, only new or changed files are imported
+            plugin_path = os.path.join(self.plugins_dir, f"{plugin_file_name}.py")
+            with startup_profiler.plugin(plugin_file_name, "metadata"):
+                plugin_metadata = self.manifest.lookup(plugin_path)
+                if plugin_metadata is not None:
+                    cached_plugins.append((plugin_file_name, plugin_metadata))
+                    plugin_dependencies.append(plugin_metadata.dependencies)
+                    continue
+
+                # The dependencies of new plugins are read from the source, as the plugin can't be imported without them
+                new_plugin_files.append(plugin_file_name)
+                try:
+                    plugin_dependencies.append(extract_plugin_metadata_from_file(plugin_path).get('dependencies', []))
+                except Exception as error:
+                    logger.warning(f"Failed to read the dependencies of plugin '{plugin_file_name}': {error}")
+
+        # Install the dependencies of every plugin at once
+        missing_dependencies = set()
+        dependencies = [dependency for requirements in plugin_dependencies for dependency in requirements]
+        with startup_profiler.phase("install_dependencies"):
+            if not await install_dependencies(dependencies, progress):
+                # pip installs nothing if one requirement fails, retry plugin by plugin to install the valid ones
+                for requirements in plugin_dependencies:
+                    await install_dependencies(requirements, progress)
+                missing_dependencies = {
+                    canonical_dependency(dependency)
+                    for dependency in await asyncio.to_thread(get_missing_dependencies, dependencies)
+                }
+
+        scanned_plugins = list(cached_plugins)
+        for plugin_file_name in new_plugin_files:
+            try:
+                with startup_profiler.plugin(plugin_file_name, "import"):
+                    plugin_metadata = get_plugin_metadata(plugin_file_name, self.modules)
+                if plugin_metadata is None:
+                    logger.warning(f"Skipping plugin that failed to load: {plugin_file_name}.")
+                    continue
+                self.manifest.store(plugin_metadata.file_path, plugin_metadata)
+                scanned_plugins.append((plugin_file_name, plugin_metadata))
+            except Exception as error:
+                logger.error(f"Failed to process plugin '{plugin_file_name}': {error}")
+
+        valid_plugins = []
+        for plugin_file_name, plugin_metadata in scanned_plugins:
             try:
-                plugin_metadata = get_plugin_metadata(plugin_file_name)
                 plugin_name = plugin_metadata.name
 
                 # Validate the plugin name
@@ -91,58 +253,63 @@ class PluginManager:
                     continue
 
                 # Rename the file if necessary
-                if plugin_file_name != plugin_name:
-                    self._rename_plugin_file(plugin_file_name, plugin_name)
-
-                # Install dependencies
-                if plugin_metadata.dependencies:
-                    if not self._install_dependencies(plugin_metadata.dependencies):
-                        logger.warning(f"Skipping plugin '{plugin_name}' due to installation failure.")
-                        continue
+                if plugin_file_name != plugin_name and self._rename_plugin_file(plugin_file_name, plugin_name):
+                    self.modules.rename(plugin_file_name, plugin_name)
+                    self.manifest.discard(plugin_metadata.file_path)
+                    plugin_metadata.file_path = os.path.join(self.plugins_dir, f"{plugin_name}.py")
+                    self.manifest.store(plugin_metadata.file_path, plugin_metadata)
+
+                # Skip plugins whose dependencies could not be installed
+                if missing_dependencies.intersection(canonical_dependency(dependency) for dependency in plugin_metadata.dependencies if dependency):
+                    logger.warning(f"Skipping plugin '{plugin_name}' due to installation failure.")
+                    continue
 
-                valid_plugins.append(plugin_name)
+                valid_plugins.append(plugin_metadata)
             except Exception as error:
                 logger.error(f"Failed to process plugin '{plugin_file_name}': {error}")
 
+        self.manifest.prune()
+        self.manifest.save()
         return valid_plugins
 
-    def _rename_plugin_file(self, old_name: str, new_name: str) -> None:
+    def _rename_plugin_file(self, old_name: str, new_name: str) -> bool:
         """
         Renames a plugin file to match its validated name.
 
         :param old_name: The current name of the plugin file.
         :param new_name: The new name for the plugin file.
-        :return: None
+        :return: True if the file was renamed, False otherwise.
         """
         try:
             old_path = os.path.join(self.plugins_dir, f"{old_name}.py")
             new_path = os.path.join(self.plugins_dir, f"{new_name}.py")
             os.rename(old_path, new_path)
             logger.info(f"Renamed plugin file '{old_name}.py' to '{new_name}.py'.")
+            return True
         except Exception as error:
             logger.error(f"Failed to rename plugin file '{old_name}.py': {error}")
+            return False
 
-    def _synchronize_plugins(self, valid_plugins: List[str]) -> None:
+    def _synchronize_plugins(self, valid_plugins: List[Plugin]) -> None:
         """
         Synchronizes the internal list of loaded plugins with the valid plugins found in the directory.
 
-        :param valid_plugins: A list of valid plugin names found in the directory.
+        :param valid_plugins: A list of valid plugins found in the directory.
         :return: None
         """
-        # Remove plugins that are no longer valid
-        self.loaded_plugins = [plugin for plugin in self.loaded_plugins if plugin.name in valid_plugins]
+        added_plugins = [plugin for plugin in valid_plugins if plugin.name not in self.loaded_plugins]
+        valid_names = {plugin.name for plugin in valid_plugins}
 
-        # Add new plugins
-        for plugin_name in valid_plugins:
-            if plugin_name not in [plugin.name for plugin in self.loaded_plugins]:
-                try:
-                    plugin_metadata = get_plugin_metadata(plugin_name)
+        # Stop the plugins whose files are gone
+        for plugin in self.loaded_plugins:
+            if plugin.name not in valid_names:
+                self._unload_plugin(plugin)
 
-                    # Create and add the plugin object
-                    self.loaded_plugins.append(plugin_metadata)
-                    logger.info(f"Added plugin '{plugin_metadata.name}' (v{plugin_metadata.version}) to the manager.")
-                except Exception as error:
-                    logger.error(f"Failed to add plugin '{plugin_name}': {error}")
+        # Replace the content, so that removed plugins are dropped and updated ones get fresh metadata
+        self.loaded_plugins.reset(valid_plugins)
+
+        for plugin in added_plugins:
+            logger.info(f"Added plugin '{plugin.name}' (v{plugin.version}) to the manager.")
 
     async def _register_plugin_routers(self, dp: Dispatcher) -> None:
         """
@@ -153,26 +320,239 @@ class PluginManager:
         """
         for plugin in self.loaded_plugins:
             try:
+                # Routers and tasks of a previous load cycle are replaced, never duplicated
+                self._stop_plugin_tasks(plugin.name)
+
+                if self._is_lazy(plugin):
+                    self._attach_plugin_router(plugin.name, None)
+                    lazy_router = build_lazy_router(plugin, self._activate_plugin)
+                    attach_router(dp, lazy_router)
+                    self.lazy_routers[plugin.name] = lazy_router
+                    logger.info(f"Registered lazy router for plugin '{plugin.name}'.")
+                    continue
+
                 router = self._load_plugin(plugin)
+                self._attach_plugin_router(plugin.name, router)
                 if router:
-                    dp.include_router(router)
                     logger.info(f"Registered router for plugin '{plugin.name}'.")
             except Exception as error:
                 logger.error(f"Failed to register router for plugin '{plugin.name}': {error}")
 
-    async def load_plugins(self) -> None:
+    async def load_plugins(self, progress: Optional[ProgressCallback] = None) -> None:
         """
         Main method to manage the loading and registration of plugins.
 
+        :param progress: Coroutine receiving progress messages of the dependency installation.
+        :return: None
+        """
+        async with self._plugin_lock:
+            await self._load_all_plugins(progress)
+
+    async def _load_all_plugins(self, progress: Optional[ProgressCallback] = None) -> None:
+        """
+        Scans, synchronizes and registers all plugins. The caller holds the plugin lock.
+
+        :param progress: Coroutine receiving progress messages of the dependency installation.
         :return: None
         """
         logger.info("Starting plugin loading process...")
 
-        valid_plugins = self._scan_plugins()
-        self._synchronize_plugins(valid_plugins)
-        await self._register_plugin_routers(self.dispatcher)
+        # Every plugin module is imported at most once per load cycle
+        self.modules.clear()
+
+        with startup_profiler.phase("scan"):
+            valid_plugins = await self._scan_plugins(progress)
+        with startup_profiler.phase("synchronize"):
+            self._synchronize_plugins(valid_plugins)
+        with startup_profiler.phase("register"):
+            await self._register_plugin_routers(self.dispatcher)
+
+        logger.info(f"All plugins have been successfully loaded and registered ({self.modules.import_count} modules imported).")
+
+    def _unload_plugin(self, plugin: Plugin) -> List[asyncio.Task]:
+        """
+        Detaches the router of a plugin, cancels its tasks and removes it from the loaded plugins list.
+
+        :param plugin: The plugin to unload.
+        :return: The cancelled tasks of the plugin.
+        """
+        router = self.routers.pop(plugin.name, None) or self.lazy_routers.pop(plugin.name, None)
+        if router is not None:
+            detach_router(router)
+
+        tasks = self._stop_plugin_tasks(plugin.name)
+        self.modules.discard(plugin.name)
+        if plugin in self.loaded_plugins:
+            self.loaded_plugins.discard(plugin.name)
+        return tasks
+
+    async def unload_plugin(self, plugin_name: str) -> bool:
+        """
+        Stops a plugin without deleting its file: detaches its router and cancels its background tasks.
+
+        :param plugin_name: The name of the plugin to unload.
+        :return: True if the plugin was unloaded, False if it was not loaded.
+        """
+        async with self._plugin_lock:
+            return await self._unload_plugin_by_name(plugin_name)
+
+    async def _unload_plugin_by_name(self, plugin_name: str) -> bool:
+        """
+        Unloads a plugin and waits for its tasks to stop. The caller holds the plugin lock.
+
+        :param plugin_name: The name of the plugin to unload.
+        :return: True if the plugin was unloaded, False if it was not loaded.
+        """
+        plugin = self.loaded_plugins.get(plugin_name)
+        if not plugin:
+            logger.warning(f"Plugin '{plugin_name}' not found in the loaded plugins list.")
+            return False
+
+        tasks = self._unload_plugin(plugin)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        logger.info(f"Unloaded plugin '{plugin_name}'.")
+        return True
+
+    async def _import_plugin_file(self, plugin_name: str, plugin_path: str, progress: Optional[ProgressCallback] = None) -> Tuple[Plugin, Any]:
+        """
+        Installs the dependencies of a single plugin file and imports it.
+
+        :param plugin_name: The name of the plugin.
+        :param plugin_path: Path to the plugin file.
+        :param progress: Coroutine receiving progress messages of the dependency installation.
+        :return: A tuple of the plugin metadata and the imported module.
+        """
+        dependencies = extract_plugin_metadata_from_file(plugin_path).get('dependencies', [])
+        if not await install_dependencies(dependencies, progress):
+            raise ImportError("Failed to install the plugin dependencies")
+
+        self.modules.discard(plugin_name)
+        plugin = get_plugin_metadata(plugin_name, self.modules)
+        if plugin is None:
+            raise ImportError(f"Plugin module {plugin_name} could not be imported")
+        if plugin.name != plugin_name:
+            raise ValueError(f"The plugin name '{plugin.name}' does not match its file name '{plugin_name}'")
+
+        return plugin, self.modules.get(plugin_name)
+
+    async def load_plugin(self, plugin_name: str, progress: Optional[ProgressCallback] = None) -> bool:
+        """
+        Loads a single plugin file without rescanning the other plugins. Loaded plugins are reloaded.
+
+        :param plugin_name: The name of the plugin, which is also the name of its file.
+        :param progress: Coroutine receiving progress messages of the dependency installation.
+        :return: True if the plugin was loaded, False otherwise.
+        """
+        async with self._plugin_lock:
+            return await self._load_plugin_file(plugin_name, progress)
+
+    async def _load_plugin_file(self, plugin_name: str, progress: Optional[ProgressCallback] = None) -> bool:
+        """
+        Loads or reloads a single plugin file. The caller holds the plugin lock.
+
+        :param plugin_name: The name of the plugin, which is also the name of its file.
+        :param progress: Coroutine receiving progress messages of the dependency installation.
+        :return: True if the plugin was loaded, False otherwise.
+        """
+        if plugin_name in self.loaded_plugins:
+            return await self._reload_plugin_file(plugin_name, progress)
+
+        try:
+            plugin_path = check_plugin_exists(plugin_name)
+            plugin, plugin_module = await self._import_plugin_file(plugin_name, plugin_path, progress)
+        except Exception as error:
+            self.modules.discard(plugin_name)
+            logger.error(f"Failed to load plugin '{plugin_name}': {error}")
+            return False
+
+        router = getattr(plugin_module, 'router', None)
+        if router is not None:
+            attach_router(self.dispatcher, router)
+            self.routers[plugin_name] = router
+        self._start_plugin_tasks(plugin, plugin_module)
+        self.loaded_plugins.append(plugin)
+
+        self.manifest.store(plugin.file_path, plugin)
+        self.manifest.save()
+
+        logger.info(f"Added plugin '{plugin.name}' (v{plugin.version}) to the manager.")
+        return True
+
+    async def reload_plugin(self, plugin_name: str, progress: Optional[ProgressCallback] = None) -> bool:
+        """
+        Re-imports a plugin from its file and swaps it in place of the running version without restarting the bot.
+
+        The old version keeps working until the new one has been imported successfully.
 
-        logger.info("All plugins have been successfully loaded and registered.")
+        :param plugin_name: The name of the plugin to reload.
+        :param progress: Coroutine receiving progress messages of the dependency installation.
+        :return: True if the plugin was reloaded, False otherwise.
+        """
+        async with self._plugin_lock:
+            return await self._reload_plugin_file(plugin_name, progress)
+
+    async def _reload_plugin_file(self, plugin_name: str, progress: Optional[ProgressCallback] = None) -> bool:
+        """
+        Swaps a new version of a plugin in place of the running one. The caller holds the plugin lock.
+
+        :param plugin_name: The name of the plugin to reload.
+        :param progress: Coroutine receiving progress messages of the dependency installation.
+        :return: True if the plugin was reloaded, False otherwise.
+        """
+        old_plugin = self.loaded_plugins.get(plugin_name)
+        plugin_path = old_plugin.file_path if old_plugin else os.path.join(self.plugins_dir, f"{plugin_name}.py")
+        old_module = self.modules.get(plugin_name)
+
+        try:
+            # Import the new version next to the running one
+            plugin, plugin_module = await self._import_plugin_file(plugin_name, plugin_path, progress)
+        except Exception as error:
+            # Keep the running version
+            self.modules.discard(plugin_name)
+            if old_module is not None:
+                self.modules.add(plugin_name, old_module)
+            logger.error(f"Failed to reload plugin '{plugin_name}': {error}")
+            return False
+
+        # Swap the plugins without yielding to the event loop, so no update sees a partial state
+        old_tasks = self._stop_plugin_tasks(plugin_name)
+        self._attach_plugin_router(plugin_name, getattr(plugin_module, 'router', None))
+        self._start_plugin_tasks(plugin, plugin_module)
+
+        # Takes the place of the old version in the plugin list
+        self.loaded_plugins.append(plugin)
+
+        self.manifest.store(plugin.file_path, plugin)
+        self.manifest.save()
+
+        await asyncio.gather(*old_tasks, return_exceptions=True)
+        logger.info(f"Reloaded plugin '{plugin_name}' (v{plugin.version}).")
+        return True
+
+    async def sync_plugin_file(self, file_name: str) -> None:
+        """
+        Brings a single plugin file in sync after it was created, modified or deleted on disk.
+
+        :param file_name: The name of the plugin file (without extension).
+        :return: None
+        """
+        async with self._plugin_lock:
+            plugin_path = os.path.join(self.plugins_dir, f"{file_name}.py")
+            plugin = self.loaded_plugins.get_by_path(plugin_path)
+
+            if not os.path.exists(plugin_path):
+                if plugin is not None:
+                    await self._unload_plugin_by_name(plugin.name)
+                self.manifest.discard(plugin_path)
+                self.manifest.save()
+                return
+
+            # Files written by the manager itself, or touched without changes, are already up to date
+            if plugin is not None and self.manifest.lookup(plugin_path) is not None:
+                return
+
+            await self._load_plugin_file(file_name)
 
     def delete_plugin(self, plugin_name: str) -> None:
         """
@@ -181,7 +561,7 @@ class PluginManager:
         :param plugin_name: The name of the plugin to delete.
         :return: None
         """
-        plugin = next((p for p in self.loaded_plugins if p.name == plugin_name), None)
+        plugin = self.loaded_plugins.get(plugin_name)
         if not plugin:
             logger.warning(f"Plugin '{plugin_name}' not found in the loaded plugins list.")
             return
@@ -191,41 +571,47 @@ class PluginManager:
             os.remove(plugin.file_path)
             logger.info(f"Deleted plugin file '{plugin.file_path}'.")
 
-            # Remove the plugin from the loaded list
-            self.loaded_plugins.remove(plugin)
+            self.manifest.discard(plugin.file_path)
+            self.manifest.save()
+
+            # Detach the router, stop the tasks and remove the plugin from the loaded list
+            self._unload_plugin(plugin)
             logger.info(f"Removed plugin '{plugin_name}' from the manager.")
         except Exception as error:
             logger.error(f"Failed to delete plugin '{plugin_name}': {error}")
 
-    async def install_plugin_from_io(self, io_stream: io.BytesIO, plugin_metadata: Dict[str, Optional[str]]) -> bool:
+    async def install_plugin_from_io(self, io_stream: io.BytesIO, plugin_metadata: Dict[str, Optional[str]], progress: Optional[ProgressCallback] = None) -> bool:
         """
         Installs a plugin from an I/O stream containing the plugin's content (Python file).
 
+        Only the installed plugin is loaded, or reloaded if it is an update, the other plugins are not touched.
+
         :param io_stream: The I/O stream containing the plugin Python file content.
         :param plugin_metadata: A dictionary containing metadata about the plugin.
+        :param progress: Coroutine receiving progress messages of the dependency installation.
         :return: True if the plugin was installed successfully, False otherwise.
         """
-        try:
-            # Read the I/O stream and save the content as a Python file
-            plugin_content = io_stream.read().decode('utf-8')
+        # The watcher sees the written file only once the plugin has been loaded
+        async with self._plugin_lock:
+            try:
+                # Validate the plugin name before using it as a file name
+                plugin_name = plugin_metadata["name"]
+                if not plugin_name or not re.match(config.PLUGIN_NAME_REGEX, plugin_name):
+                    raise ValueError(f"Invalid plugin name: {plugin_name!r}")
 
-            # Create the plugin filename based on the metadata
-            plugin_name = plugin_metadata["name"]
-            plugin_file_path = os.path.join(self.plugins_dir, f"{plugin_name}.py")
+                # Read the I/O stream and save the content as a Python file
+                plugin_content = io_stream.read().decode('utf-8')
+                plugin_file_path = os.path.join(self.plugins_dir, f"{plugin_name}.py")
 
-            # Save the plugin content as a Python file in the plugins directory
-            with open(plugin_file_path, 'w', encoding='utf-8') as plugin_file:
-                plugin_file.write(plugin_content)
+                # Save the plugin content as a Python file in the plugins directory
+                with open(plugin_file_path, 'w', encoding='utf-8') as plugin_file:
+                    plugin_file.write(plugin_content)
 
-            # Validate and synchronize the plugin after installation
-            logger.info(f"Plugin '{plugin_name}' has been installed.")
+                logger.info(f"Plugin '{plugin_name}' has been installed.")
 
-            valid_plugins = self._scan_plugins()
-            self._synchronize_plugins(valid_plugins)
-            await self._register_plugin_routers(self.dispatcher)
- 
-        except Exception as error:
-            logger.error(f"Failed to install plugin from I/O stream: {error}")
-            return False # Indicate failure
-        
-        return True # Plugin installed successfully
+            except Exception as error:
+                logger.error(f"Failed to install plugin from I/O stream: {error}")
+                return False # Indicate failure
+
+            # Load the new plugin, or swap an update in place
+            return await self._load_plugin_file(plugin_name, progress)
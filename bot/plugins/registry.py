@@ -0,0 +1,180 @@
+import itertools
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from bot.models import Plugin
+
+# Versions are unique across registries, so that a cache never mistakes a new registry for the one it was built for
+_versions = itertools.count(1)
+
+
+def get_plugin_title(plugin: Plugin) -> str:
+    """
+    Returns the text of the plugin button in the plugin menu.
+
+    :param plugin: The plugin.
+    :return: The title of the plugin, or its name if it has none.
+    """
+    return plugin.title or plugin.name
+
+
+class PluginRegistry:
+    """
+    The loaded plugins, indexed by name, title and file path and iterated in the order they were added.
+
+    Reads like the list it replaces (iteration, len(), indexing, `in`, comparison with lists), while lookups
+    by name, title or file path are constant time; the title and path indexes are built by their first
+    lookup after a change.
+    The version changes on every change, so that data derived from the plugins, such as keyboards, can be
+    cached until the next change.
+    """
+    def __init__(self, plugins: Iterable[Plugin] = ()):
+        """
+        Initializes the registry.
+
+        :param plugins: The initial plugins, in order.
+        """
+        self._plugins: Dict[str, Plugin] = {}
+        self._titles: Optional[Dict[str, Plugin]] = None
+        self._paths: Optional[Dict[str, Plugin]] = None
+        self._ordered: Optional[List[Plugin]] = None
+        self.version = 0
+        self.reset(plugins)
+
+    def get(self, plugin_name: str) -> Optional[Plugin]:
+        """
+        Returns a plugin by name.
+
+        :param plugin_name: The name of the plugin.
+        :return: The plugin, or None if it is not loaded.
+        """
+        return self._plugins.get(plugin_name)
+
+    def get_by_title(self, title: str) -> Optional[Plugin]:
+        """
+        Returns a plugin by the text of its button, the first one added if several plugins share it.
+
+        :param title: The title of the plugin, or its name if it has no title.
+        :return: The plugin, or None if no loaded plugin has this title.
+        """
+        if self._titles is None:
+            # Built once per version, the first plugin with a title keeps it
+            self._titles = {}
+            for plugin in self._plugins.values():
+                self._titles.setdefault(get_plugin_title(plugin), plugin)
+        return self._titles.get(title)
+
+    def get_by_path(self, file_path: str) -> Optional[Plugin]:
+        """
+        Returns a plugin by its file. The name of a plugin comes from its metadata and may differ from its file name.
+
+        :param file_path: The path to the plugin file.
+        :return: The plugin, or None if no loaded plugin comes from this file.
+        """
+        if self._paths is None:
+            self._paths = {plugin.file_path: plugin for plugin in self._plugins.values()}
+        return self._paths.get(file_path)
+
+    def names(self) -> List[str]:
+        """
+        Returns the names of the loaded plugins, in order.
+
+        :return: The plugin names.
+        """
+        return list(self._plugins)
+
+    def append(self, plugin: Plugin) -> None:
+        """
+        Adds a plugin at the end, or replaces the loaded plugin with the same name in place.
+
+        :param plugin: The plugin to add.
+        :return: None
+        """
+        # Assigning an existing key keeps its position
+        self._plugins[plugin.name] = plugin
+        self._changed()
+
+    def remove(self, plugin: Union[Plugin, str]) -> None:
+        """
+        Removes a plugin.
+
+        :param plugin: The plugin or its name.
+        :return: None
+        """
+        plugin_name = plugin if isinstance(plugin, str) else plugin.name
+        if self.discard(plugin_name) is None:
+            raise ValueError(f"Plugin '{plugin_name}' is not loaded")
+
+    def discard(self, plugin_name: str) -> Optional[Plugin]:
+        """
+        Removes a plugin if it is loaded.
+
+        :param plugin_name: The name of the plugin.
+        :return: The removed plugin, or None if it was not loaded.
+        """
+        plugin = self._plugins.pop(plugin_name, None)
+        if plugin is not None:
+            self._changed()
+        return plugin
+
+    def reset(self, plugins: Iterable[Plugin]) -> None:
+        """
+        Replaces all loaded plugins.
+
+        :param plugins: The new plugins, in order.
+        :return: None
+        """
+        self._plugins = {plugin.name: plugin for plugin in plugins}
+        self._changed()
+
+    def clear(self) -> None:
+        """
+        Removes all loaded plugins.
+
+        :return: None
+        """
+        self.reset([])
+
+    def _changed(self) -> None:
+        """
+        Gives the registry a new version and drops the ordered list and the indexes of the previous version.
+
+        :return: None
+        """
+        self.version = next(_versions)
+        self._ordered = None
+        self._titles = None
+        self._paths = None
+
+    def _get_ordered(self) -> List[Plugin]:
+        """
+        Returns the plugins in order. The list is built once per version and never modified.
+
+        :return: The loaded plugins.
+        """
+        if self._ordered is None:
+            self._ordered = list(self._plugins.values())
+        return self._ordered
+
+    def __iter__(self) -> Iterator[Plugin]:
+        # The ordered list is replaced, not modified, on changes, so plugins can be removed while iterating
+        return iter(self._get_ordered())
+
+    def __getitem__(self, index: int) -> Plugin:
+        return self._get_ordered()[index]
+
+    def __contains__(self, plugin: Union[Plugin, str]) -> bool:
+        if isinstance(plugin, str):
+            return plugin in self._plugins
+        return self._plugins.get(plugin.name) is plugin
+
+    def __len__(self) -> int:
+        return len(self._plugins)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, PluginRegistry):
+            return self._get_ordered() == other._get_ordered()
+        if isinstance(other, list):
+            return self._get_ordered() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PluginRegistry({self.names()!r})"
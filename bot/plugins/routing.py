@@ -0,0 +1,67 @@
+from aiogram import Router
+
+# Incremented whenever a router is attached, replaced or detached, so that indexes built from the routers are rebuilt
+routing_version = 0
+
+
+def mark_routing_changed() -> None:
+    """
+    Records a change of the attached routers.
+
+    :return: None
+    """
+    global routing_version
+    routing_version += 1
+
+
+def attach_router(parent: Router, router: Router) -> None:
+    """
+    Attaches a router after the sub routers of a parent router.
+
+    :param parent: The parent router, usually the dispatcher.
+    :param router: The router to attach.
+    :return: None
+    """
+    parent.include_router(router)
+    mark_routing_changed()
+
+
+def detach_router(router: Router) -> None:
+    """
+    Detaches a router from its parent router, so that it no longer receives updates.
+
+    :param router: The router to detach.
+    :return: None
+    """
+    parent = router.parent_router
+    if parent is None:
+        return
+
+    # aiogram has no public API to detach a router
+    parent.sub_routers.remove(router)
+    router._parent_router = None
+    mark_routing_changed()
+
+
+def replace_router(old_router: Router, new_router: Router) -> None:
+    """
+    Puts a router in place of an attached one, keeping its position in the routing order.
+
+    The list of sub routers is never shortened, so an update that is being propagated through it is not affected.
+
+    :param old_router: The attached router to replace.
+    :param new_router: The router to attach in its place.
+    :return: None
+    """
+    parent = old_router.parent_router
+    if parent is None:
+        raise RuntimeError(f"Router {old_router!r} is not attached")
+
+    index = parent.sub_routers.index(old_router)
+
+    # The setter validates the router and appends it, move it to the position of the old router
+    new_router.parent_router = parent
+    parent.sub_routers.pop()
+    parent.sub_routers[index] = new_router
+    old_router._parent_router = None
+    mark_routing_changed()
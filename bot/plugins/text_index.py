@@ -0,0 +1,195 @@
+import operator
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from aiogram import BaseMiddleware, Dispatcher, Router
+from aiogram.dispatcher.event.bases import REJECTED, UNHANDLED, SkipHandler
+from aiogram.dispatcher.event.handler import FilterObject, HandlerObject
+from aiogram.dispatcher.event.telegram import TelegramEventObserver
+from aiogram.types import Message
+from magic_filter.operations import ComparatorOperation, GetAttributeOperation
+from bot.config import logger
+from . import routing
+
+# A routing step: a handler of a router, or a whole router (handler None) that must be propagated as usual
+Step = Tuple[Router, Optional[HandlerObject]]
+
+
+def get_exact_text(filter_object: FilterObject) -> Optional[str]:
+    """
+    Returns the text matched by an `F.text == "..."` filter.
+
+    :param filter_object: The filter of a handler.
+    :return: The text, or None if the filter is anything else.
+    """
+    magic = filter_object.magic
+    if magic is None:
+        return None
+
+    # Filters whose operations can't be read are never indexed, so they are checked like any other filter
+    operations = getattr(magic, "_operations", None)
+    if (operations is not None and len(operations) == 2
+            and isinstance(operations[0], GetAttributeOperation) and operations[0].name == "text"
+            and isinstance(operations[1], ComparatorOperation) and operations[1].comparator is operator.eq
+            and isinstance(operations[1].right, str)):
+        return operations[1].right
+    return None
+
+
+class ExactTextIndex(BaseMiddleware):
+    """
+    Outer message middleware routing the messages without walking every text filter of every router.
+
+    Handlers with an `F.text == "..."` filter can only match that exact text, so they are indexed by text. A message is
+    only checked against the handlers indexed for its text and the handlers that cannot be indexed (commands,
+    states, other filters), in the usual routing order, so the first matching handler is the same as without the
+    index. Routers with outer middlewares or router filters are propagated as a whole.
+
+    It must be the last outer message middleware of the dispatcher, as it replaces the propagation of the message.
+    The propagation relies on internals of aiogram (pinned in requirements.txt). If they are missing, the index
+    disables itself and messages take the usual filter chain.
+    """
+    def __init__(self, dispatcher: Dispatcher):
+        """
+        Initializes the index, which is built on the first message and rebuilt when the routers change.
+
+        :param dispatcher: The dispatcher whose routers are indexed.
+        """
+        self.dispatcher = dispatcher
+        self.routes: Dict[str, List[Step]] = {}
+        self.unindexed: List[Step] = []
+        self.enabled = True
+        self._built_for: Optional[Tuple[int, int, int, int]] = None
+
+    def _collect_steps(self, router: Router, steps: List[Tuple[Step, Optional[str]]]) -> None:
+        """
+        Lists the steps of a router in routing order: the router as a whole if it has outer middlewares or
+        router filters, otherwise its handlers with their exact text, if any, and the steps of its sub routers.
+
+        :param router: The router.
+        :param steps: The list the steps are appended to.
+        :return: None
+        """
+        observer = router.message
+        if observer._handler.filters or len(observer.outer_middleware):
+            steps.append(((router, None), None))
+            return
+        self._collect_handlers(router, steps)
+
+    def _collect_handlers(self, router: Router, steps: List[Tuple[Step, Optional[str]]]) -> None:
+        """
+        Lists the handlers of a router, then the steps of its sub routers.
+
+        :param router: The router.
+        :param steps: The list the steps are appended to.
+        :return: None
+        """
+        for handler in router.message.handlers:
+            text = next(filter(None, (get_exact_text(filter_object) for filter_object in handler.filters or [])), None)
+            steps.append(((router, handler), text))
+        for sub_router in router.sub_routers:
+            self._collect_steps(sub_router, steps)
+
+    def _get_state(self) -> Tuple[int, int, int, int]:
+        """
+        Describes the routers the index is built from, to detect changes made without the routing helpers, such as
+        handlers registered on an attached router or routers included in a nested router.
+
+        :return: The routing version and the number of routers, message handlers and outer middlewares of the tree.
+        """
+        routers = handlers = middlewares = 0
+        for router in self.dispatcher.chain_tail:
+            routers += 1
+            handlers += len(router.message.handlers)
+            middlewares += len(router.message.outer_middleware)
+        return routing.routing_version, routers, handlers, middlewares
+
+    def build(self, state: Optional[Tuple[int, int, int, int]] = None) -> None:
+        """
+        Builds the route of every indexed text: the handlers indexed for it merged with the unindexed handlers.
+
+        :param state: The state of the routers, computed if not given.
+        :return: None
+        """
+        self._built_for = state or self._get_state()
+
+        steps: List[Tuple[Step, Optional[str]]] = []
+        try:
+            # Filters of the dispatcher itself are checked after its outer middlewares, they cannot be skipped
+            self.enabled = not self.dispatcher.message._handler.filters and hasattr(TelegramEventObserver, "_resolve_middlewares")
+            if self.enabled:
+                self._collect_handlers(self.dispatcher, steps)
+        except AttributeError as error:
+            logger.warning(f"The text index is disabled, as this aiogram version is not supported: {error}")
+            self.enabled = False
+        if not self.enabled:
+            return
+
+        self.routes = {}
+        self.unindexed = []
+        for step, text in steps:
+            if text is None:
+                self.unindexed.append(step)
+                for route in self.routes.values():
+                    route.append(step)
+            else:
+                self.routes.setdefault(text, list(self.unindexed)).append(step)
+
+    async def _handle(self, event: Message, data: Dict[str, Any], route: List[Step]) -> Any:
+        """
+        Propagates a message along a route, like Router.propagate_event() does along every handler.
+
+        :param event: The message.
+        :param data: The data of the update.
+        :param route: The steps to try, in routing order.
+        :return: The response of the handler, or UNHANDLED.
+        """
+        finished_router = None
+        router_data = None
+        current_router = None
+        for router, handler in route:
+            if handler is None:
+                response = await router.propagate_event(update_type="message", event=event, **data)
+                if response is not UNHANDLED:
+                    return response
+                continue
+
+            # Like TelegramEventObserver.trigger(), the data is shared by the handlers of a router
+            if router is not current_router:
+                current_router = router
+                router_data = {**data, "event_router": router}
+            if router is finished_router:
+                continue
+
+            router_data["handler"] = handler
+            result, handler_data = await handler.check(event, **router_data)
+            if not result:
+                continue
+
+            router_data.update(handler_data)
+            observer = router.message
+            try:
+                wrapped_inner = observer.outer_middleware.wrap_middlewares(observer._resolve_middlewares(), handler.call)
+                response = await wrapped_inner(event, router_data)
+            except SkipHandler:
+                continue
+
+            # The first matching handler ends the router, the sub routers are tried if it did not handle the message
+            if response is not UNHANDLED and response is not REJECTED:
+                return response
+            finished_router = router
+
+        return UNHANDLED
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: Dict[str, Any]
+    ) -> Any:
+        state = self._get_state()
+        if self._built_for != state:
+            self.build(state)
+        if not self.enabled:
+            return await handler(event, data)
+
+        # A message whose text is not indexed can only match the unindexed handlers
+        return await self._handle(event, data, self.routes.get(event.text, self.unindexed) if event.text else self.unindexed)
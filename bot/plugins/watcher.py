@@ -0,0 +1,229 @@
+import os
+import sys
+import struct
+import asyncio
+import ctypes
+import ctypes.util
+from typing import Dict, Optional, Set, Tuple, TYPE_CHECKING
+from bot.config import logger, config
+
+if TYPE_CHECKING:
+    from .plugin_manager import PluginManager
+
+# inotify event flags, see inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# struct inotify_event: int wd, uint32_t mask, uint32_t cookie, uint32_t len, char name[len]
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_plugin_file(file_name: str) -> bool:
+    """
+    Checks whether a file name belongs to a plugin, ignoring temporary and editor files.
+
+    :param file_name: The name of the file in the plugins directory.
+    :return: True if the file is a plugin file, False otherwise.
+    """
+    if not file_name.endswith(".py"):
+        return False
+
+    # Rejects names such as '.#plugin.py', '#plugin.py#' or 'plugin.tmp.py'
+    return file_name[:-3].isidentifier()
+
+
+class PluginWatcher:
+    """
+    Watches the plugins directory and loads, reloads or unloads plugins when their files change.
+
+    Uses inotify on Linux and falls back to polling the directory. Events are debounced per file,
+    so that a burst of writes results in a single reload.
+    """
+    def __init__(self, plugin_manager: "PluginManager", mode: Optional[str] = None, debounce: Optional[float] = None, poll_interval: Optional[float] = None):
+        """
+        Initializes the watcher.
+
+        :param plugin_manager: The plugin manager to apply the changes to.
+        :param mode: 'auto', 'inotify' or 'polling'. Defaults to PLUGIN_WATCHER_MODE.
+        :param debounce: Seconds without new events before a file is processed. Defaults to PLUGIN_WATCHER_DEBOUNCE.
+        :param poll_interval: Seconds between two directory scans in polling mode. Defaults to PLUGIN_WATCHER_POLL_INTERVAL.
+        """
+        self.plugin_manager = plugin_manager
+        self.plugins_dir = str(plugin_manager.plugins_dir)
+        self.mode = mode or config.PLUGIN_WATCHER_MODE
+        self.debounce = config.PLUGIN_WATCHER_DEBOUNCE if debounce is None else debounce
+        self.poll_interval = config.PLUGIN_WATCHER_POLL_INTERVAL if poll_interval is None else poll_interval
+
+        self._pending: Dict[str, asyncio.TimerHandle] = {}
+        self._sync_tasks: Set[asyncio.Task] = set()
+        self._sync_lock = asyncio.Lock()
+        self._poll_task: Optional[asyncio.Task] = None
+        self._inotify_fd: Optional[int] = None
+
+    async def start(self) -> None:
+        """
+        Starts watching the plugins directory.
+
+        :return: None
+        """
+        if self.mode in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                self._start_inotify()
+                logger.info(f"Watching plugin directory '{self.plugins_dir}' with inotify.")
+                return
+            except OSError as error:
+                if self.mode == "inotify":
+                    raise
+                logger.warning(f"inotify is not available ({error}), falling back to polling.")
+
+        self._poll_task = asyncio.create_task(self._poll(self._snapshot()))
+        logger.info(f"Watching plugin directory '{self.plugins_dir}' by polling every {self.poll_interval}s.")
+
+    async def stop(self) -> None:
+        """
+        Stops watching and waits for the changes that are being applied.
+
+        :return: None
+        """
+        if self._inotify_fd is not None:
+            asyncio.get_running_loop().remove_reader(self._inotify_fd)
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            await asyncio.gather(self._poll_task, return_exceptions=True)
+            self._poll_task = None
+
+        for timer in self._pending.values():
+            timer.cancel()
+        self._pending.clear()
+
+        await asyncio.gather(*self._sync_tasks, return_exceptions=True)
+
+    def _start_inotify(self) -> None:
+        """
+        Registers an inotify watch on the plugins directory and adds its descriptor to the event loop.
+
+        :return: None
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+
+        inotify_fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if inotify_fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        if libc.inotify_add_watch(inotify_fd, os.fsencode(self.plugins_dir), WATCH_MASK) < 0:
+            error_number = ctypes.get_errno()
+            os.close(inotify_fd)
+            raise OSError(error_number, f"inotify_add_watch failed for '{self.plugins_dir}'")
+
+        self._inotify_fd = inotify_fd
+        asyncio.get_running_loop().add_reader(inotify_fd, self._read_inotify_events)
+
+    def _read_inotify_events(self) -> None:
+        """
+        Reads the pending inotify events and schedules the changed plugin files.
+
+        :return: None
+        """
+        while True:
+            try:
+                buffer = os.read(self._inotify_fd, 64 * 1024)
+            except BlockingIOError:
+                return
+
+            offset = 0
+            while offset < len(buffer):
+                _, mask, _, name_length = EVENT_HEADER.unpack_from(buffer, offset)
+                offset += EVENT_HEADER.size
+                file_name = buffer[offset:offset + name_length].rstrip(b"\0").decode("utf-8", errors="replace")
+                offset += name_length
+
+                # Events were dropped, check every plugin file
+                if mask & IN_Q_OVERFLOW:
+                    for plugin_file in self._snapshot():
+                        self._schedule(plugin_file)
+                    continue
+
+                if is_plugin_file(file_name):
+                    self._schedule(file_name)
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Returns the modification time and size of every plugin file in the directory.
+
+        :return: A dictionary mapping the file names to their (mtime, size).
+        """
+        snapshot = {}
+        try:
+            with os.scandir(self.plugins_dir) as entries:
+                for entry in entries:
+                    if is_plugin_file(entry.name) and entry.is_file():
+                        stat = entry.stat()
+                        snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+        return snapshot
+
+    async def _poll(self, previous_snapshot: Dict[str, Tuple[int, int]]) -> None:
+        """
+        Compares snapshots of the plugins directory at a fixed interval and schedules the changed files.
+
+        :param previous_snapshot: The snapshot taken when the watcher was started.
+        :return: None
+        """
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            snapshot = await asyncio.to_thread(self._snapshot)
+
+            for file_name in previous_snapshot.keys() | snapshot.keys():
+                if previous_snapshot.get(file_name) != snapshot.get(file_name):
+                    self._schedule(file_name)
+            previous_snapshot = snapshot
+
+    def _schedule(self, file_name: str) -> None:
+        """
+        Processes the file once no new events have arrived for it during the debounce delay.
+
+        :param file_name: The name of the changed plugin file.
+        :return: None
+        """
+        timer = self._pending.pop(file_name, None)
+        if timer is not None:
+            timer.cancel()
+
+        self._pending[file_name] = asyncio.get_running_loop().call_later(self.debounce, self._start_sync, file_name)
+
+    def _start_sync(self, file_name: str) -> None:
+        """
+        Starts applying the change of a file to the plugin manager.
+
+        :param file_name: The name of the changed plugin file.
+        :return: None
+        """
+        self._pending.pop(file_name, None)
+        task = asyncio.create_task(self._sync(file_name))
+        self._sync_tasks.add(task)
+        task.add_done_callback(self._sync_tasks.discard)
+
+    async def _sync(self, file_name: str) -> None:
+        """
+        Applies the change of a file to the plugin manager, one file at a time.
+
+        :param file_name: The name of the changed plugin file.
+        :return: None
+        """
+        async with self._sync_lock:
+            try:
+                await self.plugin_manager.sync_plugin_file(file_name[:-3])
+            except Exception as error:
+                logger.error(f"Failed to apply the change of plugin file '{file_name}': {error}")
@@ -0,0 +1,157 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from bot.config import logger
+
+
+class StartupProfiler:
+    """
+    Records the wall time, CPU time and allocated memory of the startup phases and of every plugin.
+
+    The profiler is disabled by default, measurements are then no-ops.
+    """
+    def __init__(self):
+        """
+        Initializes a disabled profiler.
+        """
+        self.enabled = False
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.plugins: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self._phase_stack: List[str] = []
+        self._started_at = 0.0
+        self._started_tracing = False
+
+    def start(self) -> None:
+        """
+        Enables the profiler and starts tracing memory allocations.
+
+        :return: None
+        """
+        self.enabled = True
+        self.phases.clear()
+        self.plugins.clear()
+        # Tracing started by someone else, such as PYTHONTRACEMALLOC, is left running on stop
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        self._started_at = time.perf_counter()
+
+    @contextmanager
+    def _measure(self, record: Dict[str, float]) -> Iterator[None]:
+        """
+        Adds the wall time, CPU time and allocated memory of the block to the record.
+
+        :param record: The dictionary accumulating the measurements.
+        """
+        memory_before = tracemalloc.get_traced_memory()[0]
+        wall_before, cpu_before = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            record["wall"] = record.get("wall", 0.0) + time.perf_counter() - wall_before
+            record["cpu"] = record.get("cpu", 0.0) + time.process_time() - cpu_before
+            record["memory"] = record.get("memory", 0) + tracemalloc.get_traced_memory()[0] - memory_before
+            record["calls"] = record.get("calls", 0) + 1
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Measures a startup phase. Nested phases are recorded as 'parent/child'.
+
+        :param name: Name of the phase.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        self._phase_stack.append(name)
+        phase_name = "/".join(self._phase_stack)
+        try:
+            with self._measure(self.phases.setdefault(phase_name, {})):
+                yield
+        finally:
+            self._phase_stack.pop()
+
+    @contextmanager
+    def plugin(self, plugin_name: str, step: str) -> Iterator[None]:
+        """
+        Measures a step of a plugin, such as 'import', 'dependencies' or 'tasks'.
+
+        :param plugin_name: Name of the plugin.
+        :param step: Name of the step.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        with self._measure(self.plugins.setdefault(plugin_name, {}).setdefault(step, {})):
+            yield
+
+    def report(self) -> dict:
+        """
+        Builds the profiling report.
+
+        :return: A JSON serializable dictionary with the phases and plugins.
+        """
+        _, memory_peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        plugins = {}
+        for plugin_name, steps in self.plugins.items():
+            total = {key: sum(step.get(key, 0) for step in steps.values()) for key in ("wall", "cpu", "memory")}
+            plugins[plugin_name] = {"total": total, "steps": steps}
+
+        return {
+            "total_wall": time.perf_counter() - self._started_at,
+            "memory_peak": memory_peak,
+            "phases": self.phases,
+            "plugins": plugins
+        }
+
+    def summary(self, limit: Optional[int] = 10) -> str:
+        """
+        Formats the phases and the slowest plugins, sorted by wall time.
+
+        :param limit: Maximum number of plugins to show, None to show all of them.
+        :return: The summary text.
+        """
+        report = self.report()
+        lines = [f"Startup took {report['total_wall']:.3f}s, memory peak {report['memory_peak'] / 1024:.0f} KiB.", "Phases:"]
+        for name, record in sorted(report["phases"].items(), key=lambda item: item[1]["wall"], reverse=True):
+            lines.append(f"  {name:<40} wall {record['wall']:8.3f}s  cpu {record['cpu']:8.3f}s  memory {record['memory'] / 1024:10.0f} KiB")
+
+        plugins = sorted(report["plugins"].items(), key=lambda item: item[1]["total"]["wall"], reverse=True)
+        if plugins:
+            lines.append("Slowest plugins:")
+        for name, record in plugins[:limit]:
+            steps = ", ".join(f"{step} {values['wall']:.3f}s" for step, values in sorted(record["steps"].items()))
+            lines.append(f"  {name:<40} wall {record['total']['wall']:8.3f}s  memory {record['total']['memory'] / 1024:10.0f} KiB  ({steps})")
+        return "\n".join(lines)
+
+    def stop(self, report_path: Optional[str] = None) -> None:
+        """
+        Writes the JSON report, prints the summary and disables the profiler.
+
+        :param report_path: Path of the JSON report, if it should be written.
+        :return: None
+        """
+        if not self.enabled:
+            return
+
+        if report_path:
+            try:
+                with open(report_path, 'w', encoding='utf-8') as report_file:
+                    json.dump(self.report(), report_file, indent=2)
+                logger.info(f"The startup profile has been written to '{report_path}'.")
+            except OSError as error:
+                logger.error(f"Failed to write the startup profile '{report_path}': {error}")
+
+        print(self.summary())
+        self.enabled = False
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+
+# The profiler shared by the startup code, enabled with --profile-startup
+startup_profiler = StartupProfiler()
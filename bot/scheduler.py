@@ -0,0 +1,249 @@
+import time
+import signal
+import asyncio
+from collections import deque
+from contextlib import suppress
+from typing import Any, Deque, Dict, Hashable, List, Optional, Set, Tuple
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.methods import GetUpdates, TelegramMethod
+from aiogram.types import Update
+from aiogram.utils.backoff import Backoff
+from aiogram.dispatcher.dispatcher import DEFAULT_BACKOFF_CONFIG
+from bot.config import logger
+
+# Number of recent wait times kept for the metrics
+WAIT_TIME_WINDOW = 1000
+
+# A queued update with the time it was submitted, the data for the handlers and the future of its processing
+QueuedUpdate = Tuple[Update, float, Dict[str, Any], asyncio.Future]
+
+
+def get_order_key(update: Update) -> Optional[int]:
+    """
+    Returns the key of the queue an update belongs to: the chat, or the user for updates without a chat.
+
+    :param update: The update.
+    :return: The chat or user ID, or None if the update can be processed in any order.
+    """
+    context = UserContextMiddleware.resolve_event_context(update)
+    if context.chat is not None:
+        return context.chat.id
+    if context.user is not None:
+        return context.user.id
+    return None
+
+
+class UpdateScheduler:
+    """
+    Processes updates concurrently while keeping the updates of each chat in order.
+
+    Every chat has a serial queue, so the messages of a user are handled one after the other, while
+    different chats run in parallel, with at most max_concurrency updates processed at the same time.
+    """
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, max_concurrency: int, max_pending: int):
+        """
+        Initializes the scheduler.
+
+        :param dispatcher: The dispatcher processing the updates.
+        :param bot: The bot receiving the updates.
+        :param max_concurrency: Maximum number of updates processed at the same time, 1 processes the updates one by one.
+        :param max_pending: Number of waiting and running updates above which polling stops fetching new updates.
+        """
+        self.dispatcher = dispatcher
+        self.bot = bot
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.processed = 0
+        self.max_queue_depth = 0
+        self._queues: Dict[Hashable, Deque[QueuedUpdate]] = {}
+        self._workers: Set[asyncio.Task] = set()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._capacity = asyncio.Event()
+        self._capacity.set()
+        self._active = 0
+        self._pending = 0
+        self._wait_times: Deque[float] = deque(maxlen=WAIT_TIME_WINDOW)
+
+    def submit(self, update: Update, **data: Any) -> asyncio.Future:
+        """
+        Queues an update behind the pending updates of its chat.
+
+        :param update: The update.
+        :param data: Additional data passed to the handlers.
+        :return: A future done once the update has been processed, errors of the handlers are logged, not raised.
+        """
+        # Updates without a chat or user get a queue of their own
+        key = get_order_key(update)
+        if key is None:
+            key = object()
+
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            worker = asyncio.create_task(self._run_queue(key, queue))
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+
+        processed = asyncio.get_running_loop().create_future()
+        queue.append((update, time.monotonic(), data, processed))
+        self.max_queue_depth = max(self.max_queue_depth, len(queue))
+        self._pending += 1
+        if self._pending >= self.max_pending:
+            self._capacity.clear()
+        return processed
+
+    async def _run_queue(self, key: Hashable, queue: Deque[QueuedUpdate]) -> None:
+        """
+        Processes the updates of a chat in order, then removes its queue.
+
+        :param key: The key of the queue.
+        :param queue: The queued updates of the chat.
+        :return: None
+        """
+        try:
+            while queue:
+                update, submitted_at, data, processed = queue.popleft()
+                async with self._slots:
+                    self._wait_times.append(time.monotonic() - submitted_at)
+                    self._active += 1
+                    try:
+                        await self._process(update, data)
+                    finally:
+                        self._active -= 1
+                        self._pending -= 1
+                        self.processed += 1
+                        if self._pending < self.max_pending:
+                            self._capacity.set()
+                        if not processed.done():
+                            processed.set_result(None)
+        finally:
+            # Updates left behind by a cancelled worker are never processed
+            for _, _, _, processed in queue:
+                processed.cancel()
+            del self._queues[key]
+
+    async def _process(self, update: Update, data: Dict[str, Any]) -> None:
+        """
+        Feeds an update to the dispatcher and sends the method returned by the handler, if any.
+
+        :param update: The update.
+        :param data: Additional data passed to the handlers.
+        :return: None
+        """
+        try:
+            response = await self.dispatcher.feed_update(self.bot, update, **data)
+            if isinstance(response, TelegramMethod):
+                await self.dispatcher.silent_call_request(bot=self.bot, result=response)
+        except Exception as error:
+            logger.exception(f"Failed to process update {update.update_id}: {error}")
+
+    async def join(self) -> None:
+        """
+        Waits until every submitted update has been processed.
+
+        :return: None
+        """
+        while self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns the scheduler metrics.
+
+        :return: A dictionary with the running and queued updates, the number of chats with queued updates,
+            the deepest chat queue, the processed updates and the time updates waited before being processed.
+        """
+        wait_times = sorted(self._wait_times)
+        return {
+            "active": self._active,
+            "queued": self._pending - self._active,
+            "chats": len(self._queues),
+            "max_queue_depth": self.max_queue_depth,
+            "processed": self.processed,
+            "wait_avg": sum(wait_times) / len(wait_times) if wait_times else 0.0,
+            "wait_p99": wait_times[min(len(wait_times) - 1, int(len(wait_times) * 0.99))] if wait_times else 0.0,
+            "wait_max": wait_times[-1] if wait_times else 0.0
+        }
+
+    async def poll(self, polling_timeout: int = 10, allowed_updates: Optional[List[str]] = None, **data: Any) -> None:
+        """
+        Fetches updates with long polling and submits them until the task is cancelled.
+
+        The next batch is requested while the current one is processed, unless max_pending updates are waiting.
+
+        :param polling_timeout: Seconds Telegram holds a getUpdates request open.
+        :param allowed_updates: The update types to receive.
+        :param data: Additional data passed to the handlers.
+        :return: None
+        """
+        request_kwargs = {}
+        if self.bot.session.timeout:
+            # Wait longer than Telegram holds the request
+            request_kwargs["request_timeout"] = int(self.bot.session.timeout + polling_timeout)
+
+        backoff = Backoff(config=DEFAULT_BACKOFF_CONFIG)
+        offset = None
+        fetch = None
+        try:
+            while True:
+                fetch = asyncio.create_task(self.bot(
+                    GetUpdates(offset=offset, timeout=polling_timeout, allowed_updates=allowed_updates), **request_kwargs
+                ))
+                try:
+                    updates = await fetch
+                except Exception as error:
+                    logger.error(f"Failed to fetch updates, retrying in {backoff.next_delay:.1f} seconds: {error}")
+                    await backoff.asleep()
+                    continue
+                backoff.reset()
+
+                for update in updates:
+                    self.submit(update, **data)
+                if updates:
+                    offset = updates[-1].update_id + 1
+
+                # Too many waiting updates, stop fetching until some are processed
+                await self._capacity.wait()
+        finally:
+            if fetch is not None:
+                fetch.cancel()
+
+    async def start_polling(self, polling_timeout: int = 10) -> None:
+        """
+        Runs the dispatcher with long polling until SIGINT or SIGTERM, like Dispatcher.start_polling().
+
+        On stop, the submitted updates are processed before the shutdown handlers run.
+
+        :param polling_timeout: Seconds Telegram holds a getUpdates request open.
+        :return: None
+        """
+        workflow_data = {"dispatcher": self.dispatcher, "bots": [self.bot], **self.dispatcher.workflow_data}
+        workflow_data.pop("bot", None)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            # Signals cannot be handled on Windows
+            with suppress(NotImplementedError):
+                loop.add_signal_handler(signal_number, stop.set)
+
+        await self.dispatcher.emit_startup(bot=self.bot, **workflow_data)
+        logger.info(f"Polling updates, at most {self.max_concurrency} processed at the same time.")
+        polling = asyncio.create_task(self.poll(polling_timeout, self.dispatcher.resolve_used_update_types(), **workflow_data))
+        stopping = asyncio.create_task(stop.wait())
+        try:
+            await asyncio.wait({polling, stopping}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            polling.cancel()
+            stopping.cancel()
+            polling_result, = await asyncio.gather(polling, return_exceptions=True)
+            if isinstance(polling_result, Exception):
+                logger.error(f"Polling failed: {polling_result}")
+
+            await self.join()
+            logger.info(f"Polling stopped. Update scheduler metrics: {self.stats()}")
+            try:
+                await self.dispatcher.emit_shutdown(bot=self.bot, **workflow_data)
+            finally:
+                await self.bot.session.close()
@@ -0,0 +1,118 @@
+import asyncio
+import secrets
+from typing import Any, Optional
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from bot.config import config, logger
+from bot.scheduler import UpdateScheduler
+
+# Telegram only needs a 200 status, the answer is never read
+ACK_RESPONSE_BODY = b"{}"
+
+
+class WebhookRequestHandler(SimpleRequestHandler):
+    """
+    Webhook handler acknowledging every update immediately and processing it in the background.
+
+    Updates go through the update scheduler, like in polling mode, so the updates of a chat are processed
+    in order. At most max_concurrency updates are accepted and not processed yet. Once the limit is
+    reached, new requests wait for a free slot before being acknowledged, so Telegram slows down instead
+    of the bot piling up updates.
+    """
+    def __init__(self, dispatcher: Dispatcher, bot: Bot, secret_token: Optional[str], scheduler: UpdateScheduler, max_concurrency: int, **data: Any):
+        """
+        Initializes the handler.
+
+        :param dispatcher: The dispatcher processing the updates.
+        :param bot: The bot receiving the updates.
+        :param secret_token: The token Telegram sends in the X-Telegram-Bot-Api-Secret-Token header.
+        :param scheduler: The update scheduler processing the updates of the bot.
+        :param max_concurrency: Maximum number of updates accepted and not processed yet.
+        :param data: Additional data passed to the handlers.
+        """
+        super().__init__(dispatcher, bot, handle_in_background=True, secret_token=secret_token, **data)
+        self.scheduler = scheduler
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def _handle_request_background(self, bot: Bot, request: web.Request) -> web.Response:
+        update = Update.model_validate(await request.json(loads=bot.session.json_loads), context={"bot": bot})
+
+        await self._slots.acquire()
+        processed = self.scheduler.submit(update, **self.data)
+        processed.add_done_callback(self._finish_update)
+        return web.Response(body=ACK_RESPONSE_BODY, content_type="application/json")
+
+    def _finish_update(self, processed: asyncio.Future) -> None:
+        """
+        Releases the slot of a processed update. Errors are logged by the scheduler.
+
+        :param processed: The future of the processed update.
+        :return: None
+        """
+        self._slots.release()
+
+    async def close(self) -> None:
+        """
+        Waits for the updates being processed, then closes the bot session.
+        """
+        await self.scheduler.join()
+        logger.info(f"Webhook stopped. Update scheduler metrics: {self.scheduler.stats()}")
+        await super().close()
+
+
+def build_webhook_app(dispatcher: Dispatcher, bot: Bot, secret_token: Optional[str], scheduler: UpdateScheduler, **data: Any) -> web.Application:
+    """
+    Builds the aiohttp application serving the webhook.
+
+    The startup and shutdown handlers of the dispatcher run with the application.
+
+    :param dispatcher: The dispatcher processing the updates.
+    :param bot: The bot receiving the updates.
+    :param secret_token: The token expected in the X-Telegram-Bot-Api-Secret-Token header, None to accept any request.
+    :param scheduler: The update scheduler processing the updates.
+    :param data: Additional data passed to the handlers.
+    :return: The application.
+    """
+    app = web.Application()
+    WebhookRequestHandler(
+        dispatcher, bot, secret_token, scheduler, config.WEBHOOK_MAX_CONCURRENCY, **data
+    ).register(app, path=config.WEBHOOK_PATH)
+    setup_application(app, dispatcher, bot=bot, **data)
+    return app
+
+
+async def run_webhook(dispatcher: Dispatcher, bot: Bot, scheduler: UpdateScheduler, **data: Any) -> None:
+    """
+    Registers the webhook with Telegram and serves the updates until the task is cancelled.
+
+    :param dispatcher: The dispatcher processing the updates.
+    :param bot: The bot receiving the updates.
+    :param scheduler: The update scheduler processing the updates, keeping the updates of each chat in order.
+    :param data: Additional data passed to the handlers.
+    :return: None
+    """
+    if not config.WEBHOOK_URL:
+        raise ValueError("WEBHOOK_URL must be set to receive updates through a webhook")
+
+    # Without a configured secret, a new one is generated on every start
+    secret_token = config.WEBHOOK_SECRET or secrets.token_urlsafe(32)
+
+    app = build_webhook_app(dispatcher, bot, secret_token, scheduler, **data)
+    # Every update is already logged by the dispatcher
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    try:
+        await web.TCPSite(runner, config.WEBHOOK_HOST, config.WEBHOOK_PORT).start()
+        await bot.set_webhook(
+            url=config.WEBHOOK_URL.rstrip("/") + config.WEBHOOK_PATH,
+            secret_token=secret_token,
+            max_connections=config.WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=dispatcher.resolve_used_update_types()
+        )
+        logger.info(f"Receiving updates through the webhook on {config.WEBHOOK_HOST}:{config.WEBHOOK_PORT}{config.WEBHOOK_PATH}.")
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
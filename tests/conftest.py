@@ -0,0 +1,19 @@
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from bot.db import database, user
+from bot.db.database import build_engine, create_db_and_tables
+
+
+@pytest_asyncio.fixture
+async def database_engine(monkeypatch):
+    """Points the bot at a new in-memory SQLite database for the duration of a test, instead of DATABASE_URL."""
+    engine = build_engine("sqlite+aiosqlite:///:memory:")
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(database, "async_session", async_session)
+    monkeypatch.setattr(user, "async_session", async_session)
+
+    await create_db_and_tables()
+    yield engine
+    await engine.dispose()
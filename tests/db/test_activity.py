@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from bot.db import activity_tracker, get_user_activity
+
+
+@pytest_asyncio.fixture
+async def database(database_engine):
+    yield
+    await activity_tracker.close()
+
+
+@pytest.mark.asyncio
+async def test_activity_is_aggregated_and_incremented(database):
+    """Test that updates are merged in memory and added to the stored counters."""
+    flush_count = activity_tracker.flush_count
+
+    for _ in range(5):
+        activity_tracker.track(700)
+    activity_tracker.track(700, 0)
+    activity_tracker.track(701)
+    assert len(activity_tracker) == 2
+    assert activity_tracker.peek(700)[1] == 5
+
+    await activity_tracker.flush()
+    assert activity_tracker.flush_count == flush_count + 1
+    first_seen = (await get_user_activity(700)).last_seen
+
+    activity_tracker.track(700, 2)
+    await activity_tracker.flush()
+
+    activity = await get_user_activity(700)
+    assert activity.message_count == 7
+    assert activity.last_seen >= first_seen
+    assert (await get_user_activity(701)).message_count == 1
+    assert await get_user_activity(702) is None
+
+
+@pytest.mark.asyncio
+async def test_activity_falls_back_to_select_then_update(database, monkeypatch):
+    """Test that backends without INSERT ... ON CONFLICT still add up the stored counters."""
+    from bot.db import database as database_module
+    monkeypatch.setattr(database_module, "insert_or_update", lambda *args: None)
+
+    activity_tracker.track(710, 3)
+    await activity_tracker.flush()
+    activity_tracker.track(710, 2)
+    activity_tracker.track(711)
+    await activity_tracker.flush()
+
+    assert (await get_user_activity(710)).message_count == 5
+    assert (await get_user_activity(711)).message_count == 1
+
+
+@pytest.mark.asyncio
+async def test_activity_is_bounded_while_the_database_fails(monkeypatch):
+    """Test that a failing database delays the next flushes more and more and keeps only the newest counters."""
+    from bot.db.activity import ActivityTracker
+    tracker = ActivityTracker(max_size=2, flush_interval=10, max_pending=3)
+    writes = []
+
+    async def fail_write(batch):
+        writes.append(dict(batch))
+        raise OSError("database is unavailable")
+
+    monkeypatch.setattr(tracker, "_write", fail_write)
+
+    tracker.track(720)
+    tracker.track(721)
+    await tracker._flush_task
+    assert len(writes) == 1 and tracker.failure_count == 1
+
+    # A full buffer no longer starts a flush, the oldest counters are dropped instead
+    for user_id in range(722, 727):
+        tracker.track(user_id)
+    assert len(writes) == 1
+    assert len(tracker) == 3 and tracker.dropped_count == 4
+    assert tracker.peek(720) is None and tracker.peek(726) is not None
+    first_delay = tracker._timer.when() - asyncio.get_running_loop().time()
+
+    await tracker.flush()
+    second_delay = tracker._timer.when() - asyncio.get_running_loop().time()
+    assert tracker.failure_count == 2
+    assert first_delay == pytest.approx(20, abs=1) and second_delay == pytest.approx(40, abs=1)
+
+    stored = {}
+
+    async def store(batch):
+        stored.update(batch)
+
+    monkeypatch.setattr(tracker, "_write", store)
+    await tracker.flush()
+    assert sorted(stored) == [724, 725, 726]
+    assert tracker.failure_count == 0 and len(tracker) == 0
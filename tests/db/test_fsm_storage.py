@@ -0,0 +1,40 @@
+import pytest
+from aiogram.fsm.storage.base import StorageKey
+from bot.db import DatabaseStorage
+from bot.db.database import get_session
+from bot.db.fsm_storage import build_storage_key
+from bot.models import FSMStateRecord
+
+KEY = StorageKey(bot_id=1, chat_id=5001, user_id=5001)
+
+
+@pytest.mark.asyncio
+async def test_states_survive_a_restart(database_engine):
+    """Test that a new storage instance reads the states written by the previous one."""
+    storage = DatabaseStorage()
+    await storage.set_state(KEY, "PluginState:waiting_for_plugin")
+    await storage.update_data(KEY, {"waiting_for_plugin": "example_plugin"})
+    assert await storage.get_state(KEY) == "PluginState:waiting_for_plugin"
+    await storage.close()
+
+    restarted_storage = DatabaseStorage()
+    assert await restarted_storage.get_state(KEY) == "PluginState:waiting_for_plugin"
+    assert await restarted_storage.get_data(KEY) == {"waiting_for_plugin": "example_plugin"}
+
+    # Cleared states are deleted instead of being kept as empty rows
+    await restarted_storage.set_state(KEY, None)
+    await restarted_storage.set_data(KEY, {})
+    await restarted_storage.close()
+    assert await DatabaseStorage().get_state(KEY) is None
+
+    async for session in get_session():
+        assert await session.get(FSMStateRecord, build_storage_key(KEY)) is None
+
+
+@pytest.mark.asyncio
+async def test_data_must_be_json_serializable(database_engine):
+    """Test that live objects are rejected when they are stored, not when they are written."""
+    storage = DatabaseStorage()
+    with pytest.raises(TypeError):
+        await storage.set_data(KEY, {"plugin": object()})
+    assert await storage.get_data(KEY) == {}
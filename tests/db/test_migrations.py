@@ -0,0 +1,21 @@
+from sqlalchemy import create_engine, inspect, text
+from bot.db.migrations import MIGRATIONS, apply_migrations
+
+
+def test_migrations_upgrade_an_existing_database():
+    """Test that the migrations add indexes to old tables without losing rows."""
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, access_level INTEGER)"))
+        connection.execute(text("INSERT INTO users (id, access_level) VALUES (1, 3), (2, 0)"))
+
+    with engine.begin() as connection:
+        assert apply_migrations(connection) == len(MIGRATIONS)
+
+    with engine.begin() as connection:
+        assert "ix_users_access_level" in {index["name"] for index in inspect(connection).get_indexes("users")}
+        assert connection.execute(text("SELECT id, access_level FROM users ORDER BY id")).all() == [(1, 3), (2, 0)]
+
+        # Applied migrations are not applied again
+        assert apply_migrations(connection) == len(MIGRATIONS)
+        assert connection.execute(text("SELECT COUNT(*) FROM schema_version")).scalar() == len(MIGRATIONS)
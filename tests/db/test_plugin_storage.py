@@ -0,0 +1,90 @@
+import pytest
+import pytest_asyncio
+from bot.db import PluginStorage, plugin_data_buffer, plugin_data_cache
+
+
+@pytest_asyncio.fixture
+async def database(database_engine):
+    plugin_data_cache.invalidate()
+    yield
+    await plugin_data_buffer.close()
+    plugin_data_cache.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_values_are_buffered_and_persisted(database):
+    """Test that writes are visible before the flush and stored in one batch."""
+    storage = PluginStorage("test_plugin")
+    flush_count = plugin_data_buffer.flush_count
+
+    for counter in range(10):
+        await storage.set("counter", counter)
+    await storage.set("user:1", {"name": "first"})
+    await storage.set("user:2", {"name": "second"})
+    await storage.delete("user:2")
+    assert await storage.get("counter") == 9
+    assert await storage.get("user:2", "deleted") == "deleted"
+
+    await plugin_data_buffer.flush()
+    assert plugin_data_buffer.flush_count == flush_count + 1
+
+    # Values are read back from the database once the cache is empty
+    plugin_data_cache.invalidate()
+    assert await storage.get("counter") == 9
+    assert await storage.scan("user:") == {"user:1": {"name": "first"}}
+    assert await PluginStorage("other_plugin").get("counter") is None
+
+
+@pytest.mark.asyncio
+async def test_expired_values_are_hidden(database, monkeypatch):
+    """Test that values with a time to live are no longer returned once they have expired."""
+    import time
+    storage = PluginStorage("test_plugin")
+    await storage.set("session", "token", ttl=60)
+    await storage.set("user_%", "escaped")
+    assert await storage.get("session") == "token"
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    assert await storage.get("session") is None
+    assert await storage.scan("user_%") == {"user_%": "escaped"}
+    assert "session" not in await storage.scan()
+
+
+@pytest.mark.asyncio
+async def test_values_fall_back_to_select_then_update(database, monkeypatch):
+    """Test that backends without INSERT ... ON CONFLICT still overwrite the stored values."""
+    from bot.db import database as database_module
+    monkeypatch.setattr(database_module, "insert_or_update", lambda *args: None)
+    storage = PluginStorage("test_plugin")
+
+    await storage.set("counter", 1)
+    await PluginStorage("other_plugin").set("counter", 10)
+    await plugin_data_buffer.flush()
+    await storage.set("counter", 2)
+    await plugin_data_buffer.flush()
+
+    plugin_data_cache.invalidate()
+    assert await storage.get("counter") == 2
+    assert await PluginStorage("other_plugin").get("counter") == 10
+
+
+@pytest.mark.asyncio
+async def test_invalid_values_do_not_block_other_keys(database):
+    """Test that a value that is not JSON serializable is rejected and does not prevent other writes from being stored."""
+    storage = PluginStorage("test_plugin")
+
+    with pytest.raises(TypeError):
+        await storage.set("tags", {"first", "second"})
+    assert await storage.get("tags") is None
+
+    # A value that reaches the buffer anyway is dropped alone when the batch is rejected
+    plugin_data_buffer.add(("test_plugin", "broken"), ({"first"}, None))
+    await storage.set("counter", 1)
+    await PluginStorage("other_plugin").set("counter", 2)
+    await plugin_data_buffer.flush()
+    assert len(plugin_data_buffer) == 0
+
+    plugin_data_cache.invalidate()
+    assert await storage.scan() == {"counter": 1}
+    assert await PluginStorage("other_plugin").get("counter") == 2
@@ -0,0 +1,104 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from bot.db import add_user, add_users, iter_user_chunks, get_all_users, set_user_access_level, get_user_access_level, user_cache
+from bot.db.cache import TTLCache
+
+
+@pytest_asyncio.fixture
+async def database(database_engine):
+    user_cache.invalidate()
+    yield
+    user_cache.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_access_level_is_cached_and_invalidated(database):
+    """Test that repeated lookups hit the cache and that writes invalidate it."""
+    user_id = 1001
+    hits = user_cache.hits
+
+    assert await get_user_access_level(user_id) == 0
+    assert await get_user_access_level(user_id) == 0
+    assert user_cache.hits == hits + 1
+
+    # Creating the user replaces the cached access level of the unknown user
+    await add_user(user_id, 1)
+    assert await get_user_access_level(user_id) == 1
+
+    await set_user_access_level(user_id, 2)
+    assert await get_user_access_level(user_id) == 2
+
+
+@pytest.mark.asyncio
+async def test_add_users_and_iter_user_chunks(database):
+    """Test that existing users are kept by the bulk insert and that all users are streamed in chunks."""
+    await add_user(3000, 2)
+    await add_users((user_id, 1) for user_id in range(3000, 3025))
+
+    assert await get_user_access_level(3000) == 2
+    assert await get_user_access_level(3024) == 1
+
+    chunks = [chunk async for chunk in iter_user_chunks(chunk_size=10)]
+    streamed_ids = [user.id for chunk in chunks for user in chunk]
+    assert all(len(chunk) <= 10 for chunk in chunks)
+    assert streamed_ids == sorted(user.id for user in await get_all_users())
+
+
+@pytest.mark.asyncio
+async def test_registration_queue_dedupes_and_flushes_in_bulk(database):
+    """Test that queued users are stored once, in one flush, when the batch is full and on close."""
+    from bot.db.user import UserRegistrationQueue
+
+    queue = UserRegistrationQueue(max_size=3, flush_interval=60)
+    for user_id in (4000, 4001, 4000, 4001):
+        queue.add(user_id, 0)
+    assert len(queue) == 2
+    assert await get_user_access_level(4000) == 0 and queue.flush_count == 0
+
+    # The third distinct user fills the batch and starts a flush
+    queue.add(4002, 0)
+    await asyncio.sleep(0)
+    assert len(queue) == 0
+
+    queue.add(4003, 0)
+    await queue.close()
+
+    assert queue.flush_count == 2
+    assert {user.id for user in await get_all_users()} >= {4000, 4001, 4002, 4003}
+
+
+@pytest.mark.asyncio
+async def test_inserts_fall_back_to_select_then_insert(database, monkeypatch):
+    """Test that backends without INSERT ... ON CONFLICT still skip the existing users."""
+    from bot.db import database as database_module
+    monkeypatch.setattr(database_module, "insert_ignore", lambda model: None)
+
+    await add_user(5000, 2)
+    await add_user(5000, 1)
+    await add_users([(5000, 1), (5001, 1), (5001, 1)])
+
+    assert await get_user_access_level(5000) == 2
+    assert {user.id for user in await get_all_users()} == {5000, 5001}
+
+
+def test_ttl_cache_evicts_least_recently_used_entry():
+    """Test the size limit, the stale write protection and the disabled cache."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set(1, "a")
+    cache.set(2, "b")
+    cache.get(1)
+    cache.set(3, "c")
+    assert cache.get(2) is None
+    assert cache.get(1) == "a" and cache.get(3) == "c"
+
+    # A value read before an invalidation is not stored
+    generation = cache.generation
+    cache.invalidate(1)
+    cache.set(1, "stale", generation)
+    assert cache.get(1) is None
+
+    disabled_cache = TTLCache(maxsize=0, ttl=60)
+    disabled_cache.set(1, "a")
+    assert disabled_cache.get(1) is None
+    assert disabled_cache.stats()["misses"] == 1
@@ -0,0 +1,128 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.methods import SendMessage
+from bot import broadcast as broadcast_module
+from bot.broadcast import Broadcaster
+from bot.db import add_users, get_broadcast
+from bot.handlers import broadcast as broadcast_handlers
+from bot.handlers.broadcast import confirm_broadcast, format_broadcast_progress
+
+# Access level used only by the users of these tests
+ACCESS_LEVEL = 7
+
+
+@pytest_asyncio.fixture
+async def recipients(database_engine):
+    user_ids = list(range(9001, 9006))
+    await add_users((user_id, ACCESS_LEVEL) for user_id in user_ids)
+    return user_ids
+
+
+def build_bot(send_message) -> MagicMock:
+    bot = MagicMock()
+    bot.send_message = AsyncMock(side_effect=send_message)
+    return bot
+
+
+@pytest.mark.asyncio
+async def test_broadcast_resumes_from_its_checkpoint(recipients):
+    """Test that a broadcast stopped by a restart continues after the last stored chunk."""
+    blocked = asyncio.Event()
+
+    async def stalled_send(chat_id, text, parse_mode):
+        if chat_id == 9003:
+            await blocked.wait()
+
+    broadcaster = Broadcaster(build_bot(stalled_send), 2, 2)
+    broadcast = await broadcaster.start("Hello", min_access_level=ACCESS_LEVEL)
+    assert broadcast.total == len(recipients)
+
+    # Wait for the first chunk to be stored, then simulate a shutdown
+    for _ in range(100):
+        if (await get_broadcast(broadcast.id)).last_user_id == 9002:
+            break
+        await asyncio.sleep(0.01)
+    await broadcaster.stop()
+    assert (await get_broadcast(broadcast.id)).status == "running"
+
+    sent_to = []
+
+    async def send(chat_id, text, parse_mode):
+        sent_to.append(chat_id)
+
+    restarted = Broadcaster(build_bot(send), 2, 2)
+    await restarted.resume()
+    await restarted.runs[broadcast.id].task
+
+    stored = await get_broadcast(broadcast.id)
+    assert sorted(sent_to) == [9003, 9004, 9005]
+    assert (stored.status, stored.sent, stored.failed) == ("completed", 5, 0)
+    assert await restarted.cancel(broadcast.id) is False
+
+
+@pytest.mark.asyncio
+async def test_blocked_users_are_counted_as_failed(recipients):
+    """Test that users who blocked the bot do not stop the broadcast."""
+    async def send(chat_id, text, parse_mode):
+        if chat_id == 9002:
+            raise TelegramForbiddenError(method=SendMessage(chat_id=chat_id, text=text), message="bot was blocked by the user")
+
+    broadcaster = Broadcaster(build_bot(send), 3, 10)
+    broadcast = await broadcaster.start("<b>News</b>", "HTML", ACCESS_LEVEL)
+    await broadcaster.runs[broadcast.id].task
+
+    progress = await broadcaster.progress(broadcast.id)
+    assert (progress["status"], progress["sent"], progress["failed"]) == ("completed", 4, 1)
+    assert "Sent:</b> 4 / 5 (100%)" in format_broadcast_progress(progress)
+
+
+@pytest.mark.asyncio
+async def test_failed_chunk_is_retried_then_broadcast_is_marked_failed(recipients, monkeypatch):
+    """Test that an interrupted chunk is sent again and counted once, and that a broadcast failing every attempt is marked as failed."""
+    monkeypatch.setattr(broadcast_module, "BROADCAST_RETRY_DELAY", 0)
+    attempts = []
+
+    async def flaky_send(chat_id, text, parse_mode):
+        attempts.append(chat_id)
+        if chat_id == 9004 and attempts.count(9004) == 1:
+            raise RuntimeError("connection reset")
+
+    broadcaster = Broadcaster(build_bot(flaky_send), 2, 2)
+    broadcast = await broadcaster.start("Hello", min_access_level=ACCESS_LEVEL)
+    await broadcaster.runs[broadcast.id].task
+
+    stored = await get_broadcast(broadcast.id)
+    assert attempts.count(9003) == 2
+    assert (stored.status, stored.sent, stored.failed) == ("completed", 5, 0)
+
+    async def broken_send(chat_id, text, parse_mode):
+        raise RuntimeError("connection reset")
+
+    broadcaster = Broadcaster(build_bot(broken_send), 2, 2)
+    broadcast = await broadcaster.start("Hello", min_access_level=ACCESS_LEVEL)
+    await broadcaster.runs[broadcast.id].task
+
+    assert broadcast.id not in broadcaster.runs
+    assert (await get_broadcast(broadcast.id)).status == "failed"
+    assert "Broadcast failed" in format_broadcast_progress(await broadcaster.progress(broadcast.id))
+
+
+@pytest.mark.asyncio
+async def test_confirm_broadcast_never_targets_unauthorized_users(monkeypatch):
+    """Test that the recipients chosen in the menu set the minimum access level, never below 1."""
+    start = AsyncMock(return_value=MagicMock(id=1))
+    monkeypatch.setattr(broadcast_handlers.broadcaster, "start", start)
+    monkeypatch.setattr(broadcast_handlers, "watch_broadcast", MagicMock())
+
+    for callback_data, min_access_level in (("broadcast_confirm:2", 2), ("broadcast_confirm:0", 1)):
+        callback_query = AsyncMock()
+        callback_query.data = callback_data
+        callback_query.from_user.id = 1
+        state = AsyncMock()
+        state.get_data.return_value = {"broadcast_text": "Hello"}
+
+        await confirm_broadcast(callback_query, state, access_level=2)
+        assert start.call_args.args[2] == min_access_level
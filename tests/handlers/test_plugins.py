@@ -29,7 +29,7 @@ async def test_show_plugin_list():
 
 
 @pytest.mark.asyncio
-async def test_show_plugin_details():
+async def test_show_plugin_details(monkeypatch):
     """Test showing plugin details."""
     message = AsyncMock(spec=Message)
     message.text = "Test Plugin"
@@ -47,12 +47,12 @@ async def test_show_plugin_details():
     plugin.functions[0].name = "function1"
     plugin.functions[1].name = "function2"
 
-    plugin_manager.loaded_plugins = [plugin]
+    monkeypatch.setattr(plugin_manager, "loaded_plugins", [plugin])
 
     state = AsyncMock()
     await show_plugin_details(message, state)
 
-    state.update_data.assert_called_once_with(waiting_for_plugin=plugin)
+    state.update_data.assert_called_once_with(waiting_for_plugin="test_plugin")
     
     # Now using the correct names for the functions
     message.answer.assert_called_once_with(
@@ -86,14 +86,18 @@ async def test_cancel_plugin_editing():
 
 
 @pytest.mark.asyncio
-async def test_initiate_plugin_deletion():
+async def test_initiate_plugin_deletion(monkeypatch):
     """Test initiating plugin deletion."""
     callback_query = AsyncMock(spec=CallbackQuery)
     callback_query.message = AsyncMock()
     callback_query.message.edit_text = AsyncMock()
 
+    plugin = MagicMock(title="Test Plugin")
+    plugin.name = "test_plugin"
+    monkeypatch.setattr(plugin_manager, "loaded_plugins", [plugin])
+
     state = AsyncMock()
-    state.get_data = AsyncMock(return_value={"waiting_for_plugin": MagicMock(name="test_plugin", title="Test Plugin")})
+    state.get_data = AsyncMock(return_value={"waiting_for_plugin": "test_plugin"})
 
     await initiate_plugin_deletion(callback_query, state)
 
@@ -105,7 +109,7 @@ async def test_initiate_plugin_deletion():
 
 
 @pytest.mark.asyncio
-async def test_cancel_plugin_deletion():
+async def test_cancel_plugin_deletion(monkeypatch):
     """Test canceling plugin deletion."""
     callback_query = AsyncMock(spec=CallbackQuery)
     callback_query.message = AsyncMock()
@@ -123,8 +127,10 @@ async def test_cancel_plugin_deletion():
     plugin.functions[0].name = "function1"
     plugin.functions[1].name = "function2"
 
+    monkeypatch.setattr(plugin_manager, "loaded_plugins", [plugin])
+
     state = AsyncMock()
-    state.get_data = AsyncMock(return_value={"waiting_for_plugin": plugin})
+    state.get_data = AsyncMock(return_value={"waiting_for_plugin": "test_plugin"})
 
     await cancel_plugin_deletion(callback_query, state)
 
@@ -144,7 +150,7 @@ async def test_cancel_plugin_deletion():
 
 
 @pytest.mark.asyncio
-async def test_confirm_plugin_deletion():
+async def test_confirm_plugin_deletion(monkeypatch):
     """Test confirming plugin deletion."""
     callback_query = AsyncMock(spec=CallbackQuery)
     callback_query.message = AsyncMock()
@@ -153,10 +159,12 @@ async def test_confirm_plugin_deletion():
     plugin = MagicMock()
     plugin.name = "test_plugin"
     plugin.title = "Test Plugin"
+    monkeypatch.setattr(plugin_manager, "loaded_plugins", [plugin])
+
     state = AsyncMock()
-    state.get_data = AsyncMock(return_value={"waiting_for_plugin": plugin})
+    state.get_data = AsyncMock(return_value={"waiting_for_plugin": "test_plugin"})
 
-    plugin_manager.delete_plugin = MagicMock()
+    monkeypatch.setattr(plugin_manager, "delete_plugin", MagicMock())
 
     await confirm_plugin_deletion(callback_query, state)
 
@@ -166,3 +174,24 @@ async def test_confirm_plugin_deletion():
         parse_mode="HTML",
         reply_markup=plugins_menu()
     )
+
+
+@pytest.mark.asyncio
+async def test_confirm_plugin_deletion_of_removed_plugin(monkeypatch):
+    """Test confirming the deletion of a plugin that is no longer loaded."""
+    callback_query = AsyncMock(spec=CallbackQuery)
+    callback_query.message = AsyncMock()
+    callback_query.message.edit_text = AsyncMock()
+
+    monkeypatch.setattr(plugin_manager, "loaded_plugins", [])
+    monkeypatch.setattr(plugin_manager, "delete_plugin", MagicMock())
+    state = AsyncMock()
+    state.get_data = AsyncMock(return_value={"waiting_for_plugin": "test_plugin"})
+
+    await confirm_plugin_deletion(callback_query, state)
+
+    plugin_manager.delete_plugin.assert_not_called()
+    callback_query.message.edit_text.assert_called_once_with(
+        text="<b>❌ Sorry, we couldn't find the selected plugin.</b> It may have been removed, please choose it from the list again.",
+        parse_mode="HTML"
+    )
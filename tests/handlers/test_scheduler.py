@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from datetime import datetime
+from aiogram import Bot, Dispatcher, F
+from aiogram.types import Update, Message, Chat, User
+from bot.scheduler import UpdateScheduler
+
+
+def build_update(update_id: int, chat_id: int, text: str) -> Update:
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id,
+        date=datetime.now(),
+        chat=Chat(id=chat_id, type="private"),
+        from_user=User(id=chat_id, is_bot=False, first_name="Test"),
+        text=text
+    ))
+
+
+def build_dispatcher(events: list, release: asyncio.Event) -> Dispatcher:
+    dispatcher = Dispatcher()
+
+    @dispatcher.message(F.text)
+    async def handler(message: Message):
+        events.append(("start", message.text))
+        if message.text.startswith("slow"):
+            await release.wait()
+        events.append(("end", message.text))
+
+    return dispatcher
+
+
+@pytest.mark.asyncio
+async def test_chats_run_in_parallel_and_stay_in_order():
+    """Test that a slow update holds back its own chat only."""
+    events = []
+    release = asyncio.Event()
+    scheduler = UpdateScheduler(build_dispatcher(events, release), Bot("123456:test"), 10, 100)
+
+    scheduler.submit(build_update(1, 1, "slow 1"))
+    scheduler.submit(build_update(2, 1, "fast 1"))
+    scheduler.submit(build_update(3, 2, "fast 2"))
+    await asyncio.sleep(0.05)
+
+    # The other chat is done, the second update of the slow chat waits
+    assert ("end", "fast 2") in events
+    assert ("start", "fast 1") not in events
+    assert scheduler.stats()["queued"] == 1
+    assert scheduler.stats()["max_queue_depth"] == 2
+
+    release.set()
+    await scheduler.join()
+    assert events.index(("end", "slow 1")) < events.index(("start", "fast 1"))
+    assert scheduler.stats()["processed"] == 3
+    assert scheduler.stats()["chats"] == 0
+
+
+@pytest.mark.asyncio
+async def test_global_concurrency_limit():
+    """Test that no more than max_concurrency updates run at the same time."""
+    events = []
+    release = asyncio.Event()
+    scheduler = UpdateScheduler(build_dispatcher(events, release), Bot("123456:test"), 2, 100)
+
+    for chat_id in range(1, 5):
+        scheduler.submit(build_update(chat_id, chat_id, f"slow {chat_id}"))
+    await asyncio.sleep(0.05)
+    assert scheduler.stats()["active"] == 2
+    assert len(events) == 2
+
+    release.set()
+    await scheduler.join()
+    assert scheduler.stats()["processed"] == 4
+
+
+class FakeBot(Bot):
+    """Bot returning prepared getUpdates batches."""
+    def __init__(self, batches: list):
+        super().__init__("123456:test")
+        self.batches = batches
+        self.requests = []
+
+    async def __call__(self, method, request_timeout=None):
+        self.requests.append(method)
+        if self.batches:
+            return self.batches.pop(0)
+        await asyncio.Event().wait()
+
+
+@pytest.mark.asyncio
+async def test_polling_prefetches_the_next_batch():
+    """Test that the next batch is requested while the current one is processed and acknowledged by the offset."""
+    events = []
+    release = asyncio.Event()
+    bot = FakeBot([[build_update(10, 1, "slow 1"), build_update(11, 2, "slow 2")]])
+    scheduler = UpdateScheduler(build_dispatcher(events, release), bot, 10, 100)
+
+    polling = asyncio.create_task(scheduler.poll())
+    await asyncio.sleep(0.05)
+    assert len(bot.requests) == 2
+    assert bot.requests[1].offset == 12
+    assert scheduler.stats()["active"] == 2
+
+    polling.cancel()
+    release.set()
+    await scheduler.join()
+    assert scheduler.processed == 2
@@ -71,7 +71,7 @@ async def test_cancel_plugin_deletion():
 
 
 @pytest.mark.asyncio
-async def test_delete_all_plugins():
+async def test_delete_all_plugins(monkeypatch):
     """Test confirming the deletion of all plugins."""
     callback_query = MagicMock(spec=CallbackQuery)
     callback_query.message = MagicMock(spec=Message)
@@ -83,8 +83,8 @@ async def test_delete_all_plugins():
     plugin2 = MagicMock(spec=Plugin)
     plugin2.name = "plugin2"
 
-    plugin_manager.loaded_plugins = [plugin1, plugin2]
-    plugin_manager.delete_plugin = MagicMock()
+    monkeypatch.setattr(plugin_manager, "loaded_plugins", [plugin1, plugin2])
+    monkeypatch.setattr(plugin_manager, "delete_plugin", MagicMock())
 
     await delete_all_plugins(callback_query)
 
@@ -0,0 +1,91 @@
+import asyncio
+import pytest
+from datetime import datetime
+from aiohttp.test_utils import TestClient, TestServer
+from aiogram import Bot, Dispatcher, F
+from aiogram.types import Update, Message, Chat, User
+from bot.config import config
+from bot.scheduler import UpdateScheduler
+from bot.webhook import build_webhook_app
+
+SECRET = "test-secret"
+
+
+def build_update(update_id: int, text: str, chat_id: int = 3001) -> dict:
+    return Update(
+        update_id=update_id,
+        message=Message(
+            message_id=update_id,
+            date=datetime.now(),
+            chat=Chat(id=chat_id, type="private"),
+            from_user=User(id=chat_id, is_bot=False, first_name="Test"),
+            text=text
+        )
+    ).model_dump(mode="json", exclude_none=True)
+
+
+@pytest.mark.asyncio
+async def test_webhook_checks_the_secret_and_limits_concurrency(monkeypatch):
+    """Test that unauthorized requests are rejected and that only WEBHOOK_MAX_CONCURRENCY updates are accepted at once."""
+    monkeypatch.setattr(config, "WEBHOOK_MAX_CONCURRENCY", 2)
+
+    release = asyncio.Event()
+    started = []
+    dispatcher = Dispatcher()
+
+    @dispatcher.message(F.text)
+    async def slow_handler(message: Message):
+        started.append(message.text)
+        await release.wait()
+
+    bot = Bot("123456:test")
+    app = build_webhook_app(dispatcher, bot, SECRET, UpdateScheduler(dispatcher, bot, 10, 100))
+    async with TestClient(TestServer(app)) as client:
+        response = await client.post(config.WEBHOOK_PATH, json=build_update(1, "intruder"))
+        assert response.status == 401
+
+        headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET}
+        for update_id in (2, 3):
+            response = await client.post(config.WEBHOOK_PATH, json=build_update(update_id, str(update_id), update_id), headers=headers)
+            assert response.status == 200
+
+        # The third update is acknowledged only once a slot is free
+        third = asyncio.create_task(client.post(config.WEBHOOK_PATH, json=build_update(4, "4", 4), headers=headers))
+        await asyncio.sleep(0.1)
+        assert not third.done()
+        assert sorted(started) == ["2", "3"]
+
+        release.set()
+        assert (await third).status == 200
+        await asyncio.sleep(0.05)
+        assert sorted(started) == ["2", "3", "4"]
+
+
+@pytest.mark.asyncio
+async def test_webhook_keeps_the_order_of_each_chat():
+    """Test that the updates of a chat are processed one after the other, while other chats run in parallel."""
+    release = asyncio.Event()
+    events = []
+    dispatcher = Dispatcher()
+
+    @dispatcher.message(F.text)
+    async def slow_handler(message: Message):
+        events.append(f"start {message.text}")
+        if message.text == "first":
+            await release.wait()
+        events.append(f"end {message.text}")
+
+    bot = Bot("123456:test")
+    app = build_webhook_app(dispatcher, bot, SECRET, UpdateScheduler(dispatcher, bot, 10, 100))
+    async with TestClient(TestServer(app)) as client:
+        headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET}
+        for update_id, text, chat_id in ((1, "first", 3001), (2, "second", 3001), (3, "other", 3002)):
+            response = await client.post(config.WEBHOOK_PATH, json=build_update(update_id, text, chat_id), headers=headers)
+            assert response.status == 200
+
+        await asyncio.sleep(0.05)
+        assert events == ["start first", "start other", "end other"]
+
+        release.set()
+        await asyncio.sleep(0.05)
+        assert events[3:] == ["end first", "start second", "end second"]
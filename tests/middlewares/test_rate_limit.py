@@ -0,0 +1,54 @@
+import time
+import asyncio
+import pytest
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage, GetMe
+from bot.middlewares import RateLimiter, bulk_sending
+
+
+@pytest.mark.asyncio
+async def test_replies_are_sent_before_bulk_messages():
+    """Test that the global rate is respected and that interactive messages skip the bulk queue."""
+    limiter = RateLimiter(global_rate=50, chat_burst=1)
+    bot = Bot("123456:test")
+    sent = []
+
+    async def make_request(bot, method):
+        sent.append((method.chat_id, time.monotonic()))
+        return True
+
+    async def broadcast():
+        with bulk_sending():
+            await asyncio.gather(*(limiter(make_request, bot, SendMessage(chat_id=chat_id, text="news")) for chat_id in range(1, 11)))
+
+    broadcasting = asyncio.create_task(broadcast())
+    await asyncio.sleep(0.05)
+    await limiter(make_request, bot, SendMessage(chat_id=1000, text="reply"))
+    await broadcasting
+
+    chat_ids = [chat_id for chat_id, _ in sent]
+    assert chat_ids.index(1000) < 6
+    assert len(sent) == 11
+    # 11 messages at 50 per second take at least 0.2 seconds
+    assert sent[-1][1] - sent[0][1] >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_flood_errors_are_retried_and_other_methods_pass():
+    """Test that a flood error pauses the chat and retries the message."""
+    limiter = RateLimiter(private_rate=100, chat_burst=1)
+    bot = Bot("123456:test")
+    calls = []
+
+    async def make_request(bot, method):
+        calls.append(method)
+        if len(calls) == 1:
+            raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=0)
+        return True
+
+    assert await limiter(make_request, bot, SendMessage(chat_id=5, text="hello")) is True
+    assert len(calls) == 2
+
+    await limiter(make_request, bot, GetMe())
+    assert 5 in limiter.chat_buckets and len(limiter.chat_buckets) == 1
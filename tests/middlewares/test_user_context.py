@@ -0,0 +1,60 @@
+import pytest
+import pytest_asyncio
+from datetime import datetime
+from aiogram import Bot, Dispatcher, Router, F
+from aiogram.types import Update, Message, Chat, User
+from bot.db import add_user, user_cache
+from bot.middlewares import AccessLevel, UserContext
+
+
+@pytest_asyncio.fixture
+async def database(database_engine):
+    user_cache.invalidate()
+    yield
+    user_cache.invalidate()
+
+
+@pytest.mark.asyncio
+async def test_user_is_loaded_once_per_update(database, monkeypatch):
+    """Test that the user record is passed to handlers and that AccessLevel uses the preloaded value."""
+    await add_user(2001, 2)
+
+    queries = []
+    from bot.middlewares import user_context
+    original_get_user = user_context.get_user
+
+    async def counting_get_user(user_id):
+        queries.append(user_id)
+        return await original_get_user(user_id)
+
+    async def fail_access_level(user_id):
+        raise AssertionError("AccessLevel queried the access level again")
+
+    monkeypatch.setattr(user_context, "get_user", counting_get_user)
+    monkeypatch.setattr("bot.middlewares.access_level.get_user_access_level", fail_access_level)
+
+    received = {}
+    router = Router()
+    router.message.middleware(AccessLevel(2))
+
+    @router.message(F.text == "whoami")
+    async def whoami(message, user, access_level):
+        received["user"], received["access_level"] = user, access_level
+
+    dispatcher = Dispatcher()
+    dispatcher.update.outer_middleware(UserContext())
+    dispatcher.include_router(router)
+
+    bot = Bot(token="123456:test")
+    await dispatcher.feed_update(bot, Update(update_id=1, message=Message(
+        message_id=1,
+        date=datetime.now(),
+        chat=Chat(id=2001, type="private"),
+        from_user=User(id=2001, is_bot=False, first_name="Test"),
+        text="whoami"
+    )))
+    await bot.session.close()
+
+    assert queries == [2001]
+    assert received["user"].id == 2001
+    assert received["access_level"] == 2
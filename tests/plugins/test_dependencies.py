@@ -0,0 +1,28 @@
+import pytest
+import asyncio
+from bot.plugins.dependencies import get_missing_dependencies, install_dependencies
+
+
+def test_get_missing_dependencies():
+    """Test that satisfied requirements are skipped and duplicates, even written differently, are removed."""
+    missing_dependencies = get_missing_dependencies([
+        "aiogram",
+        "pytest>=1.0",
+        "pytest>=999.0",
+        "surely-not-installed-package",
+        " Surely_Not_Installed.Package ",
+        "aiogram; python_version < '3.0'",
+    ])
+
+    assert missing_dependencies == ["pytest>=999.0", "surely-not-installed-package"]
+
+
+@pytest.mark.asyncio
+async def test_install_dependencies_skips_pip_when_satisfied(monkeypatch):
+    """Test that pip is not started when every requirement is already installed."""
+    async def fail_subprocess(*args, **kwargs):
+        raise AssertionError("pip must not be started")
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fail_subprocess)
+
+    assert await install_dependencies(["aiogram", "pytest", "aiogram"])
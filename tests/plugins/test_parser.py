@@ -0,0 +1,99 @@
+import pytest
+from io import BytesIO
+from bot.config import config
+from bot.plugins import parse_plugin_source, extract_plugin_metadata_from_io, compile_plugin, load_plugin_module
+
+PLUGIN_SOURCE = b'''raise SystemExit("The plugin source must never be executed")
+
+PLUGIN_METADATA = {
+    "name": "nested_plugin",
+    "title": "Nested Plugin",
+    "version": "1.0.0",
+    "description": "Has nested metadata.",
+    "dependencies": ["requests>=2"],
+    "settings": {"limits": {"daily": 10}}
+}
+
+from aiogram import Router
+from some_missing_package import helper
+
+router = Router()
+
+async def nested_command(message):
+    await message.answer("nested")
+
+nested_command.meta = {
+    "name": "nested",
+    "type": "command",
+    "description": "Responds to /nested."
+}
+
+async def undocumented(message):
+    pass
+
+helper.meta = {"name": "imported", "type": "button"}
+'''
+
+
+def test_parse_plugin_source():
+    """Test extracting nested metadata and function metadata without executing the source."""
+    plugin_metadata, plugin_functions = parse_plugin_source(PLUGIN_SOURCE)
+
+    assert plugin_metadata["name"] == "nested_plugin"
+    assert plugin_metadata["settings"] == {"limits": {"daily": 10}}
+    assert [(function.name, function.function_type, function.description) for function in plugin_functions] == [
+        ("nested", "command", "Responds to /nested.")
+    ]
+
+
+def test_parse_plugin_source_skips_invalid_function_metadata():
+    """Test that function metadata that literal_eval rejects with a TypeError is skipped."""
+    plugin_source = PLUGIN_SOURCE + b"nested_command.meta = {[]: 'unhashable key'}\n"
+
+    plugin_metadata, plugin_functions = parse_plugin_source(plugin_source)
+
+    assert plugin_metadata["name"] == "nested_plugin"
+    assert [function.name for function in plugin_functions] == ["nested"]
+
+
+def test_extract_plugin_metadata_from_io_does_not_touch_disk(monkeypatch):
+    """Test that uploaded plugins are parsed in memory."""
+    def fail_open(*args, **kwargs):
+        raise AssertionError("The plugin must not be written to disk")
+
+    monkeypatch.setattr("builtins.open", fail_open)
+
+    plugin_metadata = extract_plugin_metadata_from_io(BytesIO(PLUGIN_SOURCE))
+
+    assert plugin_metadata["dependencies"] == ["requests>=2"]
+
+
+def test_extract_plugin_metadata_from_io_without_metadata():
+    """Test uploading a file without PLUGIN_METADATA."""
+    with pytest.raises(RuntimeError):
+        extract_plugin_metadata_from_io(BytesIO(b"router = None\n"))
+
+
+def test_load_plugin_module_uses_bytecode_cache(tmp_path, monkeypatch):
+    """Test that compiled plugins are loaded from the bytecode cache until their source changes."""
+    monkeypatch.setattr(config, "PLUGIN_CACHE_DIR", tmp_path / "cache")
+    plugin_path = tmp_path / "cached_plugin.py"
+    plugin_path.write_text("VALUE = 1\n", encoding="utf-8")
+
+    assert load_plugin_module("cached_plugin", str(plugin_path)).VALUE == 1
+    assert len(list((tmp_path / "cache" / "bytecode").iterdir())) == 1
+
+    # A cache hit must not compile the source again
+    def fail_compile(*args, **kwargs):
+        raise AssertionError("The plugin was compiled again")
+
+    monkeypatch.setattr("builtins.compile", fail_compile)
+    assert load_plugin_module("cached_plugin", str(plugin_path)).VALUE == 1
+    monkeypatch.undo()
+
+    # A changed source replaces the stale cache entry
+    monkeypatch.setattr(config, "PLUGIN_CACHE_DIR", tmp_path / "cache")
+    plugin_path.write_text("VALUE = 2\n", encoding="utf-8")
+    assert compile_plugin("cached_plugin", str(plugin_path)) is not None
+    assert load_plugin_module("cached_plugin", str(plugin_path)).VALUE == 2
+    assert len(list((tmp_path / "cache" / "bytecode").iterdir())) == 1
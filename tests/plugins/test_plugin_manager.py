@@ -0,0 +1,318 @@
+import pytest
+from datetime import datetime
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update, Message, Chat, User
+from bot.config import config
+from bot.plugins import PluginManager
+
+PLUGIN_SOURCE = '''PLUGIN_METADATA = {
+    "name": "counted_plugin",
+    "title": "Counted Plugin",
+    "version": "1.0.0",
+    "description": "Counts how many times it is imported.",
+    "dependencies": []
+}
+
+import builtins
+from aiogram import Router, F
+
+builtins.counted_plugin_imports = getattr(builtins, "counted_plugin_imports", 0) + 1
+
+router = Router()
+
+@router.message(F.text == "counted_button")
+async def counted_button(message):
+    builtins.counted_plugin_answers = getattr(builtins, "counted_plugin_answers", 0) + 1
+
+counted_button.meta = {"name": "counted_button", "type": "button", "description": "A button."}
+'''
+
+
+@pytest.fixture
+def plugins_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PLUGINS_DIR", tmp_path)
+    monkeypatch.setattr(config, "PLUGIN_CACHE_DIR", tmp_path / "cache")
+    (tmp_path / "counted_plugin.py").write_text(PLUGIN_SOURCE, encoding="utf-8")
+    yield tmp_path
+
+    import builtins
+    for counter in [name for name in vars(builtins) if name.endswith(("_plugin_imports", "_plugin_answers"))]:
+        delattr(builtins, counter)
+
+
+@pytest.mark.asyncio
+async def test_load_plugins_imports_each_module_once(plugins_dir):
+    """Test that a load cycle executes every plugin file only once."""
+    import builtins
+    dispatcher = Dispatcher()
+    manager = PluginManager(dispatcher, None)
+
+    await manager.load_plugins()
+
+    assert builtins.counted_plugin_imports == 1
+    assert manager.modules.import_count == 1
+    assert [plugin.name for plugin in manager.loaded_plugins] == ["counted_plugin"]
+    assert [function.name for function in manager.loaded_plugins[0].functions] == ["counted_button"]
+    assert manager.modules.get("counted_plugin").router in dispatcher.sub_routers
+
+
+@pytest.mark.asyncio
+async def test_scan_plugins_uses_manifest_for_unchanged_files(plugins_dir):
+    """Test that a restart reads unchanged plugins from the manifest instead of importing them."""
+    import builtins
+    await PluginManager(Dispatcher(), None).load_plugins()
+
+    restarted_manager = PluginManager(Dispatcher(), None)
+    plugins = await restarted_manager._scan_plugins()
+
+    assert builtins.counted_plugin_imports == 1
+    assert [plugin.name for plugin in plugins] == ["counted_plugin"]
+    assert [function.name for function in plugins[0].functions] == ["counted_button"]
+
+    # A changed file takes the slow path again
+    plugin_path = plugins_dir / "counted_plugin.py"
+    plugin_path.write_text(PLUGIN_SOURCE.replace('"1.0.0"', '"1.0.1"'), encoding="utf-8")
+    plugins = await PluginManager(Dispatcher(), None)._scan_plugins()
+
+    assert builtins.counted_plugin_imports == 2
+    assert plugins[0].version == "1.0.1"
+
+
+@pytest.mark.asyncio
+async def test_broken_dependency_only_skips_its_plugin(plugins_dir, monkeypatch):
+    """Test that a requirement pip can't install does not prevent the dependencies of the other plugins from being installed."""
+    from packaging.utils import canonicalize_name
+    from bot.plugins import dependencies, plugin_manager
+    (plugins_dir / "counted_plugin.py").write_text(
+        PLUGIN_SOURCE.replace('"dependencies": []', '"dependencies": ["Fresh_Package>=1"]'), encoding="utf-8"
+    )
+    (plugins_dir / "broken_plugin.py").write_text(
+        PLUGIN_SOURCE.replace("counted_plugin", "broken_plugin").replace('"dependencies": []', '"dependencies": [" Bogus_Package "]'),
+        encoding="utf-8"
+    )
+    installed = set()
+
+    # pip installs nothing when one of the requirements can't be installed
+    async def fake_install(requirements, progress=None):
+        names = {canonicalize_name(requirement.split(">=")[0].strip()) for requirement in requirements}
+        if "bogus-package" in names:
+            return False
+        installed.update(names)
+        return True
+
+    monkeypatch.setattr(plugin_manager, "install_dependencies", fake_install)
+    monkeypatch.setattr(dependencies, "is_dependency_satisfied", lambda requirement: canonicalize_name(requirement.split(">=")[0]) in installed)
+
+    plugins = await PluginManager(Dispatcher(), None)._scan_plugins()
+
+    assert installed == {"fresh-package"}
+    assert [plugin.name for plugin in plugins] == ["counted_plugin"]
+
+
+@pytest.mark.asyncio
+async def test_lazy_plugin_is_imported_on_first_matching_update(plugins_dir, monkeypatch):
+    """Test that a lazy plugin is imported by the first update routed to it."""
+    import builtins
+    monkeypatch.setattr(config, "PLUGIN_LAZY_LOADING", True)
+
+    # Fill the manifest, so that the next start does not import the plugin while scanning
+    await PluginManager(Dispatcher(), None).load_plugins()
+    del builtins.counted_plugin_imports
+
+    dispatcher = Dispatcher()
+    manager = PluginManager(dispatcher, None)
+    await manager.load_plugins()
+
+    assert not hasattr(builtins, "counted_plugin_imports")
+    assert dispatcher.sub_routers == [manager.lazy_routers["counted_plugin"]]
+
+    def update(update_id: int, text: str) -> Update:
+        return Update(update_id=update_id, message=Message(
+            message_id=update_id,
+            date=datetime.now(),
+            chat=Chat(id=1, type="private"),
+            from_user=User(id=1, is_bot=False, first_name="Test"),
+            text=text
+        ))
+
+    bot = Bot(token="123456:test")
+    await dispatcher.feed_update(bot, update(1, "unrelated text"))
+    assert not hasattr(builtins, "counted_plugin_imports")
+
+    await dispatcher.feed_update(bot, update(2, "counted_button"))
+    await dispatcher.feed_update(bot, update(3, "counted_button"))
+
+    assert builtins.counted_plugin_imports == 1
+    assert builtins.counted_plugin_answers == 2
+    assert manager.lazy_routers == {}
+    assert dispatcher.sub_routers == [manager.modules.get("counted_plugin").router]
+    await bot.session.close()
+
+
+@pytest.mark.asyncio
+async def test_reload_and_unload_plugin(plugins_dir):
+    """Test swapping a plugin in place and unloading it without a restart."""
+    import asyncio
+    dispatcher = Dispatcher()
+    manager = PluginManager(dispatcher, None)
+    await manager.load_plugins()
+    old_router = manager.routers["counted_plugin"]
+
+    # The new version adds a background task
+    plugin_path = plugins_dir / "counted_plugin.py"
+    plugin_path.write_text(PLUGIN_SOURCE.replace('"1.0.0"', '"2.0.0"') + """
+import asyncio
+
+async def counted_task(bot):
+    await asyncio.Event().wait()
+
+counted_task.meta = {"name": "counted_task", "type": "task", "description": "A task."}
+""", encoding="utf-8")
+
+    assert await manager.reload_plugin("counted_plugin")
+
+    new_router = manager.routers["counted_plugin"]
+    assert new_router is not old_router
+    assert dispatcher.sub_routers == [new_router]
+    assert old_router.parent_router is None
+    assert manager.loaded_plugins[0].version == "2.0.0"
+    [task] = manager.tasks["counted_plugin"]
+    await asyncio.sleep(0)
+    assert not task.done()
+
+    assert await manager.unload_plugin("counted_plugin")
+
+    assert task.cancelled()
+    assert dispatcher.sub_routers == []
+    assert manager.loaded_plugins == []
+    assert plugin_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_reload_plugin_keeps_running_version_on_error(plugins_dir):
+    """Test that a broken update does not replace the running plugin."""
+    dispatcher = Dispatcher()
+    manager = PluginManager(dispatcher, None)
+    await manager.load_plugins()
+    router = manager.routers["counted_plugin"]
+
+    (plugins_dir / "counted_plugin.py").write_text(PLUGIN_SOURCE + "\nraise RuntimeError('broken')\n", encoding="utf-8")
+
+    assert not await manager.reload_plugin("counted_plugin")
+    assert dispatcher.sub_routers == [router]
+    assert manager.modules.get("counted_plugin").router is router
+
+
+@pytest.mark.asyncio
+async def test_sync_plugin_file_finds_plugins_by_file(plugins_dir, monkeypatch):
+    """Test that deleting a file unloads its plugin when the plugin name differs from the file name."""
+    dispatcher = Dispatcher()
+    manager = PluginManager(dispatcher, None)
+    monkeypatch.setattr(manager, "_rename_plugin_file", lambda old_name, new_name: False)
+    (plugins_dir / "counted_plugin.py").rename(plugins_dir / "counted_v2.py")
+    await manager.load_plugins()
+    assert manager.loaded_plugins.get("counted_plugin").file_path == str(plugins_dir / "counted_v2.py")
+
+    (plugins_dir / "counted_v2.py").unlink()
+    await manager.sync_plugin_file("counted_v2")
+
+    assert manager.loaded_plugins == []
+    assert dispatcher.sub_routers == []
+
+
+@pytest.mark.asyncio
+async def test_install_plugin_from_io_only_loads_the_new_plugin(plugins_dir):
+    """Test that installing a plugin does not re-import or re-register the other plugins."""
+    import builtins
+    from io import BytesIO
+    dispatcher = Dispatcher()
+    manager = PluginManager(dispatcher, None)
+    await manager.load_plugins()
+
+    other_source = PLUGIN_SOURCE.replace("counted_plugin", "other_plugin").encode("utf-8")
+    assert await manager.install_plugin_from_io(BytesIO(other_source), {"name": "other_plugin"})
+
+    assert builtins.counted_plugin_imports == 1
+    assert builtins.other_plugin_imports == 1
+    assert [plugin.name for plugin in manager.loaded_plugins] == ["counted_plugin", "other_plugin"]
+    assert dispatcher.sub_routers == [manager.routers["counted_plugin"], manager.routers["other_plugin"]]
+
+    # An invalid name is rejected before anything is written
+    assert not await manager.install_plugin_from_io(BytesIO(other_source), {"name": "../escaped"})
+    assert not (plugins_dir.parent / "escaped.py").exists()
+
+
+@pytest.mark.asyncio
+async def test_install_and_sync_of_the_same_file_load_the_plugin_once(plugins_dir, monkeypatch):
+    """Test that the watcher syncing an uploaded file while its dependencies are installed does not load it twice."""
+    import asyncio
+    import builtins
+    from io import BytesIO
+    from bot.plugins import plugin_manager
+    dispatcher = Dispatcher()
+    manager = PluginManager(dispatcher, None)
+    await manager.load_plugins()
+
+    installing = asyncio.Event()
+    installed = asyncio.Event()
+
+    async def slow_install(requirements, progress=None):
+        installing.set()
+        await installed.wait()
+        return True
+
+    monkeypatch.setattr(plugin_manager, "install_dependencies", slow_install)
+
+    other_source = PLUGIN_SOURCE.replace("counted_plugin", "other_plugin").encode("utf-8")
+    install = asyncio.create_task(manager.install_plugin_from_io(BytesIO(other_source), {"name": "other_plugin"}))
+    await installing.wait()
+    sync = asyncio.create_task(manager.sync_plugin_file("other_plugin"))
+    await asyncio.sleep(0.01)
+    installed.set()
+
+    assert await install
+    await sync
+    assert builtins.other_plugin_imports == 1
+    assert dispatcher.sub_routers == [manager.routers["counted_plugin"], manager.routers["other_plugin"]]
+
+
+@pytest.mark.asyncio
+async def test_startup_profiler_records_phases_and_plugins(plugins_dir, monkeypatch):
+    """Test that the startup profiler reports the load phases and the steps of every plugin."""
+    import json
+    from bot.profiler import StartupProfiler
+
+    profiler = StartupProfiler()
+    monkeypatch.setattr("bot.plugins.plugin_manager.startup_profiler", profiler)
+
+    profiler.start()
+    with profiler.phase("load_plugins"):
+        await PluginManager(Dispatcher(), None).load_plugins()
+    profiler.stop(str(plugins_dir / "profile.json"))
+
+    report = json.loads((plugins_dir / "profile.json").read_text())
+    assert {"load_plugins", "load_plugins/scan", "load_plugins/register"} <= report["phases"].keys()
+    assert {"metadata", "import", "tasks"} <= report["plugins"]["counted_plugin"]["steps"].keys()
+    assert report["plugins"]["counted_plugin"]["total"]["wall"] > 0
+    assert not profiler.enabled
+
+
+def test_startup_profiler_keeps_existing_tracing(monkeypatch):
+    """Test that the startup profiler only stops the memory tracing it started."""
+    import tracemalloc
+    from bot.profiler import StartupProfiler
+
+    profiler = StartupProfiler()
+    monkeypatch.setattr("builtins.print", lambda *args, **kwargs: None)
+
+    tracemalloc.start()
+    try:
+        profiler.start()
+        profiler.stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    profiler.start()
+    profiler.stop()
+    assert not tracemalloc.is_tracing()
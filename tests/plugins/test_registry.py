@@ -0,0 +1,47 @@
+from bot.models import Plugin
+from bot.plugins import PluginRegistry
+
+
+def build_plugin(name: str, title: str = None) -> Plugin:
+    return Plugin(name, title, "1.0.0", "A test plugin.", [], [], f"plugins/{name}.py")
+
+
+def test_registry_lookups_and_order():
+    """Test that plugins are found by name and title and iterated in the order they were added."""
+    first, second, untitled = build_plugin("first", "First"), build_plugin("second", "Second"), build_plugin("untitled")
+    registry = PluginRegistry([first, second])
+    registry.append(untitled)
+
+    assert registry == [first, second, untitled]
+    assert registry[-1] is untitled
+    assert registry.get("second") is second
+    assert registry.get_by_title("Second") is second
+    assert registry.get_by_title("untitled") is untitled
+    assert registry.get_by_path("plugins/second.py") is second
+    assert "first" in registry and first in registry
+    assert build_plugin("first", "First") not in registry
+
+    # A new version of a plugin takes the place of the old one
+    updated = build_plugin("first", "First v2")
+    registry.append(updated)
+    assert registry.names() == ["first", "second", "untitled"]
+    assert registry.get_by_title("First v2") is updated
+    assert registry.get_by_title("First") is None
+
+
+def test_registry_version_and_removal_while_iterating():
+    """Test that every change gives a new version and that plugins can be removed while iterating."""
+    registry = PluginRegistry([build_plugin("first"), build_plugin("second"), build_plugin("third")])
+    versions = [registry.version]
+
+    for plugin in registry:
+        registry.discard(plugin.name)
+        versions.append(registry.version)
+
+    assert registry == []
+    assert versions == sorted(set(versions)) and len(versions) == 4
+    assert registry.discard("first") is None
+    assert registry.version == versions[-1]
+
+    # A new registry never reuses the version of another one
+    assert PluginRegistry().version not in versions
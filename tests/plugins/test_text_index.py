@@ -0,0 +1,149 @@
+import pytest
+from datetime import datetime
+from aiogram import Bot, Dispatcher, Router, F, BaseMiddleware
+from aiogram.filters import Command
+from aiogram.types import Update, Message, Chat, User
+from bot.plugins import ExactTextIndex
+from bot.plugins.routing import attach_router, detach_router
+
+TEXTS = ["/start", "a", "b", "c", "secret", "hello", "blocked"]
+
+
+def build_update(update_id: int, text: str) -> Update:
+    return Update(update_id=update_id, message=Message(
+        message_id=update_id,
+        date=datetime.now(),
+        chat=Chat(id=4001, type="private"),
+        from_user=User(id=4001, is_bot=False, first_name="Test"),
+        text=text
+    ))
+
+
+class Block(BaseMiddleware):
+    """Inner middleware refusing every message, like AccessLevel does for unknown users."""
+    async def __call__(self, handler, event, data):
+        calls.append("blocked by middleware")
+
+
+class Passthrough(BaseMiddleware):
+    async def __call__(self, handler, event, data):
+        return await handler(event, data)
+
+
+calls = []
+
+
+def build_dispatcher(indexed: bool) -> Dispatcher:
+    def record(name):
+        async def handler(message: Message):
+            calls.append(name)
+        return handler
+
+    core = Router()
+    core.message.register(record("start"), Command("start"))
+    core.message.register(record("a in core"), F.text == "a")
+    core.message.register(record("secret prefix"), lambda message: message.text.startswith("sec"))
+
+    plugin = Router()
+    plugin.message.register(record("a in plugin"), F.text == "a")
+    plugin.message.register(record("b in plugin"), F.text == "b")
+    plugin.message.register(record("secret in plugin"), F.text == "secret")
+
+    guarded = Router()
+    guarded.message.middleware(Block())
+    guarded.message.register(record("blocked"), F.text == "blocked")
+
+    observed = Router()
+    observed.message.outer_middleware(Passthrough())
+    observed.message.register(record("c in observed"), F.text == "c")
+
+    fallback = Router()
+    fallback.message.register(record("any text"), F.text)
+
+    dispatcher = Dispatcher()
+    if indexed:
+        dispatcher.message.outer_middleware(ExactTextIndex(dispatcher))
+    dispatcher.include_routers(core, plugin, guarded, observed, fallback)
+    return dispatcher
+
+
+@pytest.mark.asyncio
+async def test_index_routes_like_the_filter_chain():
+    """Test that every message reaches the same handler with and without the index."""
+    bot = Bot("123456:test")
+    results = []
+    for indexed in (False, True):
+        calls.clear()
+        dispatcher = build_dispatcher(indexed)
+        for update_id, text in enumerate(TEXTS):
+            await dispatcher.feed_update(bot, build_update(update_id, text))
+        results.append(list(calls))
+
+    assert results[0] == results[1]
+    assert results[1] == ["start", "a in core", "b in plugin", "c in observed", "secret prefix", "any text", "blocked by middleware"]
+
+
+@pytest.mark.asyncio
+async def test_index_is_rebuilt_when_a_router_is_attached():
+    """Test that the buttons of a newly attached plugin router are routed."""
+    bot = Bot("123456:test")
+    calls.clear()
+    dispatcher = build_dispatcher(True)
+    await dispatcher.feed_update(bot, build_update(1, "new button"))
+
+    new_plugin = Router()
+
+    @new_plugin.message(F.text == "new button")
+    async def new_button(message: Message):
+        calls.append("new button")
+
+    detach_router(dispatcher.sub_routers[-1])
+    await dispatcher.feed_update(bot, build_update(2, "new button"))
+    attach_router(dispatcher, new_plugin)
+    await dispatcher.feed_update(bot, build_update(3, "new button"))
+
+    assert calls == ["any text", "new button"]
+
+
+@pytest.mark.asyncio
+async def test_index_is_rebuilt_when_handlers_or_nested_routers_are_added():
+    """Test that handlers registered on an attached router and routers included in a nested router are routed."""
+    bot = Bot("123456:test")
+    calls.clear()
+    dispatcher = build_dispatcher(True)
+    await dispatcher.feed_update(bot, build_update(1, "late button"))
+
+    core = dispatcher.sub_routers[0]
+
+    @core.message(F.text == "late button")
+    async def late_button(message: Message):
+        calls.append("late button")
+
+    await dispatcher.feed_update(bot, build_update(2, "late button"))
+
+    nested = Router()
+
+    @nested.message(F.text == "nested button")
+    async def nested_button(message: Message):
+        calls.append("nested button")
+
+    core.include_router(nested)
+    await dispatcher.feed_update(bot, build_update(3, "nested button"))
+
+    assert calls == ["any text", "late button", "nested button"]
+
+
+@pytest.mark.asyncio
+async def test_index_falls_back_to_the_filter_chain_without_aiogram_internals(monkeypatch):
+    """Test that messages are still routed if the aiogram internals used by the index are missing."""
+    from bot.plugins import text_index
+    monkeypatch.setattr(text_index, "TelegramEventObserver", type("TelegramEventObserver", (), {}))
+    bot = Bot("123456:test")
+    calls.clear()
+    dispatcher = build_dispatcher(True)
+
+    for update_id, text in enumerate(TEXTS):
+        await dispatcher.feed_update(bot, build_update(update_id, text))
+
+    assert not dispatcher.message.outer_middleware[-1].enabled
+    assert calls == ["start", "a in core", "b in plugin", "c in observed", "secret prefix", "any text", "blocked by middleware"]
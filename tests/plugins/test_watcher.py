@@ -0,0 +1,70 @@
+import pytest
+import asyncio
+from aiogram import Dispatcher
+from bot.config import config
+from bot.plugins import PluginManager, PluginWatcher
+from bot.plugins.watcher import is_plugin_file
+
+PLUGIN_SOURCE = '''PLUGIN_METADATA = {
+    "name": "watched_plugin",
+    "title": "Watched Plugin",
+    "version": "VERSION",
+    "description": "A plugin dropped into the plugins directory.",
+    "dependencies": []
+}
+
+from aiogram import Router
+
+router = Router()
+'''
+
+
+async def wait_for(condition, timeout: float = 5.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "The watcher did not apply the change in time"
+        await asyncio.sleep(0.02)
+
+
+def test_is_plugin_file():
+    """Test that temporary and editor files are ignored."""
+    assert is_plugin_file("weather.py")
+    assert not is_plugin_file("weather.py~")
+    assert not is_plugin_file(".#weather.py")
+    assert not is_plugin_file("#weather.py#")
+    assert not is_plugin_file(".weather.py.swp")
+    assert not is_plugin_file("weather.tmp.py")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["auto", "polling"])
+async def test_watcher_loads_reloads_and_unloads_plugins(tmp_path, monkeypatch, mode):
+    """Test that created, modified and deleted plugin files are applied to the manager."""
+    monkeypatch.setattr(config, "PLUGINS_DIR", tmp_path)
+    monkeypatch.setattr(config, "PLUGIN_CACHE_DIR", tmp_path / "cache")
+    dispatcher = Dispatcher()
+    manager = PluginManager(dispatcher, None)
+    await manager.load_plugins()
+
+    watcher = PluginWatcher(manager, mode=mode, debounce=0.1, poll_interval=0.05)
+    await watcher.start()
+    try:
+        plugin_path = tmp_path / "watched_plugin.py"
+
+        # A burst of writes results in a single load of the final content
+        for version in ("0.1", "0.2", "1.0.0"):
+            plugin_path.write_text(PLUGIN_SOURCE.replace("VERSION", version), encoding="utf-8")
+        await wait_for(lambda: [plugin.version for plugin in manager.loaded_plugins] == ["1.0.0"])
+        assert manager.modules.import_count == 1
+
+        plugin_path.write_text(PLUGIN_SOURCE.replace("VERSION", "2.0.0"), encoding="utf-8")
+        await wait_for(lambda: [plugin.version for plugin in manager.loaded_plugins] == ["2.0.0"])
+        assert dispatcher.sub_routers == [manager.routers["watched_plugin"]]
+
+        (tmp_path / ".#watched_plugin.py").write_text("not python", encoding="utf-8")
+        plugin_path.unlink()
+        await wait_for(lambda: manager.loaded_plugins == [])
+        assert dispatcher.sub_routers == []
+    finally:
+        await watcher.stop()